@@ -0,0 +1,256 @@
+"""
+Controle adaptativo (AIMD) de chunk_size e concorrência dos inserts assíncronos.
+
+O ponto ótimo de chunk_size/max_tasks muda com o alvo (notebook, Docker com
+4GB, RDS): mais conexões ajudam até o servidor saturar, chunks maiores
+amortizam o round trip até a transação ficar longa demais. `AIMDController`
+mede cada chunk (linhas, bytes, duração) e, a cada janela de chunks:
+- sinal de congestionamento (latência média do chunk acima do alvo, pouca
+  folga de memória ou chunk com erro transitório): redução multiplicativa;
+- throughput da janela melhor que o melhor já visto: aumento aditivo da
+  dimensão em teste (tasks ou chunk);
+- sem ganho (ou pior): desfaz o último aumento e passa a testar a outra
+  dimensão.
+
+Cada decisão fica em `decisions` (tempo, ação, motivo, valores medidos e os
+novos chunk_size/tasks) para as métricas dos batches.
+
+Uso:
+    controller = AIMDController(chunk_size=5000, tasks=4)
+    await connector.insert_async_parallel(..., controller=controller)
+"""
+
+import asyncio
+import os
+import time
+
+try:
+    import psutil
+
+    HAS_PSUTIL = True
+except ImportError:
+    HAS_PSUTIL = False
+
+
+def memory_limit_bytes():
+    """Limite de memória do cgroup (Docker) ou, sem limite, a RAM total."""
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        # cgroup v1 sem limite reporta um valor próximo de 2**63
+        if value.isdigit() and int(value) < 2**60:
+            return int(value)
+    if HAS_PSUTIL:
+        return psutil.virtual_memory().total
+    return None
+
+
+class AIMDController:
+    """
+    Ajusta `chunk_size` e `tasks` durante a carga.
+
+    Args:
+        chunk_size: Linhas por chunk no início.
+        tasks: Chunks em andamento ao mesmo tempo no início.
+        chunk_bounds: (mínimo, máximo) de chunk_size.
+        task_bounds: (mínimo, máximo) de tasks (o pool abre até o máximo).
+        chunk_step: Aumento aditivo de chunk_size.
+        task_step: Aumento aditivo de tasks.
+        decrease: Fator da redução multiplicativa.
+        latency_target: Duração média máxima de um chunk (s) antes de reduzir.
+        min_headroom: Fração mínima do limite de memória livre (RSS do processo).
+        memory_limit: Limite em bytes (padrão: cgroup ou RAM total).
+        window: Chunks por decisão (padrão: tasks atuais, no mínimo 2).
+        tolerance: Variação relativa de throughput tratada como ruído.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 5000,
+        tasks: int = 4,
+        chunk_bounds=(500, 20000),
+        task_bounds=(1, 16),
+        chunk_step: int = 1000,
+        task_step: int = 1,
+        decrease: float = 0.5,
+        latency_target: float = 10.0,
+        min_headroom: float = 0.15,
+        memory_limit: int | None = None,
+        window: int | None = None,
+        tolerance: float = 0.05,
+    ):
+        self.chunk_bounds = chunk_bounds
+        self.task_bounds = task_bounds
+        self.chunk_size = self._clamp(chunk_size, chunk_bounds)
+        self.tasks = self._clamp(tasks, task_bounds)
+        self.chunk_step = chunk_step
+        self.task_step = task_step
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.min_headroom = min_headroom
+        self.memory_limit = memory_limit or memory_limit_bytes()
+        self.window = window
+        self.tolerance = tolerance
+
+        self.decisions = []
+        self._process = psutil.Process(os.getpid()) if HAS_PSUTIL else None
+        self._start = time.perf_counter()
+        self._probe = "tasks"  # dimensão sendo testada pelo aumento aditivo
+        self._last_step = None  # (dimensão, valor anterior) do último aumento
+        self._best_throughput = None
+        self._active = 0
+        self._condition = None
+        self._loop = None
+        self._reset_window()
+
+    @staticmethod
+    def _clamp(value, bounds):
+        low, high = bounds
+        return max(low, min(high, int(value)))
+
+    def _reset_window(self):
+        # Throughput medido só no tempo com algum chunk em andamento: o parse
+        # entre batches não conta como lentidão do banco
+        now = time.perf_counter()
+        self._busy_time = 0.0
+        self._busy_since = now
+        self._window_chunks = 0
+        self._window_rows = 0
+        self._window_bytes = 0
+        self._window_seconds = 0.0
+        self._window_errors = 0
+
+    # ------------------------------------------------------------------
+    async def acquire(self):
+        """Espera uma vaga: no máximo `tasks` chunks em andamento."""
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            # Um controller pode atravessar vários asyncio.run (rodadas do benchmark)
+            self._condition = asyncio.Condition()
+            self._loop = loop
+            self._active = 0
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._active < self.tasks)
+            if self._active == 0:
+                self._busy_since = time.perf_counter()
+            self._active += 1
+
+    async def release(self):
+        async with self._condition:
+            self._active -= 1
+            if self._active == 0:
+                self._busy_time += time.perf_counter() - self._busy_since
+            self._condition.notify_all()
+
+    # ------------------------------------------------------------------
+    def _memory(self):
+        """(RSS em MB, fração livre do limite) ou (None, None) sem psutil."""
+        if self._process is None or not self.memory_limit:
+            return None, None
+        rss = self._process.memory_info().rss
+        return rss / (1024**2), 1 - rss / self.memory_limit
+
+    def observe(self, rows: int, nbytes: int, seconds: float, ok: bool = True, tag=None):
+        """
+        Registra um chunk concluído; decide quando a janela fecha. `ok=False`
+        só para erros de carga (transitórios/timeout, ver
+        `etl_psycopg3.chunk_congestion_ok`): um chunk desfeito por duplicata
+        ou dado inválido conta como ok.
+        """
+        self._window_chunks += 1
+        self._window_rows += rows if ok else 0
+        self._window_bytes += nbytes if ok else 0
+        self._window_seconds += seconds
+        self._window_errors += 0 if ok else 1
+        if self._window_chunks >= (self.window or max(2, self.tasks)):
+            self._decide(tag)
+
+    def _decide(self, tag):
+        elapsed = self._busy_time
+        if self._active:
+            elapsed += time.perf_counter() - self._busy_since
+        throughput = self._window_rows / elapsed if elapsed > 0 else 0.0
+        latency = self._window_seconds / self._window_chunks
+        rss_mb, headroom = self._memory()
+
+        if headroom is not None and headroom < self.min_headroom:
+            action, reason = self._multiplicative_decrease(chunk=True), "memory"
+        elif self._window_errors:
+            action, reason = self._multiplicative_decrease(chunk=False), "errors"
+        elif latency > self.latency_target:
+            action, reason = self._multiplicative_decrease(chunk=True), "latency"
+        elif self._best_throughput is None or throughput > self._best_throughput * (1 + self.tolerance):
+            action, reason = self._additive_increase(), "throughput_up"
+            self._best_throughput = throughput
+        elif throughput < self._best_throughput * (1 - self.tolerance) and self._last_step:
+            action, reason = self._revert(), "throughput_down"
+        elif self._last_step:
+            # O último aumento não rendeu: desfaz e testa a outra dimensão
+            action, reason = self._revert(), "throughput_flat"
+        else:
+            action, reason = self._additive_increase(), "probe"
+
+        self.decisions.append(
+            {
+                "time": time.perf_counter() - self._start,
+                "batch": tag,
+                "action": action,
+                "reason": reason,
+                "throughput": throughput,
+                "mb_per_s": self._window_bytes / (1024**2) / elapsed if elapsed > 0 else 0.0,
+                "chunk_latency": latency,
+                "errors": self._window_errors,
+                "rss_mb": rss_mb,
+                "headroom": headroom,
+                "chunk_size": self.chunk_size,
+                "tasks": self.tasks,
+            }
+        )
+        self._reset_window()
+
+    def _switch_probe(self):
+        self._probe = "chunk" if self._probe == "tasks" else "tasks"
+
+    def _additive_increase(self):
+        if self._probe == "tasks" and self.tasks >= self.task_bounds[1]:
+            self._switch_probe()
+        elif self._probe == "chunk" and self.chunk_size >= self.chunk_bounds[1]:
+            self._switch_probe()
+        if self._probe == "tasks":
+            self._last_step = ("tasks", self.tasks)
+            self.tasks = self._clamp(self.tasks + self.task_step, self.task_bounds)
+        else:
+            self._last_step = ("chunk", self.chunk_size)
+            self.chunk_size = self._clamp(self.chunk_size + self.chunk_step, self.chunk_bounds)
+        return f"increase_{self._probe}"
+
+    def _revert(self):
+        dimension, previous = self._last_step
+        if dimension == "tasks":
+            self.tasks = previous
+        else:
+            self.chunk_size = previous
+        self._last_step = None
+        self._switch_probe()
+        return f"revert_{dimension}"
+
+    def _multiplicative_decrease(self, chunk: bool):
+        # Referência de throughput zerada: a carga mudou de regime
+        self._best_throughput = None
+        self._last_step = None
+        self.tasks = self._clamp(self.tasks * self.decrease, self.task_bounds)
+        if chunk:
+            self.chunk_size = self._clamp(self.chunk_size * self.decrease, self.chunk_bounds)
+            return "decrease_both"
+        return "decrease_tasks"
+
+    def metrics(self, since: int = 0):
+        """Estado atual e decisões a partir do índice `since` (ex.: de um batch)."""
+        return {
+            "chunk_size": self.chunk_size,
+            "tasks": self.tasks,
+            "decisions": self.decisions[since:],
+        }
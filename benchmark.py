@@ -11,9 +11,11 @@ from etl_psycopg3 import DatabaseConnector
 
 
 class BenchmarkExecutor:
-    def __init__(self, files_to_process, offset, pipeline, max_tasks: int = 4, async_result_dir: str = None):
+    def __init__(self, files_to_process, offset, pipeline, max_tasks: int = 4, async_result_dir: str = None, pipeline_kwargs: dict = None):
         self.files_to_process = files_to_process
         self.offset = offset
+        # Parâmetros extras repassados ao pipeline (ex.: {"parse_mode": "stream"})
+        self.pipeline_kwargs = pipeline_kwargs or {}
         self.zip_path = "/Users/raphaelportela/datasetcovid.zip"
         self.pipeline = pipeline
         self.max_tasks = max_tasks
@@ -97,6 +99,7 @@ class BenchmarkExecutor:
             )
             if "max_tasks" in self._pipeline_params:
                 call_kwargs["max_tasks"] = self.max_tasks
+            call_kwargs.update(self.pipeline_kwargs)
 
             pipeline_result = await self.pipeline(**call_kwargs)
 
@@ -124,9 +127,13 @@ class BenchmarkExecutor:
 
             registros_processados = 0
             batch_metrics = []
+            pool_stats = {}
+            overlap_stats = {}
             if isinstance(pipeline_result, dict):
                 registros_processados = pipeline_result.get("total_inserted", 0)
                 batch_metrics = pipeline_result.get("batch_metrics", [])
+                pool_stats = pipeline_result.get("pool_stats") or {}
+                overlap_stats = pipeline_result.get("overlap") or {}
             else:
                 registros_processados = pipeline_result or 0
             
@@ -171,6 +178,8 @@ class BenchmarkExecutor:
                 "mem_percent_of_system": mem_percent_of_system,
                 "memory_samples": self._memory_samples.copy(),  # Store samples for time-series
                 "batch_metrics": batch_metrics, 
+                "pool_stats": pool_stats,
+                "overlap": overlap_stats,
             })
 
             print(
@@ -182,6 +191,18 @@ class BenchmarkExecutor:
                 f"(Pico: {mem_peak:.1f}MB, Δ{mem_delta:+.1f}MB, "
                 f"{mem_percent_of_system:.2f}% do sistema)"
             )
+            if pool_stats:
+                print(
+                    f"   🏊 Pool: {pool_stats['connections_created']} conexões criadas, "
+                    f"{pool_stats['acquires']:,} acquires (reuso {pool_stats['reuse_ratio']:.0%}), "
+                    f"espera média {pool_stats['acquire_wait_avg'] * 1000:.1f} ms"
+                )
+            if overlap_stats:
+                print(
+                    f"   🔀 Overlap: parse {overlap_stats['parse_time']:.2f}s + insert "
+                    f"{overlap_stats['insert_time']:.2f}s em {overlap_stats['wall_time']:.2f}s "
+                    f"(eficiência {overlap_stats['efficiency']:.2f}x)"
+                )
 
         self._plot_metrics(
             batch_sizes,
@@ -229,6 +250,7 @@ class BenchmarkExecutor:
             )
             if "max_tasks" in self._pipeline_params:
                 call_kwargs["max_tasks"] = self.max_tasks
+            call_kwargs.update(self.pipeline_kwargs)
 
             pipeline_result = self.pipeline(**call_kwargs)
 
@@ -0,0 +1,252 @@
+"""
+Carga em massa com índices e constraints adiados.
+
+Com os índices já criados, cada linha inserida paga a manutenção de todos
+eles — em artigos_complete isso inclui índices GIN de
+`to_tsvector('english', body_text)` sobre corpos de vários KB. Construir
+um índice de uma vez sobre a tabela carregada é bem mais barato.
+
+`DeferredIndexes` salva as definições (pg_get_indexdef /
+pg_get_constraintdef), remove índices, PK/UNIQUE e FKs da tabela, deixa a
+carga rodar e recria tudo com `maintenance_work_mem` e
+`max_parallel_maintenance_workers` elevados, vários índices ao mesmo tempo
+(um por conexão). PK/UNIQUE são recriados como índice único e anexados com
+`ADD CONSTRAINT ... USING INDEX`. Termina com ANALYZE e registra o tempo de
+cada fase.
+
+Uso:
+    with DeferredIndexes("artigos_complete") as deferred:
+        ...  # carga
+    deferred.timings  # drop, load, rebuild, analyze, total
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg
+
+from etl_psycopg3 import get_connection_string
+
+
+class DeferredIndexes:
+    """
+    Remove e recria os índices/constraints de uma tabela em volta de uma carga.
+
+    Args:
+        table_name: Tabela carregada.
+        conn_str: Conexão (padrão: variáveis DB_*).
+        keep: Nomes de índices/constraints que ficam durante a carga.
+        keep_primary_key: Mantém a PK (necessária como árbitro de
+            `ON CONFLICT (paper_id)` durante a carga).
+        dedupe: Antes de recriar PK/UNIQUE adiados, remove as linhas com
+            chave repetida mantendo a primeira (mesmo efeito de
+            `ON CONFLICT DO NOTHING`).
+        maintenance_work_mem: Memória de cada construção de índice.
+        parallel_workers: max_parallel_maintenance_workers por índice.
+        rebuild_workers: Índices construídos ao mesmo tempo (conexões).
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        conn_str: str | None = None,
+        keep=(),
+        keep_primary_key: bool = False,
+        dedupe: bool = True,
+        maintenance_work_mem: str = "512MB",
+        parallel_workers: int = 4,
+        rebuild_workers: int = 2,
+    ):
+        self.table_name = table_name
+        self.conn_str = conn_str or get_connection_string()
+        self.keep = set(keep)
+        self.keep_primary_key = keep_primary_key
+        self.dedupe = dedupe
+        self.maintenance_work_mem = maintenance_work_mem
+        self.parallel_workers = parallel_workers
+        self.rebuild_workers = max(1, rebuild_workers)
+
+        self.indexes = []  # (nome, CREATE INDEX ...)
+        self.constraints = []  # (nome, tipo, definição, CREATE UNIQUE INDEX ..., colunas)
+        self.foreign_keys = []  # (nome, definição)
+        self.timings = {}
+        self.index_timings = {}
+        self.duplicates_removed = 0
+        self._load_start = None
+
+    # ------------------------------------------------------------------
+    def _capture(self, cur):
+        """Salva as definições do que será removido."""
+        cur.execute(
+            """
+            SELECT i.relname, pg_get_indexdef(ix.indexrelid)
+            FROM pg_index ix
+            JOIN pg_class i ON i.oid = ix.indexrelid
+            WHERE ix.indrelid = %s::regclass
+              AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = ix.indexrelid)
+            ORDER BY i.relname
+            """,
+            (self.table_name,),
+        )
+        self.indexes = [(name, ddl) for name, ddl in cur.fetchall() if name not in self.keep]
+
+        # PK/UNIQUE referenciadas por FKs de outras tabelas não podem sair
+        cur.execute(
+            "SELECT count(*) FROM pg_constraint WHERE confrelid = %s::regclass AND contype = 'f'",
+            (self.table_name,),
+        )
+        referenced = cur.fetchone()[0] > 0
+
+        cur.execute(
+            """
+            SELECT c.conname, c.contype, pg_get_constraintdef(c.oid),
+                   pg_get_indexdef(c.conindid),
+                   ARRAY(SELECT a.attname FROM unnest(c.conkey) AS k(attnum)
+                         JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = k.attnum)
+            FROM pg_constraint c
+            WHERE c.conrelid = %s::regclass AND c.contype IN ('p', 'u', 'f')
+            ORDER BY c.contype, c.conname
+            """,
+            (self.table_name,),
+        )
+        self.constraints = []
+        self.foreign_keys = []
+        for name, contype, definition, index_ddl, columns in cur.fetchall():
+            if name in self.keep:
+                continue
+            if contype == "f":
+                self.foreign_keys.append((name, definition))
+                continue
+            if referenced or (contype == "p" and self.keep_primary_key):
+                continue
+            self.constraints.append((name, contype, definition, index_ddl, columns))
+
+    def defer(self):
+        """Salva as definições e remove índices/constraints (transação própria)."""
+        start = time.perf_counter()
+        with psycopg.connect(self.conn_str) as conn:
+            with conn.cursor() as cur:
+                self._capture(cur)
+                for name, _ in self.foreign_keys:
+                    cur.execute(f"ALTER TABLE {self.table_name} DROP CONSTRAINT {name}")
+                for name, *_ in self.constraints:
+                    cur.execute(f"ALTER TABLE {self.table_name} DROP CONSTRAINT {name}")
+                for name, _ in self.indexes:
+                    cur.execute(f"DROP INDEX {name}")
+            conn.commit()
+        self.timings["drop"] = time.perf_counter() - start
+        self._load_start = time.perf_counter()
+        print(
+            f"🪓 {self.table_name}: {len(self.indexes)} índices, {len(self.constraints)} PK/UNIQUE "
+            f"e {len(self.foreign_keys)} FKs adiados para depois da carga"
+        )
+
+    # ------------------------------------------------------------------
+    def _maintenance_connection(self):
+        conn = psycopg.connect(self.conn_str, autocommit=True)
+        conn.execute(f"SET maintenance_work_mem = '{self.maintenance_work_mem}'")
+        conn.execute(f"SET max_parallel_maintenance_workers = {int(self.parallel_workers)}")
+        return conn
+
+    def _build_index(self, name, ddl):
+        start = time.perf_counter()
+        with self._maintenance_connection() as conn:
+            conn.execute(ddl)
+        self.index_timings[name] = time.perf_counter() - start
+        return name
+
+    def _remove_duplicates(self, cur, columns):
+        """Apaga linhas com a mesma chave mantendo a de menor ctid (a primeira carregada)."""
+        match = " AND ".join(f"a.{c} = b.{c}" for c in columns)
+        cur.execute(
+            f"DELETE FROM {self.table_name} a USING {self.table_name} b "
+            f"WHERE a.ctid > b.ctid AND {match}"
+        )
+        return cur.rowcount
+
+    def restore(self):
+        """Recria tudo o que `defer` removeu e roda ANALYZE."""
+        if self._load_start is not None:
+            self.timings["load"] = time.perf_counter() - self._load_start
+
+        start = time.perf_counter()
+        if self.dedupe and self.constraints:
+            with psycopg.connect(self.conn_str) as conn:
+                with conn.cursor() as cur:
+                    for _, _, _, _, columns in self.constraints:
+                        self.duplicates_removed += self._remove_duplicates(cur, columns)
+                conn.commit()
+            if self.duplicates_removed:
+                print(f"   🧽 {self.duplicates_removed:,} linhas com chave repetida removidas")
+
+        # Índices (inclusive os das PK/UNIQUE) em paralelo, uma conexão cada
+        builds = [(name, ddl) for name, _, _, ddl, _ in self.constraints] + self.indexes
+        errors = []
+        with ThreadPoolExecutor(max_workers=self.rebuild_workers) as executor:
+            futures = {executor.submit(self._build_index, name, ddl): name for name, ddl in builds}
+            for future, name in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    errors.append(f"{name}: {e}")
+                    print(f"❌ Falha ao recriar o índice {name}: {e}")
+
+        with psycopg.connect(self.conn_str) as conn:
+            for name, contype, *_ in self.constraints:
+                kind = "PRIMARY KEY" if contype == "p" else "UNIQUE"
+                try:
+                    conn.execute(
+                        f"ALTER TABLE {self.table_name} ADD CONSTRAINT {name} {kind} USING INDEX {name}"
+                    )
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    errors.append(f"{name}: {e}")
+                    print(f"❌ Falha ao recriar a constraint {name}: {e}")
+            for name, definition in self.foreign_keys:
+                try:
+                    conn.execute(f"ALTER TABLE {self.table_name} ADD CONSTRAINT {name} {definition}")
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    errors.append(f"{name}: {e}")
+                    print(f"❌ Falha ao recriar a constraint {name}: {e}")
+        self.timings["rebuild"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with psycopg.connect(self.conn_str, autocommit=True) as conn:
+            conn.execute(f"ANALYZE {self.table_name}")
+        self.timings["analyze"] = time.perf_counter() - start
+        self.timings["total"] = sum(
+            self.timings.get(phase, 0.0) for phase in ("drop", "load", "rebuild", "analyze")
+        )
+
+        print(
+            f"🏗️ {self.table_name}: drop={self.timings['drop']:.2f}s, "
+            f"carga={self.timings.get('load', 0.0):.2f}s, "
+            f"rebuild={self.timings['rebuild']:.2f}s, analyze={self.timings['analyze']:.2f}s"
+        )
+        for name, seconds in sorted(self.index_timings.items(), key=lambda x: -x[1]):
+            print(f"   🔧 {name}: {seconds:.2f}s")
+        if errors:
+            raise RuntimeError(
+                f"{len(errors)} índices/constraints não foram recriados: " + "; ".join(errors)
+            )
+
+    def metrics(self):
+        """Tempos por fase e por índice, para os resultados dos benchmarks."""
+        return {
+            **self.timings,
+            "indexes": dict(self.index_timings),
+            "duplicates_removed": self.duplicates_removed,
+        }
+
+    # ------------------------------------------------------------------
+    def __enter__(self):
+        self.defer()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Recria mesmo se a carga falhou: a tabela não fica sem índices
+        self.restore()
+        return False
@@ -0,0 +1,200 @@
+"""
+Checkpoint das cargas: quais intervalos de membros do ZIP já foram commitados.
+
+Se uma execução cai no batch 14 de 20, recomeçar do offset 0 refaz todo o
+parse e reenvia tudo para o banco (o `ON CONFLICT DO NOTHING` só descarta
+no final). A tabela `etl_checkpoint` registra cada intervalo [start, end)
+carregado, identificado pelos nomes e CRC32 dos membros, e o txid da
+transação que o commitou. O registro é gravado na MESMA transação do COPY,
+então um intervalo aparece no checkpoint se e somente se os dados dele
+foram commitados.
+
+Ao retomar, os loaders pulam TODOS os intervalos commitados (não só os do
+início: uma execução que falhou no meio deixa buracos entre intervalos
+carregados) e carregam apenas os trechos não commitados. Um intervalo cuja
+assinatura não bate mais com o ZIP atual (arquivo trocado) é ignorado e
+recarregado.
+
+Nos loaders assíncronos cada chunk commita em transação própria e o batch
+só é registrado quando todos commitaram; um batch parcialmente carregado é
+reenviado por inteiro na retomada, então esses loaders usam staging + merge
+com ON CONFLICT DO NOTHING quando há checkpoint (as linhas já carregadas são
+descartadas no merge em vez de abortar o chunk na PK).
+"""
+
+import os
+import zlib
+
+import psycopg
+
+from etl_psycopg3 import DatabaseConnector
+from zip_index import ZipMemberIndex
+
+CHECKPOINT_TABLE = "etl_checkpoint"
+
+CREATE_CHECKPOINT_SQL = f"""
+CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} (
+    source TEXT NOT NULL,
+    target_table TEXT NOT NULL,
+    start_pos INTEGER NOT NULL,
+    end_pos INTEGER NOT NULL,
+    first_member TEXT NOT NULL,
+    last_member TEXT NOT NULL,
+    range_crc BIGINT NOT NULL,
+    rows_loaded INTEGER NOT NULL,
+    txid BIGINT NOT NULL,
+    committed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (source, target_table, start_pos, end_pos)
+);
+"""
+
+
+def range_signature(index: ZipMemberIndex, positions):
+    """
+    Identifica um intervalo de membros: (primeiro nome, último nome, CRC32
+    encadeado de "nome:crc" de todos os membros).
+    """
+    crc = 0
+    for pos in positions:
+        crc = zlib.crc32(f"{index.names[pos]}:{index.crcs[pos]}\n".encode("utf-8"), crc)
+    return index.names[positions[0]], index.names[positions[-1]], crc
+
+
+class CheckpointManifest:
+    """
+    Manifesto de intervalos commitados de um ZIP em uma tabela de destino.
+
+    Args:
+        index: Índice dos membros do ZIP (define as posições).
+        zip_path: Caminho do ZIP (o nome do arquivo identifica a origem).
+        target_table: Tabela carregada (ex.: "artigos_stg").
+        connector: DatabaseConnector (padrão: um novo).
+    """
+
+    def __init__(
+        self,
+        index: ZipMemberIndex,
+        zip_path,
+        target_table: str,
+        connector: DatabaseConnector | None = None,
+    ):
+        self.index = index
+        self.source = os.path.basename(zip_path)
+        self.target_table = target_table
+        self.connector = connector or DatabaseConnector()
+        self.connector.execute_sql(CREATE_CHECKPOINT_SQL)
+        # Intervalos commitados (disjuntos, ordenados), lidos em resume_offset
+        self._committed = []
+
+    def committed_ranges(self):
+        """Intervalos (start, end) commitados cuja assinatura ainda bate com o ZIP."""
+        with psycopg.connect(self.connector.conn_str) as conn:
+            rows = conn.execute(
+                f"SELECT start_pos, end_pos, first_member, last_member, range_crc "
+                f"FROM {CHECKPOINT_TABLE} WHERE source = %s AND target_table = %s "
+                "ORDER BY start_pos, end_pos",
+                (self.source, self.target_table),
+            ).fetchall()
+
+        valid = []
+        for start, end, first, last, crc in rows:
+            if end > len(self.index) or start >= end:
+                continue
+            if range_signature(self.index, range(start, end)) != (first, last, crc):
+                print(f"⚠️ Checkpoint [{start:,}:{end:,}] não corresponde ao ZIP atual (ignorado)")
+                continue
+            valid.append((start, end))
+        return valid
+
+    def resume_offset(self, offset: int = 0, number_of_files: int | None = None):
+        """
+        Primeira posição >= offset que não pertence a um intervalo commitado.
+        Lê os intervalos uma vez; os seguintes são pulados por `pending_span`.
+        """
+        merged = []
+        for start, end in self.committed_ranges():
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        self._committed = [(start, end) for start, end in merged]
+
+        position = self.pending_span(offset)[0]
+        committed = self.committed_count(offset, number_of_files)
+        if committed:
+            print(
+                f"⏩ Retomando de {position:,} "
+                f"({committed:,} arquivos já commitados em {self.target_table} serão pulados)"
+            )
+        return position
+
+    def committed_count(self, offset: int = 0, number_of_files: int | None = None):
+        """Membros de [offset, offset + number_of_files) já commitados (após resume_offset)."""
+        stop = len(self.index) if number_of_files is None else offset + number_of_files
+        return sum(
+            max(0, min(end, stop) - max(start, offset)) for start, end in self._committed
+        )
+
+    def pending_span(self, position: int):
+        """
+        (início, fim) do próximo trecho não commitado a partir de `position`:
+        início pula o intervalo commitado que contém `position`; fim é o
+        começo do próximo intervalo commitado (ou o fim do ZIP).
+        """
+        for start, end in self._committed:
+            if end <= position:
+                continue
+            if start <= position:
+                position = end
+                continue
+            return position, start
+        return position, len(self.index)
+
+    def record(self, cur, start: int, members: int, rows_loaded: int | None = None):
+        """
+        Registra [start, start + members) usando o cursor da transação da
+        carga (chamar antes do commit). `rows_loaded` pode ser menor que
+        `members` quando duplicatas do ZIP foram puladas.
+        """
+        if members <= 0:
+            return
+        if rows_loaded is None:
+            rows_loaded = members
+        positions = range(start, start + members)
+        first, last, crc = range_signature(self.index, positions)
+        cur.execute(
+            f"INSERT INTO {CHECKPOINT_TABLE} "
+            "(source, target_table, start_pos, end_pos, first_member, last_member, "
+            "range_crc, rows_loaded, txid) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, txid_current()) "
+            "ON CONFLICT (source, target_table, start_pos, end_pos) DO UPDATE SET "
+            "first_member = EXCLUDED.first_member, last_member = EXCLUDED.last_member, "
+            "range_crc = EXCLUDED.range_crc, rows_loaded = EXCLUDED.rows_loaded, "
+            "txid = EXCLUDED.txid, committed_at = CURRENT_TIMESTAMP",
+            (
+                self.source,
+                self.target_table,
+                positions.start,
+                positions.stop,
+                first,
+                last,
+                crc,
+                rows_loaded,
+            ),
+        )
+
+    def record_committed(self, start: int, members: int, rows_loaded: int | None = None):
+        """`record` em transação própria (cargas cujos chunks commitam separadamente)."""
+        with psycopg.connect(self.connector.conn_str) as conn:
+            with conn.cursor() as cur:
+                self.record(cur, start, members, rows_loaded)
+            conn.commit()
+
+    def reset(self):
+        """Apaga os checkpoints desta origem/tabela."""
+        with psycopg.connect(self.connector.conn_str) as conn:
+            conn.execute(
+                f"DELETE FROM {CHECKPOINT_TABLE} WHERE source = %s AND target_table = %s",
+                (self.source, self.target_table),
+            )
+            conn.commit()
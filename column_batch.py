@@ -0,0 +1,253 @@
+"""
+Batch colunar entre o parse e o COPY.
+
+Entre o ZIP e o banco, cada artigo passava por dict → modelo pydantic →
+tupla: para 30k artigos grandes, o overhead por objeto Python domina o RSS
+(ver memory_metrics dos benchmarks). `ColumnBatch` guarda o batch em
+colunas Arrow (strings contíguas em um buffer + offsets, sem um objeto por
+valor) e:
+- é uma sequência de tuplas (`len`, iteração em blocos, fatias zero-copy),
+  então os métodos de insert do `DatabaseConnector` que esperam tuplas o
+  aceitam como está;
+- gera o payload do COPY texto direto dos buffers (`iter_copy_blocks`):
+  escape, NULL e junção das colunas rodam no Arrow, sem tupla por linha;
+- informa o próprio tamanho (`nbytes`, `memory_footprint`).
+
+`ColumnBatchBuilder` monta o batch durante o parse convertendo a cada
+`flush_rows` linhas, para que só um bloco pequeno exista como objetos Python.
+
+Uso:
+    builder = ColumnBatchBuilder(ARTIGOS_STG_COLUMNS, ARTIGOS_STG_ARROW_TYPES)
+    for row in rows:
+        builder.append(row)
+    batch = builder.finish()
+    connector.copy_rows_stream("artigos_stg", batch.columns, batch)
+"""
+
+# Try to import pyarrow (optional)
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    HAS_ARROW = True
+except ImportError:
+    HAS_ARROW = False
+
+
+# Tipos de artigos_stg (body_text com offsets de 64 bits: corpos grandes)
+ARTIGOS_STG_ARROW_TYPES = (
+    {
+        "paper_id": pa.string(),
+        "file_name": pa.string(),
+        "title": pa.string(),
+        "body_text": pa.large_string(),
+        "created_at": pa.timestamp("us"),
+    }
+    if HAS_ARROW
+    else None
+)
+
+
+def _require_arrow():
+    if not HAS_ARROW:
+        raise ImportError("pyarrow não disponível. Instale: pip install pyarrow")
+
+
+class ColumnBatch:
+    """
+    Batch imutável de linhas em colunas Arrow.
+
+    Args:
+        table: pyarrow.Table com as colunas na ordem das tuplas.
+        row_block: Linhas convertidas por vez ao iterar como tuplas.
+    """
+
+    def __init__(self, table, row_block: int = 1000):
+        _require_arrow()
+        self.table = table
+        self.columns = tuple(table.column_names)
+        self.row_block = row_block
+
+    @classmethod
+    def from_rows(cls, columns, rows, types=None):
+        """Batch a partir de tuplas na ordem de `columns`."""
+        builder = ColumnBatchBuilder(columns, types)
+        for row in rows:
+            builder.append(row)
+        return builder.finish()
+
+    @classmethod
+    def from_arrow(cls, table, columns=None, constants=None):
+        """
+        Batch a partir de uma tabela Arrow (ex.: partição do CorpusCache,
+        memory-mapped). `constants` adiciona colunas com um valor só (ex.:
+        created_at do batch); `columns` fixa a ordem final.
+        """
+        _require_arrow()
+        for name, value in (constants or {}).items():
+            table = table.append_column(name, pa.repeat(pa.scalar(value), table.num_rows))
+        if columns is not None:
+            table = table.select(list(columns))
+        return cls(table)
+
+    # ------------------------------------------------------------------
+    # Sequência de tuplas
+    def __len__(self):
+        return self.table.num_rows
+
+    def __iter__(self):
+        for record_batch in self.table.to_batches(max_chunksize=self.row_block):
+            values = [column.to_pylist() for column in record_batch.columns]
+            yield from zip(*values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return self.take(range(start, stop, step))
+            return ColumnBatch(self.table.slice(start, max(0, stop - start)), self.row_block)
+        if index < 0:
+            index += len(self)
+        return tuple(column[index].as_py() for column in self.table.columns)
+
+    def take(self, indices):
+        """Linhas nas posições `indices` (cópia; usada pelo particionamento LPT)."""
+        return ColumnBatch(self.table.take(pa.array(indices, type=pa.int64())), self.row_block)
+
+    def column(self, name):
+        """Valores de uma coluna como lista Python."""
+        return self.table.column(name).to_pylist()
+
+    # ------------------------------------------------------------------
+    # Tamanhos
+    @property
+    def nbytes(self):
+        """Bytes dos buffers Arrow referenciados pelo batch."""
+        return self.table.nbytes
+
+    def row_nbytes(self):
+        """Comprimento somado dos campos texto de cada linha (mesma medida de `row_nbytes`)."""
+        total = None
+        for column in self.table.columns:
+            if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+                lengths = pc.utf8_length(column)
+            elif pa.types.is_binary(column.type) or pa.types.is_large_binary(column.type):
+                lengths = pc.binary_length(column)
+            else:
+                continue
+            lengths = pc.fill_null(lengths, 0)
+            total = lengths if total is None else pc.add(total, lengths)
+        if total is None:
+            return [0] * len(self)
+        return total.to_pylist()
+
+    def text_nbytes(self):
+        """Soma de `row_nbytes` do batch inteiro."""
+        return sum(self.row_nbytes())
+
+    def memory_footprint(self):
+        """Tamanho do batch para as métricas dos benchmarks."""
+        rows = len(self)
+        return {
+            "rows": rows,
+            "columns": len(self.columns),
+            "nbytes": self.nbytes,
+            "bytes_per_row": self.nbytes / rows if rows else 0.0,
+            "text_bytes": self.text_nbytes(),
+        }
+
+    # ------------------------------------------------------------------
+    # COPY texto a partir das colunas
+    @staticmethod
+    def _copy_text_column(column):
+        """Coluna no formato texto do COPY: escapes, NULL → \\N, tudo como large_string."""
+        if pa.types.is_boolean(column.type):
+            column = pc.if_else(column, "t", "f")
+        elif pa.types.is_timestamp(column.type) and column.type.tz is not None:
+            column = pc.cast(column, pa.timestamp(column.type.unit))
+        column = pc.cast(column, pa.large_string())
+        # Barra invertida primeiro, como em etl_psycopg3.copy_text_field
+        for char, escaped in (("\\", "\\\\"), ("\t", "\\t"), ("\n", "\\n"), ("\r", "\\r")):
+            column = pc.replace_substring(column, char, escaped)
+        return pc.fill_null(column, "\\N")
+
+    def iter_copy_blocks(self, block_bytes: int = 1024 * 1024):
+        """
+        Payload do `COPY ... FROM STDIN` (formato texto) em blocos de
+        ~block_bytes, lidos direto do buffer Arrow das linhas já montadas
+        (o protocolo do COPY aceita blocos que cortam linhas).
+        """
+        tab = pa.scalar("\t", pa.large_string())
+        newline = pa.scalar("\n", pa.large_string())
+        empty = pa.scalar("", pa.large_string())
+        for record_batch in self.table.to_batches(max_chunksize=max(self.row_block, 10000)):
+            if record_batch.num_rows == 0:
+                continue
+            fields = [self._copy_text_column(column) for column in record_batch.columns]
+            lines = pc.binary_join_element_wise(*fields, tab)
+            lines = pc.binary_join_element_wise(lines, empty, newline)
+            # Buffers de uma large_string: validade, offsets int64, dados
+            _, offsets, data = lines.buffers()
+            offsets = memoryview(offsets).cast("q")
+            start, end = offsets[lines.offset], offsets[lines.offset + len(lines)]
+            for block_start in range(start, end, block_bytes):
+                yield memoryview(data.slice(block_start, min(block_bytes, end - block_start)))
+
+
+class ColumnBatchBuilder:
+    """
+    Acumula tuplas e converte para Arrow a cada `flush_rows` linhas.
+
+    Args:
+        columns: Nomes das colunas, na ordem das tuplas.
+        types: Dict coluna → tipo Arrow (padrão: inferido do primeiro bloco).
+        flush_rows: Linhas mantidas como objetos Python antes de converter.
+    """
+
+    def __init__(self, columns, types=None, flush_rows: int = 1000):
+        _require_arrow()
+        self.columns = tuple(columns)
+        self.types = dict(types) if types else None
+        self.flush_rows = flush_rows
+        self._values = [[] for _ in self.columns]
+        self._pending = 0
+        self._batches = []
+
+    def append(self, row):
+        for values, value in zip(self._values, row):
+            values.append(value)
+        self._pending += 1
+        if self._pending >= self.flush_rows:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        if self.types is None:
+            arrays = [pa.array(values) for values in self._values]
+            # Coluna toda nula no primeiro bloco: assume texto
+            self.types = {
+                name: pa.string() if pa.types.is_null(array.type) else array.type
+                for name, array in zip(self.columns, arrays)
+            }
+        arrays = [
+            pa.array(values, type=self.types[name]) for name, values in zip(self.columns, self._values)
+        ]
+        self._batches.append(pa.RecordBatch.from_arrays(arrays, names=list(self.columns)))
+        self._values = [[] for _ in self.columns]
+        self._pending = 0
+
+    def __len__(self):
+        return sum(b.num_rows for b in self._batches) + self._pending
+
+    def finish(self) -> ColumnBatch:
+        self._flush()
+        if self._batches:
+            table = pa.Table.from_batches(self._batches)
+        else:
+            schema = pa.schema(
+                [(name, (self.types or {}).get(name, pa.string())) for name in self.columns]
+            )
+            table = schema.empty_table()
+        self._batches = []
+        return ColumnBatch(table)
@@ -0,0 +1,41 @@
+"""
+COPY texto x COPY binário nos mesmos batches do ZIP.
+
+Lê `COPY_BENCH_FILES` artigos uma única vez e carrega as mesmas tuplas
+com cada formato (ver `DatabaseConnector.compare_copy_formats`), para
+isolar o custo de escape no cliente + parse de texto no servidor.
+
+Uso:
+    COPY_BENCH_FILES=5000 python copy_format_benchmark.py
+Resultados em sync_result/copy_formats.json
+"""
+
+import json
+import os
+
+from etl_psycopg3 import DatabaseConnector
+from fetch_db import ZipFileAnalyzer
+from schemas import ARTIGOS_STG_COLUMNS
+
+zip_path = os.getenv("DATASET_PATH", "/Users/raphaelportela/datasetcovid.zip")
+
+
+if __name__ == "__main__":
+    number_of_files = int(os.getenv("COPY_BENCH_FILES", "5000"))
+    repeats = int(os.getenv("COPY_BENCH_REPEATS", "3"))
+
+    analyzer = ZipFileAnalyzer(zip_path)
+    rows = list(analyzer.iter_article_rows(number_of_files))
+    analyzer.close()
+
+    connector = DatabaseConnector()
+    results = connector.compare_copy_formats(
+        "artigos_stg", ARTIGOS_STG_COLUMNS, rows, repeats=repeats
+    )
+    if results["text"]["seconds"] > 0:
+        speedup = results["text"]["seconds"] / results["binary"]["seconds"]
+        print(f"⚡ Binário/texto: {speedup:.2f}x")
+
+    os.makedirs("sync_result", exist_ok=True)
+    with open(os.path.join("sync_result", "copy_formats.json"), "w", encoding="utf-8") as f:
+        json.dump({"files": len(rows), "repeats": repeats, "results": results}, f, indent=2)
@@ -0,0 +1,327 @@
+"""
+Cache colunar (Arrow IPC / Parquet) do corpus CORD-19 já extraído.
+
+O ZIP não muda entre execuções, mas todo benchmark/recarga descomprime e
+decodifica os JSONs de novo. O passo "materialize" faz isso uma única vez
+e grava os artigos (e opcionalmente os parágrafos) em partições de
+`partition_files` membros do ZIP. Os loaders passam a ler as partições
+memory-mapped, sem descompressão nem parse de JSON.
+
+Uso:
+    python corpus_cache.py            # materializa a partir de DATASET_PATH
+    python corpus_cache.py --paragraphs
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from column_batch import ColumnBatch
+from json_extract import PartialJSONExtractor
+from schemas import ARTIGOS_STG_COLUMNS, artigo_staging_row
+from zip_index import CACHE_DIR, ZipMemberIndex, zip_fingerprint
+
+# Try to import pyarrow (optional)
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+
+    HAS_ARROW = True
+except ImportError:
+    HAS_ARROW = False
+
+# Caminhos lidos na materialização (section só é usado pelos parágrafos)
+MATERIALIZE_PATHS = (
+    "paper_id",
+    "metadata.title",
+    "body_text.*.text",
+    "body_text.*.section",
+)
+
+# Colunas de artigos gravadas no cache (created_at é gerado na leitura)
+ARTICLE_FIELDS = ("paper_id", "file_name", "title", "body_text")
+PARAGRAPH_FIELDS = ("member_position", "paper_id", "paragraph_index", "section", "text")
+
+
+def _article_schema():
+    return pa.schema(
+        [
+            ("paper_id", pa.string()),
+            ("file_name", pa.string()),
+            ("title", pa.string()),
+            ("body_text", pa.large_string()),
+        ]
+    )
+
+
+def _paragraph_schema():
+    return pa.schema(
+        [
+            ("member_position", pa.int64()),
+            ("paper_id", pa.string()),
+            ("paragraph_index", pa.int32()),
+            ("section", pa.string()),
+            ("text", pa.large_string()),
+        ]
+    )
+
+
+class CorpusCache:
+    """
+    Partições colunares do corpus, invalidadas pelo tamanho/mtime do ZIP.
+
+    Args:
+        zip_path: Caminho do ZIP do CORD-19.
+        cache_dir: Diretório base (padrão: ETL_CACHE_DIR).
+        fmt: "arrow" (IPC, leitura zero-copy via memory map) ou "parquet"
+            (menor em disco, exige decodificação na leitura).
+    """
+
+    def __init__(self, zip_path, cache_dir=None, fmt: str = "arrow"):
+        if not HAS_ARROW:
+            raise ImportError("pyarrow not available. Install: pip install pyarrow")
+        self.zip_path = zip_path
+        self.fmt = fmt
+        self.root = os.path.join(
+            cache_dir or CACHE_DIR, f"{os.path.basename(zip_path)}.corpus.{fmt}"
+        )
+        self.manifest_path = os.path.join(self.root, "manifest.json")
+        self._manifest = None
+        # Artigos sem paper_id descartados na leitura (ver `_article_table`)
+        self.invalid_rows = 0
+
+    # ------------------------------------------------------------------
+    @property
+    def manifest(self):
+        if self._manifest is None and os.path.exists(self.manifest_path):
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                self._manifest = json.load(f)
+        return self._manifest
+
+    def is_valid(self, include_paragraphs: bool = False):
+        """True se o cache existe e corresponde ao ZIP atual."""
+        manifest = self.manifest
+        if not manifest:
+            return False
+        size, mtime_ns = zip_fingerprint(self.zip_path)
+        if manifest["zip_size"] != size or manifest["zip_mtime_ns"] != mtime_ns:
+            return False
+        return manifest["paragraphs"] or not include_paragraphs
+
+    def __len__(self):
+        return self.manifest["total_files"] if self.manifest else 0
+
+    # ------------------------------------------------------------------
+    def materialize(
+        self,
+        index: ZipMemberIndex,
+        zip_file,
+        partition_files: int = 10000,
+        include_paragraphs: bool = False,
+    ):
+        """
+        Lê todos os JSONs uma vez e grava as partições + manifest.
+
+        Args:
+            index: Índice dos membros do ZIP (a posição define a ordem das linhas).
+            zip_file: ZipFile aberto (ex.: `ZipFileAnalyzer.zip_file`).
+            partition_files: Membros do ZIP por partição.
+            include_paragraphs: Também grava um arquivo de parágrafos por partição.
+        """
+        print(f"📦 Materializando cache colunar em {self.root} ...")
+        start_time = time.perf_counter()
+        os.makedirs(self.root, exist_ok=True)
+        extractor = PartialJSONExtractor(paths=MATERIALIZE_PATHS)
+        size, mtime_ns = zip_fingerprint(self.zip_path)
+        partitions = []
+
+        for part_no, start in enumerate(range(0, len(index), partition_files)):
+            positions = index.positions(start, partition_files)
+            articles = {field: [] for field in ARTICLE_FIELDS}
+            paragraphs = {field: [] for field in PARAGRAPH_FIELDS}
+
+            for position in positions:
+                name = index.names[position]
+                with zip_file.open(index.zipinfo(position)) as f:
+                    data = extractor.load(f)
+                row = artigo_staging_row(data, name, None)
+                for field, value in zip(ARTICLE_FIELDS, row):
+                    articles[field].append(value)
+                if include_paragraphs:
+                    for i, p in enumerate(data.get("body_text", [])):
+                        paragraphs["member_position"].append(position)
+                        paragraphs["paper_id"].append(row[0])
+                        paragraphs["paragraph_index"].append(i)
+                        paragraphs["section"].append(p.get("section"))
+                        paragraphs["text"].append(p.get("text"))
+
+            entry = {
+                "start": positions.start,
+                "end": positions.stop,
+                "articles": self._write(
+                    f"articles-{part_no:05d}",
+                    pa.Table.from_pydict(articles, schema=_article_schema()),
+                ),
+            }
+            if include_paragraphs:
+                entry["paragraphs"] = self._write(
+                    f"paragraphs-{part_no:05d}",
+                    pa.Table.from_pydict(paragraphs, schema=_paragraph_schema()),
+                )
+            partitions.append(entry)
+            print(f"   🧱 Partição {part_no}: membros [{positions.start:,}:{positions.stop:,}]")
+
+        self._manifest = {
+            "zip_size": size,
+            "zip_mtime_ns": mtime_ns,
+            "format": self.fmt,
+            "partition_files": partition_files,
+            "total_files": len(index),
+            "paragraphs": include_paragraphs,
+            "partitions": partitions,
+        }
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+        duration = time.perf_counter() - start_time
+        print(
+            f"✅ Cache materializado: {len(index):,} arquivos em {len(partitions)} "
+            f"partições ({duration:.2f}s)"
+        )
+        return self._manifest
+
+    def _write(self, stem, table):
+        if self.fmt == "parquet":
+            file_name = f"{stem}.parquet"
+            pq.write_table(table, os.path.join(self.root, file_name))
+        else:
+            file_name = f"{stem}.arrow"
+            with pa.OSFile(os.path.join(self.root, file_name), "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+        return file_name
+
+    # ------------------------------------------------------------------
+    def _read(self, file_name):
+        """Lê uma partição memory-mapped (zero-copy no formato Arrow IPC)."""
+        path = os.path.join(self.root, file_name)
+        if self.fmt == "parquet":
+            return pq.read_table(path, memory_map=True)
+        return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+    def read_table(self, offset=0, number_of_files=None, kind: str = "articles"):
+        """
+        Tabela Arrow das posições [offset, offset + number_of_files).
+        `kind="paragraphs"` retorna os parágrafos dos mesmos membros.
+        """
+        end = self.manifest["total_files"] if not number_of_files else offset + number_of_files
+        tables = []
+        for part in self.manifest["partitions"]:
+            if part["end"] <= offset or part["start"] >= end:
+                continue
+            table = self._read(part[kind])
+            if kind == "articles":
+                # Uma linha por membro: a posição no ZIP é o índice da linha
+                lo = max(offset, part["start"]) - part["start"]
+                hi = min(end, part["end"]) - part["start"]
+                table = table.slice(lo, hi - lo)
+            elif offset > part["start"] or end < part["end"]:
+                positions = table.column("member_position")
+                table = table.filter(
+                    pc.and_(
+                        pc.greater_equal(positions, offset), pc.less(positions, end)
+                    )
+                )
+            tables.append(table)
+        if not tables:
+            schema = _article_schema() if kind == "articles" else _paragraph_schema()
+            return schema.empty_table()
+        return pa.concat_tables(tables)
+
+    def _article_table(self, number_of_files, offset=0, skip=frozenset()):
+        """
+        Artigos das posições do slice, sem as posições em `skip` e sem os
+        membros sem paper_id (PK de artigos_stg: abortariam o COPY).
+        """
+        table = self.read_table(offset, number_of_files)
+        skipped = [p - offset for p in skip if offset <= p < offset + table.num_rows]
+        if skipped:
+            keep = [True] * table.num_rows
+            for i in skipped:
+                keep[i] = False
+            table = table.filter(pa.array(keep))
+        paper_id = table.column("paper_id")
+        has_id = pc.fill_null(pc.not_equal(paper_id, ""), False)
+        invalid = table.num_rows - pc.sum(has_id).as_py() if table.num_rows else 0
+        if invalid:
+            print(
+                f"⚠️ {invalid:,} artigos sem paper_id ignorados em "
+                f"[{offset:,}:{offset + number_of_files:,}]"
+            )
+            self.invalid_rows += invalid
+            table = table.filter(has_id)
+        return table
+
+    def read_batch(self, number_of_files, offset=0, created_at=None, skip=frozenset()):
+        """
+        Slice do cache como ColumnBatch (ordem de ARTIGOS_STG_COLUMNS): as
+        colunas continuam nos buffers memory-mapped, sem tupla por linha.
+        """
+        table = self._article_table(number_of_files, offset, skip)
+        return ColumnBatch.from_arrow(
+            table, ARTIGOS_STG_COLUMNS, {"created_at": created_at or datetime.now()}
+        )
+
+    def iter_rows(
+        self,
+        number_of_files,
+        offset=0,
+        created_at=None,
+        batch_rows: int = 1000,
+        stats=None,
+        skip=frozenset(),
+    ):
+        """
+        Gera tuplas de artigos_stg (ordem de ARTIGOS_STG_COLUMNS) a partir do
+        cache, convertendo no máximo `batch_rows` linhas por vez.
+
+        `stats` (opcional) recebe "files" e "parse_time", como em
+        `ZipFileAnalyzer.iter_article_rows`. Posições em `skip` (duplicatas
+        no ZIP) são filtradas.
+        """
+        if stats is None:
+            stats = {}
+        stats.setdefault("files", 0)
+        stats.setdefault("parse_time", 0.0)
+        created_at = created_at or datetime.now()
+
+        read_start = time.perf_counter()
+        table = self._article_table(number_of_files, offset, skip)
+        stats["parse_time"] += time.perf_counter() - read_start
+
+        for batch in table.to_batches(max_chunksize=batch_rows):
+            read_start = time.perf_counter()
+            columns = [batch.column(field).to_pylist() for field in ARTICLE_FIELDS]
+            rows = [(*values, created_at) for values in zip(*columns)]
+            stats["parse_time"] += time.perf_counter() - read_start
+            stats["files"] += len(rows)
+            yield from rows
+
+
+if __name__ == "__main__":
+    import zipfile
+
+    dataset_path = os.getenv("DATASET_PATH", "/Users/raphaelportela/datasetcovid.zip")
+    cache = CorpusCache(dataset_path, fmt=os.getenv("CORPUS_CACHE_FORMAT", "arrow"))
+    with zipfile.ZipFile(dataset_path, "r") as z:
+        cache.materialize(
+            ZipMemberIndex.load(dataset_path),
+            z,
+            include_paragraphs="--paragraphs" in sys.argv,
+        )
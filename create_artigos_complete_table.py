@@ -7,15 +7,22 @@ Baseado no diagrama: JOIN ON cord_uid = paper_id
 
 import os
 import psycopg
+from bulk_load import DeferredIndexes
 from etl_psycopg3 import get_connection_string
 
 
-def create_artigos_complete_table():
+def create_artigos_complete_table(bulk_load: bool = False):
     """
     Cria a tabela artigos_complete com todas as colunas de ambas as tabelas staging.
     A junção é feita com: metadata_staging.cord_uid = artigos_staging.paper_id
+
+    Com `bulk_load=True` os índices (inclusive os GIN de full-text) e as
+    constraints são removidos antes do INSERT...SELECT e recriados depois,
+    com manutenção paralela + ANALYZE (ver bulk_load.py). Retorna os tempos
+    de cada fase nesse modo.
     """
     conn_str = get_connection_string()
+    bulk_metrics = None
     
     print("=" * 70)
     print("📊 CRIANDO TABELA artigos_complete")
@@ -173,7 +180,7 @@ def create_artigos_complete_table():
                     print("       created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
                     print("   );")
                     print()
-                    print("   Para criar metadata_staging, veja main_etl.py")
+                    print("   Para criar e carregar metadata_staging: python metadata_loader.py")
                     return
                 
                 # Verificar quantos registros existem em cada tabela
@@ -191,9 +198,21 @@ def create_artigos_complete_table():
                 if artigos_count > 0 and metadata_count > 0:
                     print("🔄 Populando tabela artigos_complete com JOIN...")
                     print("   (Isso pode levar alguns minutos dependendo do tamanho dos dados)")
-                    cur.execute(populate_table_sql)
-                    inserted_count = cur.rowcount
-                    conn.commit()
+                    if bulk_load:
+                        # Sem a PK durante a carga: sem árbitro para ON CONFLICT.
+                        # As chaves repetidas são removidas antes de recriá-la.
+                        with DeferredIndexes("artigos_complete", conn_str) as deferred:
+                            cur.execute(
+                                populate_table_sql.replace("ON CONFLICT (paper_id) DO NOTHING", "")
+                            )
+                            inserted_count = cur.rowcount
+                            conn.commit()
+                        inserted_count -= deferred.duplicates_removed
+                        bulk_metrics = deferred.metrics()
+                    else:
+                        cur.execute(populate_table_sql)
+                        inserted_count = cur.rowcount
+                        conn.commit()
                     print(f"✅ {inserted_count:,} registros inseridos em artigos_complete!")
                 else:
                     print("⚠️  Tabelas staging estão vazias. Execute o ETL primeiro.")
@@ -220,6 +239,8 @@ def create_artigos_complete_table():
                     print(f"   Com abstract: {stats[1]:,}")
                     print(f"   Com authors: {stats[2]:,}")
                     print(f"   Com journal: {stats[3]:,}")
+
+        return bulk_metrics
                 
     except psycopg.Error as e:
         print(f"❌ Erro ao criar tabela: {e}")
@@ -299,7 +320,8 @@ if __name__ == "__main__":
     response = input("Deseja criar a tabela artigos_complete? (s/n): ")
     
     if response.lower() in ['s', 'sim', 'y', 'yes']:
-        create_artigos_complete_table()
+        # BULK_LOAD=1: índices/constraints recriados só depois da carga
+        create_artigos_complete_table(bulk_load=os.getenv("BULK_LOAD") == "1")
     else:
         print("Operação cancelada.")
 
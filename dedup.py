@@ -0,0 +1,267 @@
+"""
+Filtro de duplicatas no cliente (paper_id já carregados).
+
+`insert_optimized_single_transaction2` fazia `SELECT paper_id FROM tabela`
+a cada batch e montava um set com todos os ids: custo que cresce junto com
+a tabela. `IdFilter` é semeado UMA vez da tabela (cursor server-side) e
+atualizado após cada commit:
+
+- Bloom filter (bits em numpy): descarta ids novos sem tocar no conjunto
+  exato — a grande maioria no caso de uma carga incremental;
+- array ordenado de ids (exato) + set dos ids recentes: confirma os
+  positivos do Bloom (busca binária), sem falsos positivos.
+
+O set recente é fundido no array ordenado quando passa de 1/4 do array,
+então o custo por id inserido é O(1) amortizado e o filtro de cada batch
+custa ~O(batch × log n), praticamente constante com o tamanho da tabela.
+
+`ZipDuplicates` resolve as duplicatas DENTRO do ZIP (o mesmo paper_id em
+mais de um membro, ex.: variantes pdf_json e pmc_json) antes de qualquer
+parse/insert: uma pré-varredura lê só o início de cada membro para obter o
+paper_id, e uma regra de preferência escolhe qual membro fica.
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import time
+
+import numpy as np
+import psycopg
+
+from json_extract import PartialJSONExtractor
+from zip_index import CACHE_DIR, ZipMemberIndex, zip_fingerprint
+
+
+def _hash_pair(key: bytes):
+    digest = hashlib.blake2b(key, digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+
+class IdFilter:
+    """
+    Conjunto de ids com pré-filtro Bloom.
+
+    Args:
+        ids: Ids iniciais (iterável de str).
+        capacity: Número de ids esperado (dimensiona o Bloom filter).
+        fp_rate: Taxa de falso positivo alvo do Bloom filter.
+    """
+
+    def __init__(self, ids=(), capacity: int = 1_000_000, fp_rate: float = 0.01):
+        encoded = [i.encode("utf-8") for i in ids if i]
+        self.fp_rate = fp_rate
+        self._sorted = np.unique(np.array(encoded, dtype=bytes)) if encoded else np.array([], dtype="S1")
+        self._recent = set()
+        self._init_bloom(max(capacity, 2 * len(self._sorted), 1024))
+        self._bloom_add(self._sorted)
+        self.stats = {"checked": 0, "bloom_negative": 0, "duplicates": 0}
+
+    def __len__(self):
+        return len(self._sorted) + len(self._recent)
+
+    # ------------------------------------------------------------------
+    def _init_bloom(self, capacity):
+        # m = -n ln(p) / ln(2)^2, k = m/n ln(2)
+        self.capacity = capacity
+        m = int(-capacity * math.log(self.fp_rate) / (math.log(2) ** 2))
+        self.n_bits = max(8, m)
+        self.n_hashes = max(1, round(self.n_bits / capacity * math.log(2)))
+        self._bits = np.zeros((self.n_bits + 7) // 8, dtype=np.uint8)
+        self._bloom_count = 0
+
+    def _bit_positions(self, keys):
+        """Posições (len(keys) × k) via double hashing h1 + i·h2."""
+        pairs = np.array([_hash_pair(bytes(k)) for k in keys], dtype=np.uint64).reshape(-1, 2)
+        steps = np.arange(self.n_hashes, dtype=np.uint64)
+        positions = pairs[:, :1] + steps * pairs[:, 1:]  # overflow uint64 = mod 2^64
+        return positions % np.uint64(self.n_bits)
+
+    def _bloom_add(self, keys):
+        if len(keys) == 0:
+            return
+        positions = self._bit_positions(keys).ravel()
+        np.bitwise_or.at(
+            self._bits,
+            (positions >> np.uint64(3)).astype(np.int64),
+            (np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8)),
+        )
+        self._bloom_count += len(keys)
+
+    def _bloom_contains(self, keys):
+        positions = self._bit_positions(keys)
+        bytes_ = self._bits[(positions >> np.uint64(3)).astype(np.int64)]
+        bits = (bytes_ >> (positions & np.uint64(7)).astype(np.uint8)) & 1
+        return bits.all(axis=1)
+
+    def _compact(self):
+        """Funde os ids recentes no array ordenado (e redimensiona o Bloom se lotou)."""
+        if self._recent:
+            recent = np.array(list(self._recent), dtype=bytes)
+            self._sorted = np.union1d(self._sorted, recent)
+            self._recent = set()
+        if len(self._sorted) > self.capacity:
+            self._init_bloom(2 * len(self._sorted))
+            self._bloom_add(self._sorted)
+
+    # ------------------------------------------------------------------
+    def contains_many(self, ids):
+        """Array bool: True para ids já presentes (exato, sem falsos positivos)."""
+        n = len(ids)
+        result = np.zeros(n, dtype=bool)
+        if n == 0:
+            return result
+        keys = [i.encode("utf-8") for i in ids]
+        maybe = self._bloom_contains(keys)
+        self.stats["checked"] += n
+        self.stats["bloom_negative"] += int(n - maybe.sum())
+
+        candidates = np.flatnonzero(maybe)
+        if candidates.size and len(self._sorted):
+            probe = np.array([keys[i] for i in candidates], dtype=self._sorted.dtype)
+            # ids mais longos que o array nunca foram inseridos nele
+            fits = np.array([len(keys[i]) <= self._sorted.itemsize for i in candidates])
+            slots = np.searchsorted(self._sorted, probe)
+            slots = np.minimum(slots, len(self._sorted) - 1)
+            result[candidates] = fits & (self._sorted[slots] == probe)
+        for i in candidates:
+            if not result[i] and keys[i] in self._recent:
+                result[i] = True
+        self.stats["duplicates"] += int(result.sum())
+        return result
+
+    def add_many(self, ids):
+        """Registra ids commitados."""
+        keys = [i.encode("utf-8") for i in ids if i]
+        if not keys:
+            return
+        self._recent.update(keys)
+        self._bloom_add(keys)
+        if len(self._recent) > max(10_000, len(self._sorted) // 4):
+            self._compact()
+
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_table(cls, conn_str, table_name, column="paper_id", fetch_size=50_000, fp_rate=0.01):
+        """Semeia com os ids da tabela (cursor server-side, lido em blocos)."""
+        start = time.perf_counter()
+        ids = []
+        with psycopg.connect(conn_str) as conn:
+            with conn.cursor(name=f"seed_{table_name}_ids") as cur:
+                cur.itersize = fetch_size
+                cur.execute(f"SELECT {column} FROM {table_name}")
+                for (value,) in cur:
+                    ids.append(value)
+        instance = cls(ids, capacity=max(1_000_000, 2 * len(ids)), fp_rate=fp_rate)
+        print(
+            f"🧮 Filtro de ids semeado com {len(instance):,} {column} de '{table_name}' "
+            f"em {time.perf_counter() - start:.2f}s"
+        )
+        return instance
+
+
+# Bytes lidos do início de cada membro (paper_id é a 1ª chave no CORD-19)
+_HEAD_BYTES = 512
+_PAPER_ID = re.compile(rb'"paper_id"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+# Regras de preferência: entre membros com o mesmo paper_id fica o de maior chave.
+# file_size (JSON descomprimido) é o proxy de tamanho do corpo, sem parse.
+DUPLICATE_RULES = {
+    "pmc": lambda index, pos: ("pmc_json" in index.names[pos], index.file_sizes[pos], -pos),
+    "longest": lambda index, pos: (index.file_sizes[pos], -pos),
+    "first": lambda index, pos: (-pos,),
+}
+
+
+def read_paper_id(zip_file, info):
+    """paper_id de um membro lendo só o início descomprimido (fallback: extração parcial)."""
+    with zip_file.open(info) as f:
+        match = _PAPER_ID.search(f.read(_HEAD_BYTES))
+    if match:
+        return json.loads(b'"' + match.group(1) + b'"')
+    with zip_file.open(info) as f:
+        return PartialJSONExtractor(paths=("paper_id",)).load(f).get("paper_id")
+
+
+class ZipDuplicates:
+    """
+    Membros do ZIP a pular por repetirem um paper_id já coberto por outro membro.
+
+    Args:
+        index: Índice dos membros do ZIP.
+        paper_ids: paper_id de cada posição do índice.
+        rule: Chave de DUPLICATE_RULES ("pmc", "longest" ou "first").
+    """
+
+    def __init__(self, index: ZipMemberIndex, paper_ids, rule: str = "pmc"):
+        if rule not in DUPLICATE_RULES:
+            raise ValueError(f"Regra de duplicatas inválida: {rule} ({', '.join(DUPLICATE_RULES)})")
+        self.rule = rule
+        key = DUPLICATE_RULES[rule]
+        winners = {}
+        for pos, paper_id in enumerate(paper_ids):
+            if not paper_id:
+                continue
+            best = winners.get(paper_id)
+            if best is None or key(index, pos) > key(index, best):
+                winners[paper_id] = pos
+        self.skip = frozenset(
+            pos
+            for pos, paper_id in enumerate(paper_ids)
+            if paper_id and winners[paper_id] != pos
+        )
+        # paper_ids presentes em mais de um membro
+        self.duplicated_ids = len({paper_ids[pos] for pos in self.skip})
+
+    def skipped_in(self, positions):
+        """Quantos membros do range serão pulados."""
+        if not self.skip:
+            return 0
+        return sum(1 for pos in positions if pos in self.skip)
+
+    # ------------------------------------------------------------------
+    @staticmethod
+    def cache_path(zip_path, cache_dir=None):
+        return os.path.join(
+            cache_dir or CACHE_DIR, f"{os.path.basename(zip_path)}.paper_ids.json"
+        )
+
+    @classmethod
+    def scan(cls, index: ZipMemberIndex, zip_file):
+        """Pré-varredura: paper_id de cada membro, na ordem do índice."""
+        start = time.perf_counter()
+        paper_ids = [read_paper_id(zip_file, index.zipinfo(pos)) for pos in range(len(index))]
+        print(
+            f"🔎 Pré-varredura de paper_id: {len(paper_ids):,} membros em "
+            f"{time.perf_counter() - start:.2f}s"
+        )
+        return paper_ids
+
+    @classmethod
+    def load(cls, index: ZipMemberIndex, zip_file, rule: str = "pmc", cache_dir=None):
+        """Usa os paper_ids em cache (invalidado pelo tamanho/mtime do ZIP) ou varre o ZIP."""
+        cache_path = cls.cache_path(index.zip_path, cache_dir)
+        size, mtime_ns = zip_fingerprint(index.zip_path)
+        paper_ids = None
+        if os.path.exists(cache_path):
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("zip_size") == size and cached.get("zip_mtime_ns") == mtime_ns:
+                paper_ids = cached["paper_ids"]
+
+        if paper_ids is None or len(paper_ids) != len(index):
+            paper_ids = cls.scan(index, zip_file)
+            os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+            tmp_path = f"{cache_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"zip_size": size, "zip_mtime_ns": mtime_ns, "paper_ids": paper_ids}, f)
+            os.replace(tmp_path, cache_path)
+
+        duplicates = cls(index, paper_ids, rule=rule)
+        print(
+            f"🧬 Duplicatas no ZIP (regra '{rule}'): {duplicates.duplicated_ids:,} paper_ids "
+            f"repetidos, {len(duplicates.skip):,} membros serão pulados antes do parse"
+        )
+        return duplicates
@@ -4,21 +4,34 @@ Demonstrates performance optimizations for your thesis
 """
 
 import asyncio
+import contextlib
+import heapq
+import math
 import os
+import queue
+import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime
 
 import psycopg
 from pydantic import BaseModel
 from more_itertools import chunked
 
+from column_batch import ColumnBatch
+from dedup import IdFilter
+from schemas import copy_types as model_copy_types
+from schemas import row_encoder
+
 # Try to import ConnectionPool (optional)
 try:
-    from psycopg_pool import ConnectionPool
+    from psycopg_pool import AsyncConnectionPool, ConnectionPool, PoolTimeout
 
     HAS_POOL = True
+    TRANSIENT_ERRORS = (psycopg.OperationalError, PoolTimeout)
 except ImportError:
     HAS_POOL = False
+    TRANSIENT_ERRORS = (psycopg.OperationalError,)
     print("⚠️  psycopg_pool not available. Install with: pip install psycopg[pool]")
 
 # Connection string - supports environment variables for Docker/cloud deployment
@@ -38,10 +51,257 @@ def get_connection_string():
 CONN_STRING = get_connection_string()
 
 
+def row_nbytes(row) -> int:
+    """Tamanho aproximado de uma tupla: soma do comprimento dos campos texto/bytes."""
+    return sum(len(v) for v in row if isinstance(v, (str, bytes)))
+
+
+def model_rows(data_model_list):
+    """
+    (colunas, tuplas) de uma lista de modelos do mesmo tipo via
+    `schemas.RowEncoder` (ordem e renome text→content resolvidos por modelo).
+    Um `ColumnBatch` já é uma sequência de tuplas e passa direto.
+    """
+    if isinstance(data_model_list, ColumnBatch):
+        return list(data_model_list.columns), data_model_list
+    encoder = row_encoder(type(data_model_list[0]))
+    return list(encoder.columns), encoder.encode(data_model_list)
+
+
+def is_transient(exc) -> bool:
+    """
+    Erros que não dependem das linhas enviadas: conexão perdida, deadlock,
+    falha de serialização, lock/statement timeout (todos OperationalError
+    no psycopg) e timeout do pool.
+    """
+    return isinstance(exc, TRANSIENT_ERRORS)
+
+
+def chunk_congestion_ok(chunk_stats, error) -> bool:
+    """
+    `ok` do `AIMDController.observe` para um chunk: só erro transitório
+    (ou, com isolamento, linhas sem commit após os retries) indica carga no
+    servidor; duplicata ou dado inválido não diz nada sobre congestionamento.
+    """
+    if chunk_stats["chunks"] == 1:
+        return True
+    return error is not None and not is_transient(error)
+
+
+def chunk_nbytes(rows) -> int:
+    """Soma de `row_nbytes` de um chunk (lista de tuplas ou ColumnBatch)."""
+    if isinstance(rows, ColumnBatch):
+        return rows.text_nbytes()
+    return sum(row_nbytes(r) for r in rows)
+
+
+def partition_lpt(rows, n_parts: int, sizes=None):
+    """
+    Particiona `rows` em `n_parts` grupos de bytes parecidos usando
+    longest-processing-time-first: as linhas são ordenadas da maior para a
+    menor e cada uma vai para o grupo com menos bytes até o momento.
+
+    Args:
+        rows: Lista de tuplas.
+        n_parts: Número de grupos.
+        sizes: Pesos por linha (ex.: ZipInfo.file_size); padrão row_nbytes.
+
+    Returns:
+        (partes, bytes por parte)
+    """
+    if sizes is None:
+        sizes = [row_nbytes(r) for r in rows]
+    n_parts = max(1, min(n_parts, len(rows)))
+    parts = [[] for _ in range(n_parts)]
+    loads = [0] * n_parts
+    heap = [(0, i) for i in range(n_parts)]
+
+    for idx in sorted(range(len(rows)), key=sizes.__getitem__, reverse=True):
+        load, part = heapq.heappop(heap)
+        parts[part].append(rows[idx])
+        loads[part] = load + sizes[idx]
+        heapq.heappush(heap, (loads[part], part))
+
+    return parts, loads
+
+
+def partition_rows(rows, n_parts: int):
+    """`partition_lpt` para listas de tuplas ou ColumnBatch (cada parte vira um take)."""
+    if isinstance(rows, ColumnBatch):
+        parts, loads = partition_lpt(range(len(rows)), n_parts, rows.row_nbytes())
+        return [rows.take(part) for part in parts], loads
+    return partition_lpt(rows, n_parts)
+
+
+# Tamanho dos blocos enviados por `copy.write` no COPY assíncrono
+COPY_BLOCK_BYTES = 1024 * 1024
+
+# Escapes do formato texto do COPY (barra invertida primeiro)
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def copy_text_field(value) -> str:
+    """Um valor no formato texto do COPY (None → \\N)."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, str):
+        return value.translate(_COPY_ESCAPES)
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, datetime):
+        return value.isoformat(" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value).translate(_COPY_ESCAPES)
+
+
+def copy_blocks(rows, block_bytes: int = COPY_BLOCK_BYTES):
+    """Payload do COPY texto: direto das colunas de um ColumnBatch ou codificando tuplas."""
+    if isinstance(rows, ColumnBatch):
+        return rows.iter_copy_blocks(block_bytes)
+    return iter_copy_blocks(rows, block_bytes)
+
+
+def iter_copy_blocks(rows, block_bytes: int = COPY_BLOCK_BYTES):
+    """
+    Codifica tuplas no formato texto do COPY e agrupa em blocos de ~block_bytes.
+
+    No COPY assíncrono, `await copy.write_row(row)` custa um await por linha;
+    com blocos grandes são poucos awaits (e poucas chamadas de rede) por chunk.
+    """
+    lines = []
+    size = 0
+    for row in rows:
+        line = "\t".join([copy_text_field(v) for v in row]) + "\n"
+        lines.append(line)
+        size += len(line)
+        if size >= block_bytes:
+            yield "".join(lines).encode("utf-8")
+            lines = []
+            size = 0
+    if lines:
+        yield "".join(lines).encode("utf-8")
+
+
+def copy_sql(table_name: str, columns, copy_format: str = "text", freeze: bool = False) -> str:
+    """
+    Comando COPY ... FROM STDIN no formato pedido ("text" ou "binary").
+    `freeze` grava as linhas já congeladas (exige TRUNCATE/CREATE da tabela
+    na mesma transação).
+    """
+    cols_str = ", ".join(columns)
+    if copy_format not in ("text", "binary"):
+        raise ValueError(f"Formato de COPY inválido: {copy_format}")
+    options = ["FORMAT BINARY"] if copy_format == "binary" else []
+    if freeze:
+        options.append("FREEZE")
+    if not options:
+        return f"COPY {table_name} ({cols_str}) FROM STDIN"
+    return f"COPY {table_name} ({cols_str}) FROM STDIN ({', '.join(options)})"
+
+
+STAGING_MODES = ("temp", "unlogged")
+
+
+def staging_table_sql(table_name: str, stage_name: str, staging: str = "temp") -> str:
+    """
+    DDL da tabela de staging com a estrutura de `table_name` (sem PK/índices).
+    "temp": TEMP, some no commit (isolada por sessão); "unlogged": UNLOGGED
+    persistente, reaproveitada entre batches (sem WAL).
+    """
+    if staging == "temp":
+        return (
+            f"CREATE TEMP TABLE IF NOT EXISTS {stage_name} "
+            f"(LIKE {table_name} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        )
+    if staging == "unlogged":
+        return (
+            f"CREATE UNLOGGED TABLE IF NOT EXISTS {stage_name} "
+            f"(LIKE {table_name} INCLUDING DEFAULTS)"
+        )
+    raise ValueError(f"Staging inválido: {staging} ({', '.join(STAGING_MODES)})")
+
+
+def check_staging_concurrency(staging, concurrency: int):
+    """
+    "unlogged" usa uma única `{tabela}_stage` e cada transação começa com
+    TRUNCATE, que segura um lock ACCESS EXCLUSIVE até o commit: com várias
+    conexões em paralelo os chunks rodariam um por vez. Só "temp" (uma
+    staging por sessão) é aceito com concorrência > 1.
+    """
+    if staging == "unlogged" and concurrency > 1:
+        raise ValueError(
+            f'staging="unlogged" serializa as {concurrency} conexões na mesma '
+            'tabela de staging; use staging="temp" para cargas em paralelo'
+        )
+
+
+def merge_sql(table_name: str, stage_name: str, columns, conflict_target: str = "paper_id") -> str:
+    """INSERT ... SELECT da staging para o destino, ignorando chaves já existentes."""
+    cols_str = ", ".join(columns)
+    return (
+        f"INSERT INTO {table_name} ({cols_str}) SELECT {cols_str} FROM {stage_name} "
+        f"ON CONFLICT ({conflict_target}) DO NOTHING"
+    )
+
+
+def insert_sql(table_name: str, columns, conflict_target: str | None = "paper_id") -> str:
+    """INSERT parametrizado de uma linha; `conflict_target` "" = ON CONFLICT sem alvo."""
+    placeholders = ", ".join(["%s"] * len(columns))
+    query = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders})"
+    if conflict_target is None:
+        return query
+    target = f" ({conflict_target})" if conflict_target else ""
+    return f"{query} ON CONFLICT{target} DO NOTHING"
+
+
+def _pipeline_slices(values, sync_every: int):
+    if sync_every <= 0 or len(values) <= sync_every:
+        yield values
+        return
+    for i in range(0, len(values), sync_every):
+        yield values[i : i + sync_every]
+
+
+def execute_insert_pipeline(conn, cur, query: str, values, sync_every: int = 0) -> int:
+    """
+    executemany de `values` dentro de `conn.pipeline()`, na transação
+    corrente (não commita).
+
+    `sync_every` = 0: um único Sync no final (um round trip para o lote
+    inteiro). N > 0: Sync a cada N linhas; cada Sync espera os resultados
+    pendentes (um round trip a mais), limitando o que fica em trânsito e
+    localizando mais cedo um erro. Retorna as linhas inseridas (rowcount,
+    sem as descartadas por ON CONFLICT).
+    """
+    inserted = 0
+    with conn.pipeline() as pipeline:
+        for part in _pipeline_slices(values, sync_every):
+            cur.executemany(query, part)
+            pipeline.sync()
+            inserted += cur.rowcount  # válido só depois do Sync
+    return inserted
+
+
+async def aexecute_insert_pipeline(aconn, cur, query: str, values, sync_every: int = 0) -> int:
+    """Versão assíncrona de `execute_insert_pipeline`."""
+    inserted = 0
+    async with aconn.pipeline() as pipeline:
+        for part in _pipeline_slices(values, sync_every):
+            await cur.executemany(query, part)
+            await pipeline.sync()
+            inserted += cur.rowcount
+    return inserted
+
+
 class DatabaseConnector:
     def __init__(self):
         self.conn_str = CONN_STRING
         self._pool = None
+        self._async_pool = None
+        self._async_pool_stats = self._empty_pool_stats()
+        self._id_filters = {}
+        self._copy_types = {}
 
     @property
     def pool(self):
@@ -72,6 +332,232 @@ class DatabaseConnector:
             conn.commit()
         print(f"✅ Table '{table_name}' created successfully.")
 
+    # -------------------------------------------------------------------------
+    # Pool assíncrono (insert_chunk / insert_async_parallel)
+    @staticmethod
+    def _empty_pool_stats():
+        return {
+            "min_size": 0,
+            "max_size": 0,
+            "warmup_time": 0.0,
+            "connections_created": 0,
+            "acquires": 0,
+            "acquire_wait_total": 0.0,
+            "acquire_wait_max": 0.0,
+        }
+
+    async def open_async_pool(
+        self, max_tasks: int = 4, min_size: int | None = None, max_size: int | None = None
+    ):
+        """
+        Abre (uma vez) o AsyncConnectionPool compartilhado pelos chunks.
+
+        Por padrão min_size = max_size = max_tasks: cada task paralela tem uma
+        conexão pronta. O pool é pré-aquecido (aguarda as min_size conexões)
+        antes de retornar, então o handshake TCP/autenticação não cai no
+        tempo dos batches.
+        """
+        if self._async_pool is not None:
+            return self._async_pool
+        if not HAS_POOL:
+            raise ImportError(
+                "AsyncConnectionPool not available. Install: pip install psycopg[pool]"
+            )
+        min_size = min_size or max_tasks
+        max_size = max(max_size or max_tasks, min_size)
+        stats = self._async_pool_stats = self._empty_pool_stats()
+        stats["min_size"], stats["max_size"] = min_size, max_size
+
+        async def configure(aconn):
+            stats["connections_created"] += 1
+
+        pool = AsyncConnectionPool(
+            conninfo=self.conn_str,
+            min_size=min_size,
+            max_size=max_size,
+            open=False,
+            configure=configure,
+        )
+        warmup_start = time.perf_counter()
+        await pool.open(wait=True)
+        stats["warmup_time"] = time.perf_counter() - warmup_start
+        self._async_pool = pool
+        print(
+            f"🏊 Pool assíncrono aberto: {min_size}-{max_size} conexões "
+            f"(pré-aquecido em {stats['warmup_time']:.2f}s)"
+        )
+        return pool
+
+    @contextlib.asynccontextmanager
+    async def async_connection(self):
+        """Conexão emprestada do pool assíncrono, medindo a espera pelo acquire."""
+        pool = await self.open_async_pool()
+        stats = self._async_pool_stats
+        acquire_start = time.perf_counter()
+        async with pool.connection() as aconn:
+            wait = time.perf_counter() - acquire_start
+            stats["acquires"] += 1
+            stats["acquire_wait_total"] += wait
+            stats["acquire_wait_max"] = max(stats["acquire_wait_max"], wait)
+            yield aconn
+
+    def async_pool_stats(self):
+        """Estatísticas do pool: espera no acquire, conexões criadas e reuso."""
+        stats = dict(self._async_pool_stats)
+        acquires = stats["acquires"]
+        stats["acquire_wait_avg"] = stats["acquire_wait_total"] / acquires if acquires else 0.0
+        stats["connection_reuse"] = max(0, acquires - stats["connections_created"])
+        stats["reuse_ratio"] = stats["connection_reuse"] / acquires if acquires else 0.0
+        return stats
+
+    async def close_async_pool(self):
+        """Fecha o pool assíncrono (chamar antes do fim do event loop)."""
+        if self._async_pool is not None:
+            await self._async_pool.close()
+            self._async_pool = None
+            stats = self.async_pool_stats()
+            print(
+                f"🏊 Pool assíncrono fechado: {stats['acquires']:,} acquires, "
+                f"{stats['connections_created']} conexões criadas, "
+                f"reuso {stats['reuse_ratio']:.0%}, "
+                f"espera média {stats['acquire_wait_avg'] * 1000:.1f} ms"
+            )
+
+    def id_filter(self, table_name: str):
+        """
+        Filtro de paper_id já carregados em `table_name` (dedup.IdFilter),
+        semeado da tabela na primeira chamada e reaproveitado entre batches.
+        """
+        if table_name not in self._id_filters:
+            self._id_filters[table_name] = IdFilter.from_table(self.conn_str, table_name)
+        return self._id_filters[table_name]
+
+    # -------------------------------------------------------------------------
+    # COPY texto / binário
+    def table_copy_types(self, table_name: str, columns):
+        """OIDs dos tipos das colunas de `table_name` (lidos uma vez do catálogo)."""
+        if table_name not in self._copy_types:
+            with psycopg.connect(self.conn_str) as conn:
+                rows = conn.execute(
+                    "SELECT attname, atttypid FROM pg_attribute "
+                    "WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped",
+                    (table_name,),
+                ).fetchall()
+            self._copy_types[table_name] = dict(rows)
+        types = self._copy_types[table_name]
+        return [types[column] for column in columns]
+
+    def resolve_copy_types(self, table_name: str, columns, copy_types=None):
+        """
+        Tipos para COPY binário: None → catálogo da tabela; modelo pydantic →
+        anotações do modelo (schemas.copy_types); lista → usada como está.
+        """
+        if copy_types is None:
+            return self.table_copy_types(table_name, columns)
+        if isinstance(copy_types, type) and issubclass(copy_types, BaseModel):
+            return model_copy_types(copy_types, columns)
+        return list(copy_types)
+
+    @staticmethod
+    def _copy_rows(
+        cur, table_name: str, columns, rows, copy_format="text", types=None, freeze=False
+    ):
+        """COPY síncrono de `rows` no cursor dado. Retorna o número de linhas."""
+        count = 0
+        with cur.copy(copy_sql(table_name, columns, copy_format, freeze)) as copy:
+            if copy_format == "binary":
+                copy.set_types(types)
+            elif isinstance(rows, ColumnBatch):
+                # Texto montado nos buffers Arrow: nenhuma tupla por linha
+                for block in rows.iter_copy_blocks(COPY_BLOCK_BYTES):
+                    copy.write(block)
+                return len(rows)
+            for row in rows:
+                copy.write_row(row)
+                count += 1
+        return count
+
+    def insert_rows(
+        self,
+        table_name: str,
+        columns,
+        rows,
+        conflict_target: str | None = "paper_id",
+        sync_every: int = 0,
+    ):
+        """
+        INSERT ... ON CONFLICT DO NOTHING de tuplas (na ordem de `columns`)
+        em transação única, em pipeline mode.
+
+        Para quando o COPY não serve (tratamento de conflito por linha,
+        RETURNING): os INSERTs vão sem esperar resposta, com um Sync no
+        final (`sync_every=0`) ou a cada `sync_every` linhas (ver
+        `execute_insert_pipeline`). `insert_batch` e o caminho sem COPY
+        de `insert_chunk` usam o mesmo executor.
+
+        Returns:
+            dict com inserted (rowcount), sent, duration e throughput.
+        """
+        query = insert_sql(table_name, columns, conflict_target)
+        values = list(rows)
+        start_time = time.perf_counter()
+        with psycopg.connect(self.conn_str) as conn:
+            with conn.cursor() as cur:
+                try:
+                    inserted = execute_insert_pipeline(conn, cur, query, values, sync_every)
+                    conn.commit()
+                except Exception as e:
+                    print(f"❌ Erro na inserção: {e}")
+                    conn.rollback()
+                    inserted = 0
+        duration = time.perf_counter() - start_time
+        return {
+            "inserted": inserted,
+            "sent": len(values),
+            "duration": duration,
+            "throughput": len(values) / duration if duration > 0 else 0,
+        }
+
+    async def ainsert_rows(
+        self,
+        table_name: str,
+        columns,
+        rows,
+        conflict_target: str | None = "paper_id",
+        sync_every: int = 0,
+    ):
+        """Versão assíncrona de `insert_rows` (conexão do pool, se já aberto)."""
+        query = insert_sql(table_name, columns, conflict_target)
+        values = list(rows)
+        start_time = time.perf_counter()
+        if self._async_pool is not None:
+            connection = self.async_connection()
+        else:
+            connection = await psycopg.AsyncConnection.connect(self.conn_str)
+        async with connection as aconn:
+            async with aconn.cursor() as cur:
+                try:
+                    inserted = await aexecute_insert_pipeline(aconn, cur, query, values, sync_every)
+                    await aconn.commit()
+                except Exception as e:
+                    print(f"❌ Erro na inserção: {e}")
+                    await aconn.rollback()
+                    inserted = 0
+        duration = time.perf_counter() - start_time
+        return {
+            "inserted": inserted,
+            "sent": len(values),
+            "duration": duration,
+            "throughput": len(values) / duration if duration > 0 else 0,
+        }
+
+    def execute_sql(self, sql: str):
+        """Executa um script SQL (DDL/manutenção) em uma transação."""
+        with psycopg.connect(self.conn_str) as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql)
+            conn.commit()
+
     def insert_into_table(self, table_name, data):
         """
         Insert a row into a given table.
@@ -90,33 +576,46 @@ class DatabaseConnector:
 
         print(f"✅ Inserted 1 record into '{table_name}' successfully.")
 
-    def insert_batch(self, table_name, data_batch):
-        """Função auxiliar que insere um único lote de registros."""
-        data_dicts = []
-        for m in data_batch:
-            d = m.dict()
-            if "text" in d:
-                d["content"] = d.pop("text")
-            data_dicts.append(d)
-
-        columns = ", ".join(data_dicts[0].keys())
-        placeholders = ", ".join(["%s"] * len(data_dicts[0]))
-        values = [tuple(d.values()) for d in data_dicts]
-        query = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
+    def insert_batch(
+        self, table_name, data_batch, copy_format=None, copy_types=None
+    ):
+        """
+        Função auxiliar que insere um único lote de registros.
+        `copy_format` ("text"/"binary") troca o executemany por COPY.
+        """
+        copy_columns, values = model_rows(data_batch)
+        query = insert_sql(table_name, copy_columns, conflict_target=None)
 
         with psycopg.connect(self.conn_str) as conn:
             with conn.cursor() as cur:
-                cur.executemany(query, values)
+                if copy_format:
+                    types = None
+                    if copy_format == "binary":
+                        types = self.resolve_copy_types(table_name, copy_columns, copy_types)
+                    self._copy_rows(cur, table_name, copy_columns, values, copy_format, types)
+                else:
+                    execute_insert_pipeline(conn, cur, query, values)
             conn.commit()
 
         # print(f"✅ Inserido batch com {len(values)} registros.")
         return len(values)
 
     def batch_process_rows(
-        self, table_name, data_model_list, batch_size=1000, max_workers=5
+        self,
+        table_name,
+        data_model_list,
+        batch_size=1000,
+        max_workers=5,
+        copy_format=None,
     ):
-        """Divide os dados em lotes e insere com 5 threads paralelas."""
+        """
+        Divide os dados em lotes e insere com 5 threads paralelas.
+        `copy_format` ("text"/"binary") usa COPY em cada lote em vez de executemany.
+        """
         total_rows = len(data_model_list)
+        copy_types = None
+        if copy_format == "binary" and isinstance(data_model_list, list) and data_model_list:
+            copy_types = type(data_model_list[0])
         batches = [
             data_model_list[i : i + batch_size]
             for i in range(0, total_rows, batch_size)
@@ -131,7 +630,13 @@ class DatabaseConnector:
 
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
             futures = {
-                executor.submit(self.insert_batch, table_name, batch): batch
+                executor.submit(
+                    self.insert_batch,
+                    table_name,
+                    batch,
+                    copy_format,
+                    copy_types,
+                ): batch
                 for batch in batches
             }
 
@@ -156,17 +661,28 @@ class DatabaseConnector:
         with psycopg.connect(self.conn_str) as conn:
             with conn.cursor() as cur:
                 cur.execute(f"TRUNCATE TABLE {table_name} RESTART IDENTITY;")
+                # Checkpoints da tabela (checkpoint.py) deixam de valer
+                cur.execute("SELECT to_regclass('etl_checkpoint')")
+                if cur.fetchone()[0] is not None:
+                    cur.execute(
+                        "DELETE FROM etl_checkpoint WHERE target_table = %s", (table_name,)
+                    )
             conn.commit()
+        self._id_filters.pop(table_name, None)
         print(f"🧹 Tabela '{table_name}' truncada com sucesso!")
 
     # -------------------------------------------------------------------------
     def insert_optimized_single_transaction2(
-        self, table_name: str, data_model_list: list[BaseModel]
+        self, table_name: str, data_model_list: list[BaseModel], id_filter=None
     ):
         """
         OTIMIZADO: Inserção rápida usando COPY em uma única transação.
         Ideal para datasets pequenos/médios (< 100k registros).
         Usa PostgreSQL COPY que é o método mais rápido.
+
+        Duplicatas são descartadas antes do COPY por um filtro mantido no
+        cliente (`id_filter`, padrão `self.id_filter(table_name)`), em vez de
+        ler todos os paper_id da tabela a cada batch.
         """
         if not data_model_list:
             return 0
@@ -174,47 +690,46 @@ class DatabaseConnector:
         print("🚀 Inserção otimizada (transação única com COPY) iniciada...")
         start_time = time.perf_counter()
 
-        data_dicts = []
-        for m in data_model_list:
-            d = m.dict()
-            if "text" in d:
-                d["content"] = d.pop("text")
-            data_dicts.append(d)
-
-        columns = list(data_dicts[0].keys())
-        values = [tuple(d[c] for c in columns) for d in data_dicts]
+        columns, values = model_rows(data_model_list)
         cols_str = ", ".join(columns)
 
+        # paper_id é a primeira coluna
+        id_filter = id_filter if id_filter is not None else self.id_filter(table_name)
+        dedup_start = time.perf_counter()
+        existing = id_filter.contains_many([v[0] for v in values])
+        filtered_values = []
+        batch_ids = set()
+        for v, exists in zip(values, existing):
+            if not exists and v[0] not in batch_ids:
+                batch_ids.add(v[0])
+                filtered_values.append(v)
+        dedup_time = time.perf_counter() - dedup_start
+        if not filtered_values:
+            print("⚠️ Nenhum novo registro para inserir (todos já existem).")
+            return 0
+
         # Uma única transação com COPY (mais rápido que INSERT)
-        existing_ids = set()
         with psycopg.connect(self.conn_str) as conn:
             with conn.cursor() as cur:
-                cur.execute(f"SELECT paper_id FROM {table_name}")
-                existing_ids = {row[0] for row in cur.fetchall()}
-                filtered_values = []
-                for v in values:
-                    # paper_id is assumed to be the first column
-                    if v[0] not in existing_ids:
-                        filtered_values.append(v)
-                if not filtered_values:
-                    print("⚠️ Nenhum novo registro para inserir (todos já existem).")
-                    return 0
-
                 with cur.copy(f"COPY {table_name} ({cols_str}) FROM STDIN") as copy:
                     for row in filtered_values:
                         copy.write_row(row)
             conn.commit()
+        # Só depois do commit os ids passam a contar como carregados
+        id_filter.add_many(batch_ids)
 
         end_time = time.perf_counter()
         duration = end_time - start_time
-        rate = len(data_model_list) / duration if duration > 0 else 0
+        inserted = len(filtered_values)
+        rate = inserted / duration if duration > 0 else 0
 
         print("\n✅ Inserção finalizada!")
-        print(f"📊 Total inserido: {len(data_model_list)} registros")
+        print(f"📊 Total inserido: {inserted} registros ({len(values) - inserted} duplicados descartados)")
+        print(f"🧮 Filtro de duplicatas: {dedup_time * 1000:.1f} ms")
         print(f"⏱️ Tempo total: {duration:.2f} s")
         print(f"⚡ Taxa média: {rate:.0f} registros/s\n")
 
-        return len(data_model_list)
+        return inserted
 
     async def insert_async_batch_transactions(
         self, table_name: str, data_model_list: list[BaseModel]
@@ -223,14 +738,7 @@ class DatabaseConnector:
             return 0
         start_time = time.perf_counter()
         aconn = await psycopg.AsyncConnection.connect(self.conn_str)
-        data_dicts = []
-        for m in data_model_list:
-            d = m.dict()
-            if "text" in d:
-                d["content"] = d.pop("text")
-            data_dicts.append(d)
-
-        columns = list(data_dicts[0].keys())
+        columns, _ = model_rows(data_model_list)
         cols_str = ", ".join(columns)
         async with aconn:
             try:
@@ -251,81 +759,185 @@ class DatabaseConnector:
         chunk_index: int | None = None,
         total_chunks: int | None = None,
         use_copy: bool = True,
+        columns=None,
+        copy_format: str = "text",
+        copy_types=None,
+        staging: str | None = None,
+        merge_stats: dict | None = None,
+        isolation=None,
+        raise_errors: bool = False,
     ):
         """
         Insere um chunk de registros em uma tabela.
         
         Args:
             table_name: Nome da tabela
-            data_chunk: Lista de dicts (já convertidos, não BaseModel)
+            data_chunk: Lista de dicts (já convertidos, não BaseModel), de
+                tuplas na ordem de `columns` ou um ColumnBatch
             chunk_index: Índice do chunk para logging
             total_chunks: Total de chunks para logging
             use_copy: Se True, usa COPY (mais rápido). Se False, usa executemany.
+            columns: Colunas das tuplas em `data_chunk` (None = chunk de dicts)
+            copy_format: "text" (blocos codificados no cliente) ou "binary".
+            copy_types: Tipos do COPY binário (ver `resolve_copy_types`).
+            staging: "temp"/"unlogged": COPY na staging + merge com ON CONFLICT
+                (ver `insert_staged_merge`); requer use_copy.
+            merge_stats: Dict opcional acumulando staged/inserted dos chunks.
+            isolation: `quarantine.PoisonRowIsolation` opcional. Em vez de
+                desfazer o chunk inteiro no primeiro erro, reenvia os erros
+                transitórios e divide o chunk até isolar as linhas rejeitadas
+                (quarentena); o resto commita. O chunk só conta em
+                merge_stats["chunks"] se nenhuma linha ficou sem destino;
+                erros que não são de linha (schema, permissão) são repassados.
+            raise_errors: Sem isolation, repassa a exceção do chunk (após o
+                rollback) em vez de retornar 0 (ex.: para classificar o erro).
         """
         if not data_chunk:
             return 0
 
-        # Data should already be dicts at this point
-        data_dicts = data_chunk
-        columns = list(data_dicts[0].keys())
+        if isinstance(data_chunk, ColumnBatch):
+            columns = list(data_chunk.columns)
+            values = data_chunk
+        elif columns is None:
+            columns = list(data_chunk[0].keys())
+            values = [tuple(d[c] for c in columns) for d in data_chunk]
+        else:
+            columns = list(columns)
+            values = data_chunk
         cols_str = ", ".join(columns)
 
         chunk_label = None
         if chunk_index is not None and total_chunks is not None:
             chunk_label = f"{chunk_index + 1}/{total_chunks}"
 
-        # Try to use connection pool if available, otherwise create new connection
-        if HAS_POOL:
+        types = copy_types
+        if use_copy and copy_format == "binary" and not isinstance(copy_types, list):
+            types = await asyncio.to_thread(
+                self.resolve_copy_types, table_name, columns, copy_types
+            )
+
+        if isolation is not None:
+            # Cada pedaço commita em sua transação; contadores somados no final
+            part_stats = {"chunks": 0, "staged": 0, "inserted": 0}
+
+            async def insert_part(part):
+                return await self._insert_chunk_connected(
+                    table_name, part, columns, cols_str, chunk_label, use_copy,
+                    copy_format, types, staging, part_stats, raise_errors=True,
+                )
+
+            failed = None
             try:
-                async with self.pool.connection() as aconn:
-                    return await self._insert_chunk_with_conn(
-                        aconn, table_name, data_dicts, columns, cols_str, 
-                        chunk_label, use_copy
-                    )
-            except Exception as e:
-                # Fallback to direct connection if pool fails
-                pass
-        
-        # Fallback: direct connection
+                inserted, failed = await isolation.run(
+                    insert_part, values, table_name, columns, chunk_label
+                )
+            finally:
+                # Pedaços commitados antes de um erro repassado também contam
+                if merge_stats is not None:
+                    merge_stats["chunks"] += 1 if failed == 0 else 0
+                    merge_stats["staged"] += part_stats["staged"]
+                    merge_stats["inserted"] += part_stats["inserted"]
+            return inserted
+
+        return await self._insert_chunk_connected(
+            table_name, values, columns, cols_str, chunk_label, use_copy,
+            copy_format, types, staging, merge_stats, raise_errors,
+        )
+
+    async def _insert_chunk_connected(
+        self, table_name, values, columns, cols_str, chunk_label, use_copy,
+        copy_format, types, staging, merge_stats, raise_errors=False,
+    ):
+        """`_insert_chunk_with_conn` com uma conexão do pool (ou direta, sem psycopg_pool)."""
+        # Conexão do pool assíncrono compartilhado (sem handshake por chunk)
+        if HAS_POOL:
+            async with self.async_connection() as aconn:
+                return await self._insert_chunk_with_conn(
+                    aconn, table_name, values, columns, cols_str,
+                    chunk_label, use_copy, copy_format, types, staging, merge_stats,
+                    raise_errors,
+                )
+
+        # Fallback sem psycopg_pool: conexão direta
         async with await psycopg.AsyncConnection.connect(self.conn_str) as aconn:
             return await self._insert_chunk_with_conn(
-                aconn, table_name, data_dicts, columns, cols_str, 
-                chunk_label, use_copy
+                aconn, table_name, values, columns, cols_str,
+                chunk_label, use_copy, copy_format, types, staging, merge_stats,
+                raise_errors,
             )
     
     async def _insert_chunk_with_conn(
-        self, aconn, table_name, data_dicts, columns, cols_str, chunk_label, use_copy
+        self,
+        aconn,
+        table_name,
+        values,
+        columns,
+        cols_str,
+        chunk_label,
+        use_copy,
+        copy_format="text",
+        copy_types=None,
+        staging=None,
+        merge_stats=None,
+        raise_errors=False,
     ):
-        """Helper method to insert chunk with given connection."""
+        """
+        Helper method to insert chunk (tuplas na ordem de `columns`) with given connection.
+        Em erro faz rollback e retorna 0, ou repassa a exceção com `raise_errors`.
+        """
         try:
+            inserted = len(values)
             async with aconn.cursor() as cur:
-                if use_copy:
-                    # Use COPY for better performance (faster than executemany)
-                    # In psycopg3 async, cur.copy() returns an async context manager
-                    values = [tuple(d[c] for c in columns) for d in data_dicts]
-                    async with cur.copy(
-                        f"COPY {table_name} ({cols_str}) FROM STDIN"
-                    ) as copy:
+                copy_target = table_name
+                if use_copy and staging:
+                    # Staging da sessão (TEMP ... ON COMMIT DELETE ROWS é
+                    # reaproveitada pelas conexões do pool)
+                    copy_target = f"{table_name}_stage"
+                    await cur.execute(staging_table_sql(table_name, copy_target, staging))
+                    if staging == "unlogged":
+                        await cur.execute(f"TRUNCATE {copy_target}")
+
+                if use_copy and copy_format == "binary":
+                    # COPY binário: psycopg codifica cada valor pelo tipo declarado
+                    async with cur.copy(copy_sql(copy_target, columns, "binary")) as copy:
+                        copy.set_types(copy_types)
                         for row in values:
                             await copy.write_row(row)
+                elif use_copy:
+                    # COPY texto com linhas já codificadas em blocos grandes:
+                    # um await por bloco em vez de um por linha
+                    async with cur.copy(copy_sql(copy_target, columns)) as copy:
+                        for block in copy_blocks(values):
+                            await copy.write(block)
                 else:
-                    values = [tuple(d[c] for c in columns) for d in data_dicts]
-                    placeholders = ", ".join(["%s"] * len(columns))
-                    query = (
-                        f"INSERT INTO {table_name} ({cols_str}) VALUES ({placeholders}) "
-                        "ON CONFLICT DO NOTHING"
-                    )
-                    await cur.executemany(query, values)
+                    # INSERTs em pipeline mode, um único Sync (ver `insert_rows`)
+                    query = insert_sql(table_name, columns, conflict_target="")
+                    inserted = await aexecute_insert_pipeline(aconn, cur, query, values)
+
+                if copy_target != table_name:
+                    await cur.execute(merge_sql(table_name, copy_target, columns))
+                    inserted = cur.rowcount
             await aconn.commit()
-            return len(data_dicts)
+            if merge_stats is not None:
+                merge_stats["chunks"] += 1
+                merge_stats["staged"] += len(values)
+                merge_stats["inserted"] += inserted
+            return inserted
         except psycopg.errors.UniqueViolation:
+            await aconn.rollback()
+            if raise_errors:
+                raise
             if chunk_label:
                 print(f" Chunk {chunk_label} ignorado por duplicidades.")
             else:
                 print(" Chunk ignorado por duplicidades.")
-            await aconn.rollback()
             return 0
         except Exception as e:
+            if raise_errors:
+                # Conexão quebrada: o rollback também falharia; o pool a descarta
+                if not aconn.closed:
+                    await aconn.rollback()
+                raise
             if chunk_label:
                 print(f"❌ Erro no chunk {chunk_label}: {e}")
             await aconn.rollback()
@@ -338,6 +950,13 @@ class DatabaseConnector:
         chunk_size: int = 5000,
         max_tasks: int = 4,
         use_copy: bool = True,
+        columns=None,
+        balance_bytes: bool = True,
+        copy_format: str = "text",
+        copy_types=None,
+        staging: str | None = None,
+        controller=None,
+        isolation=None,
     ):
         """
         Divide o dataset em chunks e insere paralelamente.
@@ -347,49 +966,119 @@ class DatabaseConnector:
         - Converts BaseModel to dict once (not per chunk)
         - Uses COPY instead of executemany for better performance
         - Adaptive chunking for better load distribution
+        - Size-balanced chunks (LPT) so no single chunk becomes the straggler
         
         Args:
             table_name: Nome da tabela
-            data_model_list: Lista de BaseModel ou dicts
+            data_model_list: Lista de BaseModel ou dicts, ou um ColumnBatch
+                (chunks como fatias do Arrow, COPY texto direto dos buffers)
             chunk_size: Tamanho de cada chunk (otimizado automaticamente se muito pequeno)
             max_tasks: Número máximo de tasks paralelas
             use_copy: Se True, usa COPY (mais rápido). Se False, usa executemany.
+            columns: Se informado, `data_model_list` já contém tuplas nessa
+                ordem de colunas (ex.: saída do parse multi-processo)
+            balance_bytes: Se True, distribui as linhas entre os chunks por
+                tamanho (LPT) em vez da ordem do ZIP, evitando que um chunk
+                cheio de artigos enormes vire o gargalo do batch.
+            copy_format: "text" ou "binary" (com use_copy=True).
+            copy_types: Tipos do COPY binário; padrão: catálogo da tabela,
+                ou as anotações do modelo quando a lista é de BaseModel.
+            staging: "temp" (staging por conexão, chunks em paralelo) ou
+                "unlogged" (tabela compartilhada: só com max_tasks=1, ver
+                `check_staging_concurrency`). Cada chunk faz COPY na staging
+                + merge com ON CONFLICT DO NOTHING, então duplicatas não
+                abortam o chunk.
+            controller: `adaptive.AIMDController` opcional. Os chunks passam a
+                ser cortados sob demanda com o chunk_size atual do controller,
+                e a concorrência segue `controller.tasks` (chunk_size,
+                max_tasks e balance_bytes são ignorados); as decisões tomadas
+                durante a chamada vão em "adaptive".
+            isolation: `quarantine.PoisonRowIsolation` opcional (ver
+                `insert_chunk`): chunks com erro commitam tudo menos as linhas
+                rejeitadas, que vão para a quarentena; "isolation" traz as
+                contagens da chamada.
+
+        "successful_chunks" conta só chunks commitados por inteiro (linhas em
+        quarentena contam como tratadas); "failed_chunks" e "failed_rows"
+        trazem o que ficou fora do banco.
         """
         start = time.perf_counter()
+        if use_copy:
+            check_staging_concurrency(
+                staging, controller.task_bounds[1] if controller is not None else max_tasks
+            )
 
         if not data_model_list:
             return {"inserted": 0, "duration": 0, "chunk_size": 0, "total_chunks": 0, "concurrency": 0}
 
-        # Converte BaseModel → dict uma única vez (otimização de memória)
-        # Fazemos isso antes de chunking para evitar conversão duplicada
-        rows = []
-        for m in data_model_list:
-            if isinstance(m, BaseModel):
-                d = m.dict()
-                if "text" in d:
-                    d["content"] = d.pop("text")
-                rows.append(d)
-            else:
-                # Já é dict, apenas normaliza se necessário
+        if isinstance(data_model_list, ColumnBatch):
+            # Batch colunar: chunks são fatias/takes do Arrow, COPY dos buffers
+            columns, rows = list(data_model_list.columns), data_model_list
+        elif columns is not None:
+            # Tuplas já prontas (ex.: parse multi-processo): nenhuma conversão
+            rows = data_model_list
+        elif isinstance(data_model_list[0], BaseModel):
+            # Modelos → tuplas uma única vez, antes do chunking
+            columns, rows = model_rows(data_model_list)
+        else:
+            # Dicts: normaliza text → content
+            data_dicts = []
+            for m in data_model_list:
                 if "text" in m:
                     m = m.copy()
                     m["content"] = m.pop("text")
-                rows.append(m)
+                data_dicts.append(m)
+
+            columns = list(data_dicts[0].keys())
+            rows = [tuple(d[c] for c in columns) for d in data_dicts]
 
         if not rows:
             return {"inserted": 0, "duration": 0, "chunk_size": 0, "total_chunks": 0, "concurrency": 0}
 
+        total_records = len(rows)
+        if controller is not None:
+            return await self._insert_adaptive(
+                table_name, data_model_list, rows, columns, controller, start,
+                use_copy, copy_format, copy_types, staging, isolation,
+            )
+
         # Otimização: Se chunk_size muito pequeno para o dataset, ajusta
         # Evita criar muitos chunks pequenos (overhead)
-        total_records = len(rows)
         if chunk_size < 1000 and total_records > 10000:
             optimal_chunks = min(20, max(4, total_records // 5000))
             chunk_size = max(1000, total_records // optimal_chunks)
 
         # Divide em chunks
-        chunks = list(chunked(rows, chunk_size))
+        if balance_bytes:
+            # Mesmo número de chunks (arredondado para ondas completas de
+            # max_tasks), mas com bytes equilibrados entre eles (LPT)
+            n_parts = math.ceil(total_records / chunk_size)
+            n_parts = math.ceil(n_parts / max_tasks) * max_tasks
+            chunks, chunk_bytes = partition_rows(rows, n_parts)
+        else:
+            chunks = [rows[i : i + chunk_size] for i in range(0, total_records, chunk_size)]
+            chunk_bytes = [chunk_nbytes(chunk) for chunk in chunks]
         total_chunks = len(chunks)
 
+        if HAS_POOL:
+            # Abre/pré-aquece o pool uma vez; batches seguintes reaproveitam
+            await self.open_async_pool(max_tasks=max_tasks)
+
+        if use_copy and copy_format == "binary":
+            # Tipos resolvidos uma vez para todos os chunks
+            if copy_types is None and isinstance(data_model_list, list) and isinstance(
+                data_model_list[0], BaseModel
+            ):
+                copy_types = type(data_model_list[0])
+            copy_types = await asyncio.to_thread(
+                self.resolve_copy_types, table_name, columns, copy_types
+            )
+
+        # Contadores de commit de todos os chunks (também sem staging): um
+        # chunk desfeito não conta, mesmo que o erro tenha sido engolido
+        merge_stats = {"chunks": 0, "staged": 0, "inserted": 0}
+        isolation_before = isolation.metrics() if isolation is not None else None
+
         # Cria um número limitado de tasks paralelas com semáforo
         sem = asyncio.Semaphore(max_tasks)
 
@@ -399,10 +1088,16 @@ class DatabaseConnector:
                 try:
                     inserted = await self.insert_chunk(
                         table_name=table_name,
-                        data_chunk=chunk,  # Já são dicts, não BaseModel
+                        data_chunk=chunk,  # Tuplas na ordem de `columns`
                         chunk_index=idx,
                         total_chunks=total_chunks,
                         use_copy=use_copy,
+                        columns=columns,
+                        copy_format=copy_format,
+                        copy_types=copy_types,
+                        staging=staging,
+                        merge_stats=merge_stats,
+                        isolation=isolation,
                     )
                     return inserted
                 except Exception as exc:
@@ -421,50 +1116,238 @@ class DatabaseConnector:
         total = time.perf_counter() - start
         total_inserted = sum(results)
         
-        # Calcula estatísticas
-        successful_chunks = sum(1 for r in results if r > 0)
+        # Calcula estatísticas (um chunk só de duplicatas commita com 0 inseridos)
+        successful_chunks = merge_stats["chunks"]
         avg_chunk_time = total / total_chunks if total_chunks > 0 else 0
         
+        mean_bytes = sum(chunk_bytes) / total_chunks if total_chunks > 0 else 0
+        byte_imbalance = max(chunk_bytes) / mean_bytes if mean_bytes > 0 else 1.0
+
         print(
             f"Inserção paralela concluída em {total:.2f}s "
             f"({total_inserted:,} registros válidos, "
             f"{successful_chunks}/{total_chunks} chunks, "
             f"chunk={chunk_size}, tasks={max_tasks}, "
-            f"avg_chunk={avg_chunk_time:.3f}s)"
+            f"avg_chunk={avg_chunk_time:.3f}s, "
+            f"desbalanceamento={byte_imbalance:.2f}x)"
         )
 
-        return {
+        result = {
             "inserted": total_inserted,
             "duration": total,
             "chunk_size": chunk_size,
             "total_chunks": total_chunks,
             "successful_chunks": successful_chunks,
+            "failed_chunks": total_chunks - successful_chunks,
             "concurrency": max_tasks,
             "throughput": total_inserted / total if total > 0 else 0,
+            "chunk_rows": [len(chunk) for chunk in chunks],
+            "chunk_bytes": chunk_bytes,
+            "byte_imbalance": byte_imbalance,
+        }
+        self._report_failures(result, total_records, merge_stats, isolation, isolation_before)
+        if staging and use_copy:
+            result["staged"] = merge_stats["staged"]
+            result["skipped"] = merge_stats["staged"] - merge_stats["inserted"]
+            print(
+                f"   🔀 Staging '{staging}': {result['staged']:,} na staging, "
+                f"{result['skipped']:,} já existentes descartados no merge"
+            )
+        return result
+
+    async def _insert_adaptive(
+        self, table_name, data_model_list, rows, columns, controller, start,
+        use_copy, copy_format, copy_types, staging, isolation=None,
+    ):
+        """`insert_async_parallel` com chunk_size/concorrência do controller AIMD."""
+        if HAS_POOL:
+            # Conexões até o teto do controller; as tasks extras só abrem se ele subir
+            await self.open_async_pool(
+                max_tasks=controller.tasks, max_size=controller.task_bounds[1]
+            )
+
+        if use_copy and copy_format == "binary":
+            if copy_types is None and isinstance(data_model_list, list) and isinstance(
+                data_model_list[0], BaseModel
+            ):
+                copy_types = type(data_model_list[0])
+            copy_types = await asyncio.to_thread(
+                self.resolve_copy_types, table_name, columns, copy_types
+            )
+
+        # Contadores de commit de todos os chunks (também sem staging): um
+        # chunk só de duplicatas commita com 0 inseridos e não é falha
+        merge_stats = {"chunks": 0, "staged": 0, "inserted": 0}
+        decisions_before = len(controller.decisions)
+        isolation_before = isolation.metrics() if isolation is not None else None
+
+        async def worker(idx, chunk, nbytes):
+            chunk_start = time.perf_counter()
+            chunk_stats = {"chunks": 0, "staged": 0, "inserted": 0}
+            error = None
+            try:
+                inserted = await self.insert_chunk(
+                    table_name=table_name,
+                    data_chunk=chunk,
+                    use_copy=use_copy,
+                    columns=columns,
+                    copy_format=copy_format,
+                    copy_types=copy_types,
+                    staging=staging,
+                    merge_stats=chunk_stats,
+                    isolation=isolation,
+                    raise_errors=True,
+                )
+                return inserted
+            except Exception as exc:
+                error = exc
+                print(f"❌ Falha no chunk {idx + 1}: {exc}")
+                return 0
+            finally:
+                for key, value in chunk_stats.items():
+                    merge_stats[key] += value
+                controller.observe(
+                    len(chunk), nbytes, time.perf_counter() - chunk_start,
+                    ok=chunk_congestion_ok(chunk_stats, error),
+                )
+                await controller.release()
+
+        tasks = []
+        chunk_rows = []
+        chunk_bytes = []
+        position = 0
+        while position < len(rows):
+            # Vaga primeiro: o corte usa o chunk_size decidido até este momento
+            await controller.acquire()
+            chunk = rows[position : position + controller.chunk_size]
+            position += len(chunk)
+            chunk_rows.append(len(chunk))
+            chunk_bytes.append(chunk_nbytes(chunk))
+            tasks.append(asyncio.create_task(worker(len(tasks), chunk, chunk_bytes[-1])))
+        results = await asyncio.gather(*tasks)
+
+        total = time.perf_counter() - start
+        total_inserted = sum(results)
+        total_chunks = len(tasks)
+        successful_chunks = merge_stats["chunks"]
+        mean_bytes = sum(chunk_bytes) / total_chunks if total_chunks > 0 else 0
+        adaptive = controller.metrics(since=decisions_before)
+
+        print(
+            f"Inserção adaptativa concluída em {total:.2f}s "
+            f"({total_inserted:,} registros válidos, "
+            f"{successful_chunks}/{total_chunks} chunks, "
+            f"{len(adaptive['decisions'])} decisões, "
+            f"agora chunk={controller.chunk_size}, tasks={controller.tasks})"
+        )
+
+        result = {
+            "inserted": total_inserted,
+            "duration": total,
+            "chunk_size": controller.chunk_size,
+            "total_chunks": total_chunks,
+            "successful_chunks": successful_chunks,
+            "failed_chunks": total_chunks - successful_chunks,
+            "concurrency": controller.tasks,
+            "throughput": total_inserted / total if total > 0 else 0,
+            "chunk_rows": chunk_rows,
+            "chunk_bytes": chunk_bytes,
+            "byte_imbalance": max(chunk_bytes) / mean_bytes if mean_bytes > 0 else 1.0,
+            "adaptive": adaptive,
         }
+        self._report_failures(result, len(rows), merge_stats, isolation, isolation_before)
+        if staging and use_copy:
+            result["staged"] = merge_stats["staged"]
+            result["skipped"] = merge_stats["staged"] - merge_stats["inserted"]
+        return result
+
+    @staticmethod
+    def _report_failures(result, total_rows, merge_stats, isolation, isolation_before):
+        """
+        Linhas que ficaram fora do banco (failed_rows: nem commitadas nem em
+        quarentena) e, com isolamento, as contagens da chamada.
+        """
+        quarantined = 0
+        if isolation is not None:
+            after = isolation.metrics()
+            delta = {
+                key: after[key] - isolation_before[key]
+                for key in ("chunks_failed", "bisections", "retries", "retry_wait", "quarantined")
+            }
+            delta["destination"] = after["destination"]
+            result["isolation"] = delta
+            quarantined = delta["quarantined"]
+            if quarantined:
+                print(
+                    f"   🧪 {quarantined:,} linhas em quarentena ({delta['destination']}), "
+                    f"{delta['bisections']} bisseções, {delta['retries']} retries"
+                )
+        # merge_stats["staged"] soma as linhas de cada transação commitada
+        result["failed_rows"] = total_rows - merge_stats["staged"] - quarantined
+        if result["failed_chunks"]:
+            print(
+                f"   ⚠️ {result['failed_chunks']}/{result['total_chunks']} chunks não "
+                f"commitados por inteiro ({result['failed_rows']:,} linhas fora do banco)"
+            )
 
     def insert_optimized_single_transaction(
-        self, table_name: str, data_model_list: list[BaseModel], use_on_conflict: bool = True
+        self,
+        table_name: str,
+        data_model_list: list[BaseModel],
+        use_on_conflict: bool = True,
+        before_commit=None,
+        copy_format: str = "text",
+        staging: str | None = None,
+        columns=None,
     ):
         """
-        Inserção otimizada usando COPY ou INSERT com ON CONFLICT DO NOTHING.
+        Inserção otimizada usando COPY, INSERT com ON CONFLICT DO NOTHING ou
+        COPY em staging + merge.
         
         Args:
             table_name: Nome da tabela
-            data_model_list: Lista de BaseModel para inserir
+            data_model_list: Lista de BaseModel para inserir (ou tuplas/ColumnBatch, ver `columns`)
             use_on_conflict: Se True, usa INSERT com ON CONFLICT DO NOTHING (mais seguro para duplicatas).
                            Se False, usa COPY (mais rápido mas falha se houver duplicatas).
+            before_commit: Callable (cursor, linhas enviadas) executado na mesma
+                transação, logo antes do commit (ex.: CheckpointManifest.record).
+            copy_format: "text" ou "binary" (tipos das anotações do modelo) no
+                caminho COPY (use_on_conflict=False ou staging).
+            staging: "temp" ou "unlogged" ativa a terceira estratégia (ver
+                `insert_staged_merge`): COPY + INSERT ... SELECT ON CONFLICT,
+                ignorando `use_on_conflict`.
+            columns: Se informado, `data_model_list` já contém tuplas nessa
+                ordem de colunas (ex.: `RowEncoder.from_records`); o COPY
+                binário usa então os tipos do catálogo. Um `ColumnBatch`
+                traz as próprias colunas.
         """
         if not data_model_list:
             return 0
 
+        if isinstance(data_model_list, ColumnBatch):
+            columns, values, model = data_model_list.columns, data_model_list, None
+        elif columns is not None:
+            values = data_model_list
+            model = None
+        else:
+            model = type(data_model_list[0])
+            columns, values = model_rows(data_model_list)
+
+        if staging:
+            result = self.insert_staged_merge(
+                table_name,
+                columns,
+                values,
+                staging=staging,
+                copy_format=copy_format,
+                copy_types=model,
+                before_commit=before_commit,
+            )
+            return result["inserted"]
+
         method = "INSERT com ON CONFLICT" if use_on_conflict else "COPY"
         print(f"🚀 Inserção otimizada ({method} em transação única)")
         start_time = time.perf_counter()
-
-        data_dicts = [m.dict() for m in data_model_list]
-        columns = list(data_dicts[0].keys())
-        values = [tuple(d[c] for c in columns) for d in data_dicts]
         cols_str = ", ".join(columns)
 
         with psycopg.connect(self.conn_str) as conn:
@@ -478,13 +1361,17 @@ class DatabaseConnector:
                             "ON CONFLICT (paper_id) DO NOTHING"
                         )
                         cur.executemany(query, values)
+                        inserted = cur.rowcount
                     else:
                         # Usa COPY (mais rápido, mas falha se houver duplicatas)
-                        with cur.copy(f"COPY {table_name} ({cols_str}) FROM STDIN") as copy:
-                            for row in values:
-                                copy.write_row(row)
+                        types = None
+                        if copy_format == "binary":
+                            types = self.resolve_copy_types(table_name, columns, model)
+                        self._copy_rows(cur, table_name, columns, values, copy_format, types)
+                        inserted = len(data_model_list)
+                    if before_commit is not None:
+                        before_commit(cur, len(values))
                     conn.commit()
-                    inserted = cur.rowcount if use_on_conflict else len(data_model_list)
                 except psycopg.errors.UniqueViolation:
                     # Fallback: se ainda houver UniqueViolation (não deveria acontecer com ON CONFLICT)
                     print(
@@ -501,3 +1388,418 @@ class DatabaseConnector:
         print(f"✅ Inseridos {inserted:,} registros em {duration:.2f}s")
 
         return inserted
+
+    def copy_rows_stream(
+        self,
+        table_name: str,
+        columns,
+        rows,
+        before_commit=None,
+        copy_format: str = "text",
+        copy_types=None,
+        truncate: bool = False,
+        freeze: bool = False,
+    ):
+        """
+        COPY em transação única consumindo `rows` de forma preguiçosa.
+
+        Aceita qualquer iterável de tuplas (inclusive geradores), na ordem de
+        `columns`. Cada tupla é repassada direto para `copy.write_row`, então
+        o pico de memória fica limitado ao buffer do COPY em trânsito, e não
+        ao batch inteiro. Um `ColumnBatch` no formato texto vai em blocos
+        montados direto das colunas Arrow.
+
+        `before_commit(cursor, linhas enviadas)` roda na mesma transação,
+        logo antes do commit (ex.: CheckpointManifest.record).
+
+        `copy_format="binary"` envia os valores já no formato binário do
+        Postgres (sem escape no cliente nem parse de texto no servidor);
+        os tipos vêm de `copy_types` (ver `resolve_copy_types`).
+
+        `truncate=True` esvazia a tabela na mesma transação do COPY, o que
+        permite `freeze=True` (COPY ... FREEZE: linhas gravadas já
+        congeladas, sem o VACUUM de congelamento depois; ver load_profile.py).
+
+        Returns:
+            Número de registros enviados (0 em caso de erro/rollback).
+        """
+        print(
+            f"🚀 Inserção em streaming (COPY {copy_format}{' FREEZE' if freeze else ''} "
+            f"em transação única) em '{table_name}'"
+        )
+        start_time = time.perf_counter()
+        inserted = 0
+        types = None
+        if copy_format == "binary":
+            types = self.resolve_copy_types(table_name, columns, copy_types)
+
+        with psycopg.connect(self.conn_str) as conn:
+            with conn.cursor() as cur:
+                try:
+                    if truncate:
+                        cur.execute(f"TRUNCATE {table_name}")
+                    inserted = self._copy_rows(
+                        cur, table_name, columns, rows, copy_format, types, freeze
+                    )
+                    if before_commit is not None:
+                        before_commit(cur, inserted)
+                    conn.commit()
+                except psycopg.errors.UniqueViolation:
+                    print("⚠️ Batch ignorado por duplicidades (COPY abortado).")
+                    conn.rollback()
+                    inserted = 0
+                except Exception as e:
+                    print(f"❌ Erro na inserção: {e}")
+                    conn.rollback()
+                    inserted = 0
+
+        duration = time.perf_counter() - start_time
+        print(f"✅ Inseridos {inserted:,} registros em {duration:.2f}s")
+
+        return inserted
+
+    def copy_rows_parallel(
+        self,
+        table_name: str,
+        columns,
+        rows,
+        workers: int = 4,
+        chunk_rows: int = 1000,
+        commit_rows: int = 50_000,
+        before_commit=None,
+        copy_format: str = "text",
+        copy_types=None,
+        staging: str | None = None,
+    ):
+        """
+        COPY síncrono em `workers` conexões persistentes.
+
+        A thread chamadora consome `rows` (qualquer iterável, inclusive
+        geradores) e publica blocos de `chunk_rows` tuplas em uma fila
+        limitada; cada worker mantém UMA conexão aberta durante toda a carga
+        e faz streaming das tuplas da fila para o COPY, commitando a cada
+        `commit_rows` linhas. Ao contrário de `batch_process_rows` (conexão
+        nova + executemany por lote), o custo de conexão é pago uma vez e a
+        carga escala com o número de sockets.
+
+        Args:
+            staging: "temp" (ou "unlogged" com workers=1, ver
+                `check_staging_concurrency`): cada transação do worker faz
+                COPY na staging + merge com ON CONFLICT DO NOTHING (ver
+                `insert_staged_merge`).
+            before_commit: Callable (cursor, linhas inseridas) executado em
+                uma transação própria ao final, apenas se nenhum worker falhou
+                (os dados commitam em várias transações).
+
+        Returns:
+            dict com inserted, skipped (descartados no merge), failed
+            (linhas de transações desfeitas),
+            aborted (todos os workers encerraram após falhas seguidas), duration, throughput, producer_wait (tempo bloqueado com a fila
+            cheia: banco é o gargalo) e workers (linhas, commits, vazão e
+            latência de commit de cada worker).
+        """
+        check_staging_concurrency(staging, workers)
+        print(
+            f"🚀 COPY {copy_format} paralelo em '{table_name}' "
+            f"({workers} conexões, commit a cada {commit_rows:,} linhas)"
+        )
+        start_time = time.perf_counter()
+        types = None
+        if copy_format == "binary":
+            types = self.resolve_copy_types(table_name, columns, copy_types)
+
+        work = queue.Queue(maxsize=2 * workers)
+        stats = [
+            {
+                "worker": i,
+                "rows": 0,
+                "staged": 0,
+                "failed": 0,
+                "commits": 0,
+                "copy_time": 0.0,
+                "commit_latencies": [],
+                "errors": [],
+            }
+            for i in range(workers)
+        ]
+
+        def worker(stat):
+            done = False
+            pending = 0  # linhas retiradas da fila na transação corrente
+
+            def pull():
+                # Tuplas da fila até completar uma transação (ou o fim da carga)
+                nonlocal done, pending
+                while pending < commit_rows:
+                    chunk = work.get()
+                    if chunk is None:
+                        done = True
+                        return
+                    pending += len(chunk)
+                    yield from chunk
+
+            conn = None
+            consecutive_errors = 0
+            while not done:
+                pending = 0
+                try:
+                    if conn is None or conn.closed:
+                        conn = psycopg.connect(self.conn_str)
+                    with conn.cursor() as cur:
+                        copy_target = table_name
+                        if staging:
+                            copy_target = f"{table_name}_stage"
+                            cur.execute(staging_table_sql(table_name, copy_target, staging))
+                            if staging == "unlogged":
+                                cur.execute(f"TRUNCATE {copy_target}")
+
+                        copy_start = time.perf_counter()
+                        sent = self._copy_rows(
+                            cur, copy_target, columns, pull(), copy_format, types
+                        )
+                        inserted = sent
+                        if copy_target != table_name:
+                            cur.execute(merge_sql(table_name, copy_target, columns))
+                            inserted = cur.rowcount
+                        stat["copy_time"] += time.perf_counter() - copy_start
+
+                    commit_start = time.perf_counter()
+                    conn.commit()
+                    if sent:
+                        stat["commit_latencies"].append(time.perf_counter() - commit_start)
+                        stat["commits"] += 1
+                        stat["rows"] += inserted
+                        stat["staged"] += sent
+                    consecutive_errors = 0
+                except Exception as e:
+                    stat["failed"] += pending
+                    stat["errors"].append(str(e))
+                    consecutive_errors += 1
+                    print(f"❌ Worker {stat['worker']}: transação desfeita: {e}")
+                    if conn is not None and not conn.closed:
+                        conn.rollback()
+                    if consecutive_errors >= 3:
+                        print(f"❌ Worker {stat['worker']}: encerrado após 3 falhas seguidas")
+                        break
+            if conn is not None:
+                conn.close()
+
+        threads = [
+            threading.Thread(target=worker, args=(stat,), name=f"copy-worker-{stat['worker']}")
+            for stat in stats
+        ]
+        for thread in threads:
+            thread.start()
+
+        def put(item):
+            # Não bloqueia para sempre se todos os workers encerraram
+            while any(thread.is_alive() for thread in threads):
+                try:
+                    work.put(item, timeout=1.0)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        producer_wait = 0.0
+        aborted = False
+        try:
+            for chunk in chunked(rows, chunk_rows):
+                put_start = time.perf_counter()
+                if not put(chunk):
+                    print("❌ Todos os workers de COPY encerraram; carga interrompida")
+                    aborted = True
+                    break
+                producer_wait += time.perf_counter() - put_start
+        finally:
+            for _ in threads:
+                put(None)
+            for thread in threads:
+                thread.join()
+
+        # Blocos que ficaram na fila sem worker para consumi-los
+        unsent = 0
+        while not work.empty():
+            chunk = work.get_nowait()
+            if chunk is not None:
+                unsent += len(chunk)
+
+        duration = time.perf_counter() - start_time
+        inserted = sum(stat["rows"] for stat in stats)
+        failed = sum(stat["failed"] for stat in stats) + unsent
+        skipped = sum(stat["staged"] for stat in stats) - inserted
+
+        worker_metrics = []
+        for stat in stats:
+            latencies = stat["commit_latencies"]
+            worker_metrics.append(
+                {
+                    "worker": stat["worker"],
+                    "rows": stat["rows"],
+                    "failed": stat["failed"],
+                    "commits": stat["commits"],
+                    "copy_time": stat["copy_time"],
+                    "throughput": stat["rows"] / stat["copy_time"] if stat["copy_time"] > 0 else 0,
+                    "commit_latency_avg": sum(latencies) / len(latencies) if latencies else 0.0,
+                    "commit_latency_max": max(latencies, default=0.0),
+                    "errors": stat["errors"],
+                }
+            )
+
+        if before_commit is not None and failed == 0 and not aborted:
+            with psycopg.connect(self.conn_str) as conn:
+                with conn.cursor() as cur:
+                    before_commit(cur, inserted)
+                conn.commit()
+
+        print(
+            f"✅ Inseridos {inserted:,} registros em {duration:.2f}s "
+            f"(≈ {inserted / duration if duration > 0 else 0:,.0f} regs/s, "
+            f"fila cheia {producer_wait:.2f}s"
+            + (f", {skipped:,} duplicados ignorados" if skipped else "")
+            + (f", {failed:,} linhas desfeitas" if failed else "")
+            + ")"
+        )
+        for metrics in worker_metrics:
+            print(
+                f"   🔌 Worker {metrics['worker']}: {metrics['rows']:,} linhas, "
+                f"{metrics['commits']} commits, {metrics['throughput']:,.0f} regs/s, "
+                f"commit médio {metrics['commit_latency_avg'] * 1000:.1f}ms "
+                f"(máx {metrics['commit_latency_max'] * 1000:.1f}ms)"
+            )
+
+        return {
+            "inserted": inserted,
+            "failed": failed,
+            "skipped": skipped,
+            "aborted": aborted,
+            "duration": duration,
+            "throughput": inserted / duration if duration > 0 else 0,
+            "producer_wait": producer_wait,
+            "workers": worker_metrics,
+        }
+
+    def compare_copy_formats(
+        self, table_name: str, columns, rows, formats=("text", "binary"), repeats: int = 3
+    ):
+        """
+        Mede COPY texto x binário com as MESMAS linhas.
+
+        Cada formato carrega `rows` `repeats` vezes em uma tabela temporária
+        com a estrutura de `table_name` (TRUNCATE entre as rodadas) e fica
+        com o melhor tempo. Tipos do binário: catálogo de `table_name`.
+
+        Returns:
+            {formato: {"seconds", "rows_per_s", "mb_per_s"}}
+        """
+        rows = list(rows)
+        nbytes = sum(row_nbytes(r) for r in rows)
+        types = self.table_copy_types(table_name, columns)
+        results = {}
+
+        with psycopg.connect(self.conn_str) as conn:
+            conn.execute(
+                f"CREATE TEMP TABLE copy_format_bench (LIKE {table_name} INCLUDING DEFAULTS)"
+            )
+            conn.commit()
+            for copy_format in formats:
+                times = []
+                for _ in range(repeats):
+                    conn.execute("TRUNCATE copy_format_bench")
+                    conn.commit()
+                    start = time.perf_counter()
+                    with conn.cursor() as cur:
+                        self._copy_rows(
+                            cur, "copy_format_bench", columns, rows, copy_format, types
+                        )
+                    conn.commit()
+                    times.append(time.perf_counter() - start)
+                best = min(times)
+                results[copy_format] = {
+                    "seconds": best,
+                    "rows_per_s": len(rows) / best if best > 0 else 0,
+                    "mb_per_s": nbytes / (1024**2) / best if best > 0 else 0,
+                }
+                print(
+                    f"📦 COPY {copy_format:<6}: {len(rows):,} linhas em {best:.2f}s "
+                    f"(≈ {results[copy_format]['rows_per_s']:,.0f} regs/s, "
+                    f"{results[copy_format]['mb_per_s']:.1f} MB/s)"
+                )
+        return results
+
+    def insert_staged_merge(
+        self,
+        table_name: str,
+        columns,
+        rows,
+        conflict_target: str = "paper_id",
+        staging: str = "temp",
+        copy_format: str = "text",
+        copy_types=None,
+        before_commit=None,
+    ):
+        """
+        COPY do batch para uma tabela de staging + um único
+        `INSERT INTO destino SELECT ... ON CONFLICT DO NOTHING`.
+
+        Velocidade de COPY sem que uma duplicata aborte o batch inteiro
+        (como no COPY direto) e sem o INSERT linha a linha do executemany.
+
+        Args:
+            staging: "temp" (TEMP por sessão, seguro com loaders concorrentes)
+                ou "unlogged" ({table}_stage UNLOGGED persistente; o TRUNCATE
+                no início serializa loaders concorrentes).
+            before_commit: Como em `copy_rows_stream` (recebe as linhas inseridas).
+
+        Returns:
+            dict com staged, inserted, skipped (duplicatas), failed,
+            copy_time, merge_time e duration. Os contadores só valem após o
+            commit: em erro/rollback staged = inserted = skipped = 0 e failed
+            traz as linhas que chegaram à staging antes da falha.
+        """
+        stage_name = f"{table_name}_stage"
+        start_time = time.perf_counter()
+        result = {
+            "staged": 0, "inserted": 0, "skipped": 0, "failed": 0,
+            "copy_time": 0.0, "merge_time": 0.0,
+        }
+        types = None
+        if copy_format == "binary":
+            types = self.resolve_copy_types(table_name, columns, copy_types)
+
+        staged = 0
+        with psycopg.connect(self.conn_str) as conn:
+            with conn.cursor() as cur:
+                try:
+                    cur.execute(staging_table_sql(table_name, stage_name, staging))
+                    if staging == "unlogged":
+                        cur.execute(f"TRUNCATE {stage_name}")
+
+                    copy_start = time.perf_counter()
+                    staged = self._copy_rows(cur, stage_name, columns, rows, copy_format, types)
+                    result["copy_time"] = time.perf_counter() - copy_start
+
+                    merge_start = time.perf_counter()
+                    cur.execute(merge_sql(table_name, stage_name, columns, conflict_target))
+                    inserted = cur.rowcount
+                    result["merge_time"] = time.perf_counter() - merge_start
+
+                    if before_commit is not None:
+                        before_commit(cur, inserted)
+                    conn.commit()
+                    # Só depois do commit: um merge desfeito não conta como duplicata
+                    result["staged"] = staged
+                    result["inserted"] = inserted
+                    result["skipped"] = staged - inserted
+                except Exception as e:
+                    print(f"❌ Erro na inserção via staging: {e}")
+                    conn.rollback()
+                    result["failed"] = staged
+
+        result["duration"] = time.perf_counter() - start_time
+        print(
+            f"✅ Staging + merge: {result['inserted']:,} inseridos, "
+            f"{result['skipped']:,} duplicados ignorados de {result['staged']:,} "
+            f"(COPY {result['copy_time']:.2f}s, merge {result['merge_time']:.2f}s)"
+        )
+        return result
@@ -2,15 +2,48 @@
 # pip install kagglehub[pandas-datasets]
 # import kagglehub
 # from kagglehub import KaggleDatasetAdapter
+import asyncio
+import math
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Set the path to the file you'd like to load
 import pandas as pd
 import zipfile
 import json
 
-from etl_psycopg3 import DatabaseConnector
-from schemas import Artigo, ArtigoStaging
+from etl_psycopg3 import (
+    HAS_POOL,
+    DatabaseConnector,
+    check_staging_concurrency,
+    chunk_congestion_ok,
+    chunk_nbytes,
+    partition_rows,
+)
+from datetime import datetime
+
+from adaptive import AIMDController
+from bulk_load import DeferredIndexes
+from checkpoint import CheckpointManifest
+from column_batch import ARTIGOS_STG_ARROW_TYPES, ColumnBatch, ColumnBatchBuilder
+
+from corpus_cache import CorpusCache
+from load_profile import LoadProfile, check_profile_resume
+from dedup import ZipDuplicates
+from json_extract import REFERENCE_KEYS, PartialJSONExtractor, make_extractor
+from metadata_index import MetadataHashIndex
+from metadata_loader import MetadataLoader
+from parse_pool import ArticleParsePool
+from quarantine import PoisonRowIsolation, Quarantine
+from schemas import (
+    ARTIGOS_STG_COLUMNS,
+    Artigo,
+    ArtigoStaging,
+    artigo_staging_row,
+    row_encoder,
+    staging_row_is_valid,
+)
+from zip_index import ZipMemberIndex
 
 # # Load the latest version
 # df = kagglehub.load_dataset(
@@ -44,8 +77,197 @@ zip_path = "/Users/raphaelportela/datasetcovid.zip"
 
 
 class ZipFileAnalyzer:
-    def __init__(self, zip_path):
+    def __init__(
+        self,
+        zip_path,
+        parse_workers: int | None = None,
+        json_engine: str = "json",
+        duplicate_rule: str | None = None,
+        trusted_rows: bool = False,
+    ):
+        """
+        Args:
+            zip_path: Caminho do ZIP do CORD-19.
+            parse_workers: Processos do parse_mode="pool" (padrão: cpu_count).
+            json_engine: "json" (json.load completo), "partial" (decodifica só
+                paper_id/title/body_text e pula bib_entries/ref_entries) ou
+                "orjson" (decodificador rápido opcional).
+            duplicate_rule: Se informado ("pmc", "longest" ou "first"), membros
+                que repetem um paper_id dentro do ZIP são pulados antes do
+                parse, mantendo só o preferido pela regra (ver dedup.py).
+            trusted_rows: No parse_mode="dataframe", monta as tuplas direto
+                dos registros, sem validar contra ArtigoStaging (ver
+                schemas.RowEncoder).
+        """
         self.zip_path = zip_path
+        self.parse_workers = parse_workers
+        self.json_engine = json_engine
+        self.duplicate_rule = duplicate_rule
+        self.trusted_rows = trusted_rows
+        self.json_extractor = make_extractor(json_engine)
+        self._member_index = None
+        self._zip_file = None
+        self._parse_pool = None
+        self._corpus_cache = None
+        # Membros sem paper_id descartados antes do COPY (tuplas diretas)
+        self._invalid_members = 0
+        self._metadata_index = None
+        self._duplicates = None
+
+    @property
+    def member_index(self):
+        """Índice dos JSONs do ZIP, carregado do cache em disco uma única vez."""
+        if self._member_index is None:
+            self._member_index = ZipMemberIndex.load(self.zip_path)
+        return self._member_index
+
+    @property
+    def duplicate_skip(self):
+        """Posições do índice a pular (duplicatas de paper_id no ZIP)."""
+        if self.duplicate_rule is None:
+            return frozenset()
+        if self._duplicates is None:
+            self._duplicates = ZipDuplicates.load(
+                self.member_index, self.zip_file, rule=self.duplicate_rule
+            )
+        return self._duplicates.skip
+
+    @property
+    def zip_file(self):
+        """Handle de ZipFile de longa duração, reutilizado entre batches."""
+        if self._zip_file is None:
+            self._zip_file = zipfile.ZipFile(self.zip_path, "r")
+        return self._zip_file
+
+    @property
+    def parse_pool(self):
+        """Pool de processos de parse (cada worker com seu próprio ZipFile)."""
+        if self._parse_pool is None:
+            self._parse_pool = ArticleParsePool(
+                self.zip_path, workers=self.parse_workers, json_engine=self.json_engine
+            )
+        return self._parse_pool
+
+    @property
+    def corpus_cache(self):
+        """Cache colunar (Arrow IPC) do corpus, materializado sob demanda."""
+        if self._corpus_cache is None:
+            self._corpus_cache = CorpusCache(self.zip_path)
+        if not self._corpus_cache.is_valid():
+            self.materialize_corpus_cache()
+        return self._corpus_cache
+
+    def materialize_corpus_cache(
+        self, include_paragraphs: bool = False, partition_files: int = 10000, fmt: str = "arrow"
+    ):
+        """
+        Passo único: descomprime e extrai todos os JSONs e grava as partições
+        colunares usadas por parse_mode="cache".
+        """
+        if self._corpus_cache is None or self._corpus_cache.fmt != fmt:
+            self._corpus_cache = CorpusCache(self.zip_path, fmt=fmt)
+        self._corpus_cache.materialize(
+            self.member_index,
+            self.zip_file,
+            partition_files=partition_files,
+            include_paragraphs=include_paragraphs,
+        )
+        return self._corpus_cache
+
+    @property
+    def metadata_index(self):
+        """Índice hash sha/pmcid → (cord_uid, linha), persistido e memory-mapped."""
+        if self._metadata_index is None:
+            self._metadata_index = MetadataHashIndex.load(self.zip_path)
+        return self._metadata_index
+
+    def lookup_metadata(self, paper_ids):
+        """
+        Busca vetorizada de vários paper_ids (sha ou PMCID) no metadata.
+        Retorna DataFrame com paper_id, cord_uid e metadata_row (-1 = ausente).
+        """
+        paper_ids = list(paper_ids)
+        cord_uids, rows = self.metadata_index.lookup_many(paper_ids)
+        return pd.DataFrame(
+            {"paper_id": paper_ids, "cord_uid": cord_uids, "metadata_row": rows}
+        )
+
+    def close(self):
+        if self._zip_file is not None:
+            self._zip_file.close()
+            self._zip_file = None
+        if self._parse_pool is not None:
+            self._parse_pool.close()
+            self._parse_pool = None
+
+    def _load_json(self, f):
+        """json.load ou extração parcial, conforme `json_engine`."""
+        if self.json_extractor is None:
+            return json.load(f)
+        return self.json_extractor.load(f)
+
+    @property
+    def invalid_members(self):
+        """Membros sem paper_id descartados até aqui (ZIP, pool e cache colunar)."""
+        cached = self._corpus_cache.invalid_rows if self._corpus_cache is not None else 0
+        return self._invalid_members + cached
+
+    def _skip_invalid(self, filename):
+        self._invalid_members += 1
+        print(f"⚠️ {filename}: sem paper_id, membro ignorado")
+
+    def _drop_invalid_rows(self, rows):
+        """Tuplas sem paper_id saem antes do COPY (ver `staging_row_is_valid`)."""
+        valid = []
+        for row in rows:
+            if staging_row_is_valid(row):
+                valid.append(row)
+            else:
+                self._skip_invalid(row[1])
+        return valid
+
+    def _json_stats(self):
+        """Cópia das estatísticas do extrator (bytes/objetos pulados) e dos membros inválidos."""
+        stats = dict(self.json_extractor.stats) if self.json_extractor else {}
+        stats["invalid_members"] = self.invalid_members
+        return stats
+
+    def _json_metrics(self, stats_before):
+        """
+        Métricas de parse do batch (diferença desde `stats_before`):
+        membros sem paper_id descartados e extração parcial do JSON.
+        """
+        invalid = {"invalid_members": self.invalid_members - stats_before.get("invalid_members", 0)}
+        if self.json_extractor is None:
+            return invalid
+        stats = self.json_extractor.stats
+        return {
+            **invalid,
+            "json_bytes_total": stats["bytes_total"] - stats_before.get("bytes_total", 0),
+            "json_bytes_skipped": stats["bytes_skipped"] - stats_before.get("bytes_skipped", 0),
+            "json_objects_skipped": stats["objects_skipped"]
+            - stats_before.get("objects_skipped", 0),
+        }
+
+    def _skipped_in(self, positions):
+        """Quantas posições do range são duplicatas puladas."""
+        skip = self.duplicate_skip
+        return sum(1 for p in positions if p in skip) if skip else 0
+
+    def _iter_members(self, number_of_files, offset=0):
+        """
+        Percorre o slice [offset, offset + number_of_files) do índice,
+        abrindo cada membro direto pelo offset do header local.
+        """
+        index = self.member_index
+        positions = index.positions(offset, number_of_files)
+
+        skip = self.duplicate_skip
+        for position in positions:
+            if position in skip:
+                continue
+            with self.zip_file.open(index.zipinfo(position)) as f:
+                yield index.names[position], f
 
     def analyze(self):
         with zipfile.ZipFile(self.zip_path, "r") as z:
@@ -139,7 +361,34 @@ class ZipFileAnalyzer:
         return metadata
 
     def return_metada_as_df(self, paper_id=None):
-        with zipfile.ZipFile(zip_path, "r") as z:
+        if paper_id:
+            # Busca O(1) no índice hash em vez de str.contains sobre a coluna sha
+            hit = self.metadata_index.lookup(paper_id)
+            if hit is None:
+                print(f"⚠️ No matches found for {paper_id}")
+                return None
+            cord_uid, row = hit
+            with zipfile.ZipFile(self.zip_path, "r") as z:
+                matches = MetadataLoader(self.zip_path).take_rows(z, [row]).to_pandas()
+            print(
+                f"\n🔍 Found {len(matches)} match(es) for paper_id = {paper_id} "
+                f"(cord_uid={cord_uid}, linha {row:,})"
+            )
+            print(
+                matches[
+                    [
+                        "title",
+                        "authors",
+                        "doi",
+                        "journal",
+                        "publish_time",
+                        "url",
+                    ]
+                ]
+            )
+            return matches
+
+        with zipfile.ZipFile(self.zip_path, "r") as z:
             metadata_path = None
             for name in z.namelist():
                 if "metadata.csv" in name:
@@ -147,142 +396,102 @@ class ZipFileAnalyzer:
                     print("✅ Found metadata file:", metadata_path)
                     break
 
-            if metadata_path:
-                with z.open(metadata_path) as f:
-                    metadata_df = pd.read_csv(f, low_memory=False)
-                print(
-                    f"✅ Loaded metadata.csv with {len(metadata_df):,} rows and {len(metadata_df.columns)} columns."
-                )
-                print("\n📄 First 20 rows:\n")
-                print(metadata_df.head(20))
-                print("Columns:", list(metadata_df.columns))
-            else:
+            if not metadata_path:
                 print("❌ metadata.csv not found inside the ZIP.")
-            if paper_id:
-                matches = metadata_df[
-                    metadata_df["sha"].astype(str).str.contains(paper_id, na=False)
-                ]
-                if not matches.empty:
-                    print(
-                        f"\n🔍 Found {len(matches)} match(es) for paper_id = {paper_id}"
-                    )
-                    print(
-                        matches[
-                            [
-                                "title",
-                                "authors",
-                                "doi",
-                                "journal",
-                                "publish_time",
-                                "url",
-                            ]
-                        ]
-                    )
-                    print("matches", matches)
-                    return matches
-            else:
-                print(f"⚠️ No matches found for {paper_id}")
                 return None
+            with z.open(metadata_path) as f:
+                metadata_df = pd.read_csv(f, low_memory=False)
+        print(
+            f"✅ Loaded metadata.csv with {len(metadata_df):,} rows and {len(metadata_df.columns)} columns."
+        )
+        print("\n📄 First 20 rows:\n")
+        print(metadata_df.head(20))
+        print("Columns:", list(metadata_df.columns))
+        return metadata_df
 
     def get_paragraphs_data(self, number_of_files, offset=0):
-        with zipfile.ZipFile(self.zip_path, "r") as z:
-            body_records = []
-            data_dict = {}
-            records = []
-            cite_rows = []
-            start_index = offset
-            json_files = [f for f in z.namelist() if f.endswith(".json")]
-            end_index = offset + number_of_files if number_of_files else len(json_files)
-
-            # DEBUG: Mostra informações do slice
-            total_jsons = len(json_files)
-            actual_slice = json_files[start_index:end_index]
-            print(f"🔍 DEBUG: Total JSONs no ZIP: {total_jsons:,}")
-            print(f"🔍 DEBUG: Slice solicitado: [{start_index:,}:{end_index:,}]")
-            print(f"🔍 DEBUG: JSONs no slice: {len(actual_slice):,}")
-
-            # for filename in json_files[:number_of_files]:
-            for filename in actual_slice:
-                with z.open(filename) as f:
-                    data = json.load(f)
-                    # all_data.append(data)
-                    data_dict[filename] = data
-                    body_text = " ".join([p["text"] for p in data.get("body_text", [])])
-
-                    # Adiciona registro principal
-                    records.append(
-                        {
-                            "file_name": filename,
-                            "paper_id": data.get("paper_id"),
-                            "title": data.get("metadata", {}).get("title"),
-                            "authors": [
-                                a.get("last", "")
-                                for a in data.get("metadata", {}).get("authors", [])
-                            ],
-                            "body_text": body_text,
-                        }
-                    )
+        body_records = []
+        data_dict = {}
+        records = []
+        cite_rows = []
+        start_index = offset
+
+        for filename, f in self._iter_members(number_of_files, offset):
+            data = json.load(f)
+            # all_data.append(data)
+            data_dict[filename] = data
+            body_text = " ".join([p["text"] for p in data.get("body_text", [])])
+
+            # Adiciona registro principal
+            records.append(
+                {
+                    "file_name": filename,
+                    "paper_id": data.get("paper_id"),
+                    "title": data.get("metadata", {}).get("title"),
+                    "authors": [
+                        a.get("last", "")
+                        for a in data.get("metadata", {}).get("authors", [])
+                    ],
+                    "body_text": body_text,
+                }
+            )
 
-                    for p in data.get("body_text", []):
-                        cite_spans = p.get("cite_spans", [])
-                        body_records.append(
+            for p in data.get("body_text", []):
+                cite_spans = p.get("cite_spans", [])
+                body_records.append(
+                    {
+                        "title": data.get("metadata", {}).get("title"),
+                        "paper_id": data.get("paper_id"),
+                        "section": p.get("section"),
+                        "text": p.get("text"),
+                    }
+                )
+                if cite_spans:
+                    for c in cite_spans:
+                        cite_rows.append(
                             {
-                                "title": data.get("metadata", {}).get("title"),
                                 "paper_id": data.get("paper_id"),
                                 "section": p.get("section"),
-                                "text": p.get("text"),
+                                "cite_text": c.get("text"),
+                                "ref_id": c.get("ref_id"),
                             }
                         )
-                        if cite_spans:
-                            for c in cite_spans:
-                                cite_rows.append(
-                                    {
-                                        "paper_id": data.get("paper_id"),
-                                        "section": p.get("section"),
-                                        "cite_text": c.get("text"),
-                                        "ref_id": c.get("ref_id"),
-                                    }
-                                )
-
-            body_text_df = pd.DataFrame(body_records)
-            cite_rows_df = pd.DataFrame(cite_rows)
-
-            # Print de quantos JSONs foram processados neste batch
-            num_jsons = len(data_dict)
-            num_registros = len(body_records)
-            print(
-                f"📄 Lidos {num_jsons:,} arquivos JSON do ZIP (offset {start_index:,} a {start_index + num_jsons:,})"
-            )
-            print(
-                f"📝 Gerados {num_registros:,} registros (média de {num_registros/num_jsons:.1f} registros por JSON)"
-            )
+
+        body_text_df = pd.DataFrame(body_records)
+        cite_rows_df = pd.DataFrame(cite_rows)
+
+        # Print de quantos JSONs foram processados neste batch
+        num_jsons = len(data_dict)
+        num_registros = len(body_records)
+        print(
+            f"📄 Lidos {num_jsons:,} arquivos JSON do ZIP (offset {start_index:,} a {start_index + num_jsons:,})"
+        )
+        print(
+            f"📝 Gerados {num_registros:,} registros (média de {num_registros/num_jsons:.1f} registros por JSON)"
+        )
 
         return body_text_df, cite_rows_df
 
     # def increment_offset_and_get_files_data(self, number_of_siles,offset, number_of_files, offset=0):
 
     def get_files_data_no_references(self, number_of_files=2):
-        with zipfile.ZipFile(self.zip_path, "r") as z:
-            data_dict = {}
-            json_files = [f for f in z.namelist() if f.endswith(".json")]
-
-            print("📦 Total de arquivos JSON encontrados:", len(json_files))
+        data_dict = {}
+        print("📦 Total de arquivos JSON encontrados:", len(self.member_index))
 
-            for filename in json_files[:number_of_files]:
-                with z.open(filename) as f:
-                    data = json.load(f)
+        # 🔹 Pula bib_entries/ref_entries/back_matter sem decodificá-los
+        extractor = PartialJSONExtractor(exclude=REFERENCE_KEYS)
+        for filename, f in self._iter_members(number_of_files):
+            data_dict[filename] = extractor.load(f)
 
-                    # 🔹 Remove campos que não queremos imprimir
-                    data.pop("bib_entries", None)
-                    data.pop("ref_entries", None)
-                    data.pop("back_matter", None)
-
-                    data_dict[filename] = data
+        print(
+            f"⏭️  Referências puladas: {extractor.stats['bytes_skipped']:,} bytes, "
+            f"{extractor.stats['objects_skipped']:,} objetos"
+        )
 
-            # 🔹 Exibe os dois primeiros arquivos sem as referências
-            for file_name, content in list(data_dict.items())[:1]:
-                print(f"\n📝 Arquivo: {file_name}")
-                print(json.dumps(content, indent=2))
+        # 🔹 Exibe os dois primeiros arquivos sem as referências
+        for file_name, content in list(data_dict.items())[:1]:
+            print(f"\n📝 Arquivo: {file_name}")
+            print(json.dumps(content, indent=2))
 
         return data_dict
 
@@ -291,55 +500,510 @@ class ZipFileAnalyzer:
         Lê arquivos JSON do dataset CORD-19 dentro de um ZIP,
         remove seções não utilizadas e converte em DataFrames.
         """
-        with zipfile.ZipFile(self.zip_path, "r") as z:
-            json_files = [f for f in z.namelist() if f.endswith(".json")]
-
-            records = []
-            body_records = []
-            start_index = offset
-            end_index = offset + number_of_files if number_of_files else len(json_files)
-
-            total_jsons = len(json_files)
-            actual_slice = json_files[start_index:end_index]
-            print(f"🔍 DEBUG: Total JSONs no ZIP: {total_jsons:,}")
-            print(f"🔍 DEBUG: Slice solicitado: [{start_index:,}:{end_index:,}]")
-            print(f"🔍 DEBUG: JSONs no slice: {len(actual_slice):,}")
-
-            for filename in actual_slice:
-                with z.open(filename) as f:
-                    data = json.load(f)
-                    # Concatena o corpo do texto em um único campo
-                    body_text = " ".join([p["text"] for p in data.get("body_text", [])])
-                    # print('body_text', body_text)
-                    # Adiciona registro principal
-                    records.append(
-                        {
-                            "paper_id": data.get("paper_id"),
-                            "title": data.get("metadata", {}).get("title"),
-                            "file_name": filename,
-                            # "authors": [a.get("last", "") for a in data.get("metadata", {}).get("authors", [])],
-                            "body_text": body_text,
-                        }
-                    )
+        records = []
+        body_records = []
+
+        for filename, f in self._iter_members(number_of_files, offset):
+            data = self._load_json(f)
+            # Concatena o corpo do texto em um único campo
+            body_text = " ".join([p["text"] for p in data.get("body_text", [])])
+            # print('body_text', body_text)
+            # Adiciona registro principal
+            records.append(
+                {
+                    "paper_id": data.get("paper_id"),
+                    "title": data.get("metadata", {}).get("title"),
+                    "file_name": filename,
+                    # "authors": [a.get("last", "") for a in data.get("metadata", {}).get("authors", [])],
+                    "body_text": body_text,
+                }
+            )
+
+            # (Opcional) Armazena os parágrafos separadamente
+            # for p in data.get("body_text", []):
+            #     body_records.append({
+            #         "paper_id": data.get("paper_id"),
+            #         "section": p.get("section"),
+            #         "text": p.get("text")
+            #     })
+
+        # 🔹 Cria DataFrames principais
+        articles_df = pd.DataFrame(records)
+        # print('printando arquivos do body', body_records)
+        # body_text_df = pd.DataFrame(body_records)
+
+        return articles_df
+
+    def _staging_rows(self, articles_df):
+        """
+        Registros do DataFrame → tuplas de artigos_stg (ordem de
+        ARTIGOS_STG_COLUMNS): batch validado de uma vez, ou sem validação
+        com `trusted_rows`, e um único created_at por batch.
+
+        A validação é do batch inteiro: um registro inválido levanta
+        ValidationError e o batch todo falha (não há isolamento por linha
+        aqui; as linhas rejeitadas pelo banco são tratadas por
+        `isolate_errors` no caminho assíncrono).
+        """
+        return row_encoder(ArtigoStaging, ARTIGOS_STG_COLUMNS).from_records(
+            articles_df.to_dict(orient="records"), trusted=self.trusted_rows
+        )
+
+    def iter_article_rows(self, number_of_files, offset=0, stats=None):
+        """
+        Modo streaming: gera tuplas prontas para COPY (ordem de
+        ARTIGOS_STG_COLUMNS) uma a uma, sem DataFrame nem modelos pydantic.
+        Membros sem paper_id são pulados e contados em `invalid_members`
+        (um None na PK abortaria o COPY do batch inteiro).
+
+        Args:
+            number_of_files: Quantidade de arquivos do slice.
+            offset: Posição inicial no índice do ZIP.
+            stats: Dict opcional atualizado com "files" e "parse_time"
+                (tempo gasto só lendo/decodificando JSON).
+        """
+        if stats is None:
+            stats = {}
+        stats.setdefault("files", 0)
+        stats.setdefault("parse_time", 0.0)
+        created_at = datetime.now()
+
+        for filename, f in self._iter_members(number_of_files, offset):
+            parse_start = time.perf_counter()
+            row = artigo_staging_row(self._load_json(f), filename, created_at)
+            stats["parse_time"] += time.perf_counter() - parse_start
+            stats["files"] += 1
+            if not staging_row_is_valid(row):
+                self._skip_invalid(filename)
+                continue
+            yield row
+
+    def get_article_batch(self, number_of_files, offset=0, stats=None):
+        """
+        Parse do slice direto para um ColumnBatch (colunas Arrow de
+        artigos_stg): as tuplas de `iter_article_rows` viram colunas a cada
+        1000 linhas, então o batch inteiro nunca existe como objetos Python.
+        """
+        builder = ColumnBatchBuilder(ARTIGOS_STG_COLUMNS, ARTIGOS_STG_ARROW_TYPES)
+        for row in self.iter_article_rows(number_of_files, offset, stats=stats):
+            builder.append(row)
+        return builder.finish()
+
+    def get_article_rows_pool(self, number_of_files, offset=0):
+        """
+        Parse multi-processo do slice [offset, offset + number_of_files).
+        Retorna as tuplas de artigos_stg na ordem do ZIP.
+        """
+        positions = self.member_index.positions(offset, number_of_files)
+        rows, worker_time, json_stats = self.parse_pool.parse(
+            self.member_index, positions, skip=self.duplicate_skip
+        )
+        if self.json_extractor is not None:
+            self.json_extractor.merge_stats(json_stats)
+        rows = self._drop_invalid_rows(rows)
+        print(
+            f"🧵 Parse paralelo: {len(rows):,} JSONs em {self.parse_pool.workers} processos "
+            f"(CPU somada dos workers: {worker_time:.2f}s)"
+        )
+        return rows
+
+    async def get_article_rows_pool_async(self, number_of_files, offset=0):
+        """Versão awaitable de `get_article_rows_pool` (não bloqueia o event loop)."""
+        positions = self.member_index.positions(offset, number_of_files)
+        futures = self.parse_pool.submit(
+            self.member_index, positions, skip=self.duplicate_skip
+        )
+        results = await asyncio.gather(*(asyncio.wrap_future(f) for f in futures))
+        rows, _, json_stats = ArticleParsePool.collect(results)
+        if self.json_extractor is not None:
+            self.json_extractor.merge_stats(json_stats)
+        return self._drop_invalid_rows(rows)
+
+    def _parse_batch_rows(self, parse_mode, number_of_files, offset=0):
+        """
+        Parse bloqueante de um batch em tuplas de artigos_stg (ordem de
+        ARTIGOS_STG_COLUMNS), ou ColumnBatch nos modos "cache" e "columnar".
+        Roda no executor do pipeline sobreposto.
+        """
+        if parse_mode == "cache":
+            return self.corpus_cache.read_batch(
+                number_of_files, offset=offset, skip=self.duplicate_skip
+            )
+        if parse_mode == "columnar":
+            return self.get_article_batch(number_of_files, offset=offset)
+        articles_df = self.get_files_data_as_dataframe(number_of_files=number_of_files, offset=offset)
+        return self._staging_rows(articles_df)
+
+    @staticmethod
+    def _next_slice(manifest, current_offset, remaining, batch_size):
+        """
+        (offset, restantes, tamanho) do próximo batch. Com checkpoint, pula
+        os intervalos já commitados em qualquer ponto do range e não deixa
+        o batch atravessar o próximo (ver `CheckpointManifest.pending_span`).
+        """
+        if manifest is None:
+            return current_offset, remaining, min(batch_size, remaining)
+        start, end = manifest.pending_span(current_offset)
+        remaining -= start - current_offset
+        return start, remaining, min(batch_size, remaining, end - start)
+
+    async def _execute_overlapped(
+        self,
+        connector,
+        manifest,
+        batch_size,
+        remaining,
+        current_offset,
+        max_tasks,
+        parse_mode,
+        batch_bytes,
+        use_copy,
+        copy_format,
+        staging,
+        queue_chunks=None,
+        controller=None,
+        isolation=None,
+    ):
+        """
+        Pipeline produtor/consumidor de `execute_batch_parallel`.
+
+        O produtor parseia um batch por vez fora do event loop (executor de
+        uma thread, ou o pool de processos no parse_mode="pool"), divide as
+        tuplas em chunks (LPT, como `insert_async_parallel`) e os coloca em
+        uma `asyncio.Queue` limitada; `max_tasks` inseridores drenam a fila
+        com `insert_chunk`. Com a fila cheia o produtor espera, então no
+        máximo `queue_chunks` chunks parseados ficam em memória além dos que
+        estão sendo inseridos — e o parse do batch seguinte corre enquanto
+        os chunks do atual são inseridos.
+
+        Returns:
+            (batch_metrics, total inserido, métricas de overlap)
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=queue_chunks or 2 * max_tasks)
+        parse_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="parse")
+        batches = []
+        busy = {"active": 0, "since": 0.0, "time": 0.0}  # tempo com algum insert em andamento
+        parse_total = 0.0
+        failures = []  # exceções dos inseridores fora do insert_chunk (checkpoint, controller)
+
+        def insert_span(batch):
+            # None enquanto o batch não teve chunk concluído
+            if batch["insert_start"] is None or batch["insert_end"] is None:
+                return 0.0
+            return batch["insert_end"] - batch["insert_start"]
+
+        copy_types = None
+        if use_copy and copy_format == "binary":
+            # Tipos resolvidos uma vez para todos os chunks
+            copy_types = await asyncio.to_thread(
+                connector.resolve_copy_types, "artigos_stg", ARTIGOS_STG_COLUMNS
+            )
 
-                    # (Opcional) Armazena os parágrafos separadamente
-                    # for p in data.get("body_text", []):
-                    #     body_records.append({
-                    #         "paper_id": data.get("paper_id"),
-                    #         "section": p.get("section"),
-                    #         "text": p.get("text")
-                    #     })
+        async def finish(batch):
+            batch["end"] = time.perf_counter()
+            stats = batch["stats"]
+            if manifest and stats["chunks"] == batch["total_chunks"]:
+                await asyncio.to_thread(
+                    manifest.record_committed, batch["offset"], batch["span"], batch["rows"]
+                )
+            insert_time = insert_span(batch)
+            print(
+                f"⏱Tempo do batch {batch['index']}: {batch['end'] - batch['parse_start']:.2f}s "
+                f"(parse={batch['parse_time']:.2f}s, insert={insert_time:.2f}s, "
+                f"espera na fila={batch['queue_wait']:.2f}s, {stats['inserted']:,} registros, "
+                f"{batch['bytes'] / (1024**2):.1f} MB)"
+            )
+
+        async def produce():
+            nonlocal remaining, current_offset, parse_total
+            while remaining > 0:
+                current_offset, remaining, slice_size = self._next_slice(
+                    manifest, current_offset, remaining, batch_size
+                )
+                if remaining <= 0:
+                    break
+                if batch_bytes:
+                    # Fecha o batch pelo orçamento de bytes descomprimidos
+                    slice_size = self.member_index.files_within_budget(
+                        current_offset, batch_bytes, max_files=slice_size
+                    )
+                    if slice_size == 0:
+                        print("nenhum arquivo encontrado")
+                        break
+                # Membros do ZIP cobertos pelo batch (duplicatas puladas também contam)
+                positions = self.member_index.positions(current_offset, slice_size)
+                span = len(positions)
+                if span == 0:
+                    print("nenhum arquivo encontrado")
+                    break
+                json_stats_before = self._json_stats()
 
-            # 🔹 Cria DataFrames principais
-            articles_df = pd.DataFrame(records)
-            # print('printando arquivos do body', body_records)
-            # body_text_df = pd.DataFrame(body_records)
+                parse_start = time.perf_counter()
+                if parse_mode == "pool":
+                    rows = await self.get_article_rows_pool_async(slice_size, offset=current_offset)
+                else:
+                    rows = await loop.run_in_executor(
+                        parse_executor, self._parse_batch_rows, parse_mode, slice_size, current_offset
+                    )
+                parse_time = time.perf_counter() - parse_start
+                parse_total += parse_time
+
+                chunks = []
+                if len(rows):
+                    if controller is not None:
+                        # Chunks do tamanho decidido pelo controller até aqui
+                        target, wave = controller.chunk_size, controller.tasks
+                    else:
+                        target, wave = min(slice_size, 5000), max_tasks
+                    n_parts = math.ceil(len(rows) / target)
+                    n_parts = math.ceil(n_parts / wave) * wave
+                    chunks, _ = partition_rows(rows, n_parts)
+                    chunks = [chunk for chunk in chunks if len(chunk)]
+                batch = {
+                    "index": len(batches) + 1,
+                    "offset": current_offset,
+                    "span": span,
+                    "rows": len(rows),
+                    "bytes": self.member_index.bytes_in(current_offset, span),
+                    "duplicates_skipped": self._skipped_in(positions),
+                    "json": self._json_metrics(json_stats_before),
+                    "column_batch": rows.memory_footprint() if isinstance(rows, ColumnBatch) else None,
+                    "parse_start": parse_start,
+                    "parse_time": parse_time,
+                    "queue_wait": 0.0,
+                    "total_chunks": len(chunks),
+                    "done_chunks": 0,
+                    "insert_start": None,
+                    "insert_end": None,
+                    "end": None,
+                    "stats": {"chunks": 0, "staged": 0, "inserted": 0},
+                }
+                batches.append(batch)
+                remaining -= span
+                current_offset += span
+                del rows
+
+                if not chunks:
+                    await finish(batch)
+                    continue
+                wait_start = time.perf_counter()
+                for chunk in chunks:
+                    await queue.put((batch, chunk))
+                batch["queue_wait"] = time.perf_counter() - wait_start
+
+        async def insert_worker():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                try:
+                    await insert_item(*item)
+                except Exception as exc:
+                    # O inseridor continua drenando a fila (o produtor não
+                    # trava com ela cheia); a exceção sobe depois do pipeline
+                    failures.append(exc)
+
+        async def insert_item(batch, chunk):
+            if controller is not None:
+                # Só `controller.tasks` chunks em andamento ao mesmo tempo
+                await controller.acquire()
+            chunk_stats = {"chunks": 0, "staged": 0, "inserted": 0}
+            now = time.perf_counter()
+            chunk_start = now
+            if busy["active"] == 0:
+                busy["since"] = now
+            busy["active"] += 1
+            if batch["insert_start"] is None:
+                batch["insert_start"] = now
+            error = None
+            try:
+                await connector.insert_chunk(
+                    table_name="artigos_stg",
+                    data_chunk=chunk,
+                    use_copy=use_copy,
+                    columns=ARTIGOS_STG_COLUMNS,
+                    copy_format=copy_format,
+                    copy_types=copy_types,
+                    staging=staging,
+                    merge_stats=chunk_stats,
+                    isolation=isolation,
+                    raise_errors=True,
+                )
+            except Exception as exc:
+                error = exc
+                print(f"❌ Falha em um chunk do batch {batch['index']}: {exc}")
+            now = time.perf_counter()
+            for key, value in chunk_stats.items():
+                batch["stats"][key] += value
+            if controller is not None:
+                controller.observe(
+                    len(chunk), chunk_nbytes(chunk), now - chunk_start,
+                    ok=chunk_congestion_ok(chunk_stats, error), tag=batch["index"],
+                )
+                await controller.release()
+            busy["active"] -= 1
+            if busy["active"] == 0:
+                busy["time"] += now - busy["since"]
+            batch["insert_end"] = now
+            batch["done_chunks"] += 1
+            if batch["done_chunks"] == batch["total_chunks"]:
+                await finish(batch)
+
+        start = time.perf_counter()
+        n_workers = controller.task_bounds[1] if controller is not None else max_tasks
+        workers = [asyncio.create_task(insert_worker()) for _ in range(n_workers)]
+        try:
+            await produce()
+        finally:
+            # Sentinelas depois dos chunks: os inseridores esvaziam a fila antes de sair
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+            parse_executor.shutdown(wait=False)
+        if failures:
+            # A falha real, antes de montar métricas de batches incompletos
+            raise failures[0]
+        wall_time = time.perf_counter() - start
+
+        batch_metrics = []
+        total_inserted = 0
+        for batch in batches:
+            stats = batch["stats"]
+            total_inserted += stats["inserted"]
+            if batch["end"] is None:
+                # Não concluído (não deveria acontecer sem exceção acima)
+                continue
+            insert_time = insert_span(batch)
+            batch_metrics.append(
+                {
+                    "batch_index": batch["index"],
+                    "batch_size": batch["span"],
+                    "duplicates_skipped": batch["duplicates_skipped"],
+                    "batch_bytes": batch["bytes"],
+                    "parse_time": batch["parse_time"],
+                    "insert_time": insert_time,
+                    "total_time": batch["end"] - batch["parse_start"],
+                    "queue_wait": batch["queue_wait"],
+                    "inserted": stats["inserted"],
+                    # staged/inserted só somam chunks commitados (`_insert_chunk_with_conn`):
+                    # um merge desfeito não vira duplicata descartada
+                    "merge_skipped": stats["staged"] - stats["inserted"] if staging and use_copy else 0,
+                    # Não commitadas: em quarentena ou em chunks desfeitos
+                    "uncommitted_rows": batch["rows"] - stats["staged"],
+                    **batch["json"],
+                }
+            )
+            if batch["column_batch"] is not None:
+                batch_metrics[-1]["column_batch"] = batch["column_batch"]
+            if controller is not None:
+                batch_metrics[-1]["adaptive"] = [
+                    d for d in controller.decisions if d["batch"] == batch["index"]
+                ]
 
-            return articles_df
+        # (parse + insert) / wall: 1.0 = fases em sequência, 2.0 = sobreposição total
+        overlap_stats = {
+            "parse_time": parse_total,
+            "insert_time": busy["time"],
+            "wall_time": wall_time,
+            "efficiency": (parse_total + busy["time"]) / wall_time if wall_time > 0 else 0.0,
+            "queue_chunks": queue.maxsize,
+        }
+        print(
+            f"🔀 Overlap parse/insert: parse={parse_total:.2f}s + insert={busy['time']:.2f}s "
+            f"em {wall_time:.2f}s de parede (eficiência {overlap_stats['efficiency']:.2f}x)"
+        )
+        return batch_metrics, total_inserted, overlap_stats
 
     async def execute_batch_parallel(
-        self, batch_size, num_of_files, offset=0, max_tasks: int = 4
+        self,
+        batch_size,
+        num_of_files,
+        offset=0,
+        max_tasks: int = 4,
+        parse_mode: str = "dataframe",
+        batch_bytes: int | None = None,
+        checkpoint: bool = False,
+        use_copy: bool = True,
+        copy_format: str = "text",
+        staging: str | None = None,
+        defer_indexes: bool = False,
+        load_profile: bool = False,
+        restore_logged: bool = False,
+        overlap: bool = True,
+        queue_chunks: int | None = None,
+        adaptive=False,
+        isolate_errors=False,
     ):
+        """
+        Processamento assíncrono em batches com inserção paralela.
+
+        Args:
+            parse_mode: "dataframe" (padrão), "pool" (parse em processos
+                paralelos, tuplas enviadas direto ao insert_async_parallel),
+                "cache" (lê o cache colunar materializado como ColumnBatch,
+                sem converter para tuplas) ou "columnar" (parse do ZIP
+                direto para ColumnBatch, ver column_batch.py); nos dois
+                últimos o tamanho do batch vai em batch_metrics[i]["column_batch"].
+            batch_bytes: Se informado, cada batch é fechado quando a soma dos
+                tamanhos descomprimidos atinge esse orçamento (batch_size
+                passa a ser apenas o limite de arquivos).
+            checkpoint: Pula os intervalos já commitados (ver checkpoint.py)
+                e registra cada batch concluído. Os chunks de um batch
+                commitam em transações separadas, então o batch só é
+                registrado quando todos os chunks tiveram sucesso e é
+                reenviado por inteiro na retomada; por isso, com COPY, o
+                staging padrão passa a ser "temp" (merge com ON CONFLICT).
+            use_copy: COPY em blocos (padrão, mesmo método do caminho
+                síncrono) ou executemany com ON CONFLICT DO NOTHING.
+            copy_format: "text" ou "binary" (tipos do catálogo de artigos_stg).
+            staging: "temp"/"unlogged": cada chunk faz COPY em staging + merge
+                com ON CONFLICT DO NOTHING (ver `insert_staged_merge`), em
+                vez de abortar o chunk inteiro na primeira duplicata.
+                "unlogged" (staging compartilhada) só com max_tasks=1 e sem
+                adaptive; com chunks em paralelo use "temp".
+            defer_indexes: Remove índices/constraints de artigos_stg antes do
+                primeiro batch e os recria no final (ver bulk_load.py); a PK
+                fica com staging (árbitro do merge).
+            load_profile: artigos_stg UNLOGGED + synchronous_commit=off no
+                pool (ver load_profile.py); os chunks commitam em transações
+                separadas, então não há COPY FREEZE neste caminho. Recusado
+                ao retomar um checkpoint: uma tabela UNLOGGED é esvaziada
+                pelo Postgres após um crash, e os intervalos registrados
+                deixariam de corresponder aos dados.
+            restore_logged: Com load_profile, volta a tabela para LOGGED no final.
+            overlap: Parse do próximo batch em paralelo com o insert do atual
+                (ver `_execute_overlapped`). False = um batch por vez, parse
+                e insert em sequência.
+            queue_chunks: Chunks parseados aguardando insert (backpressure do
+                parse; padrão 2 * max_tasks).
+            adaptive: True (ou um `AIMDController` com limites próprios) para
+                ajustar chunk_size e concorrência durante a carga a partir de
+                max_tasks e min(batch_size, 5000); as decisões de cada batch
+                vão em batch_metrics[i]["adaptive"] (ver adaptive.py).
+            isolate_errors: True (ou um `PoisonRowIsolation` com quarentena
+                e retries próprios) para não perder um chunk inteiro por
+                uma linha ruim: erros transitórios são reenviados com
+                backoff e os de dados isolados por bisseção, com as linhas
+                rejeitadas na tabela etl_quarantine (ver quarantine.py).
+                Cada batch traz "uncommitted_rows"; o resultado, "isolation".
+        """
+        controller = None
+        if isinstance(adaptive, AIMDController):
+            controller = adaptive
+        elif adaptive:
+            controller = AIMDController(chunk_size=min(batch_size, 5000), tasks=max_tasks)
+        if checkpoint and use_copy and not staging:
+            # Batch parcialmente commitado é reenviado na retomada: sem merge,
+            # os chunks já carregados falhariam na PK e o batch nunca entraria
+            # no checkpoint
+            staging = "temp"
+        if use_copy:
+            # Antes de aplicar profile/índices: falha sem deixar nada pela metade
+            check_staging_concurrency(
+                staging, controller.task_bounds[1] if controller is not None else max_tasks
+            )
+
         connector = DatabaseConnector()
         batch_count = 0
         total_processado = 0
@@ -348,79 +1012,313 @@ class ZipFileAnalyzer:
         remaining = num_of_files
         current_offset = offset
 
-        while remaining > 0:
-            batch_count += 1
-            start_batch = time.perf_counter()
-            slice_size = min(batch_size, remaining)
-
-            parse_start = time.perf_counter()
-            articles_df = self.get_files_data_as_dataframe(
-                number_of_files=slice_size, offset=current_offset
+        manifest = None
+        if checkpoint:
+            manifest = CheckpointManifest(
+                self.member_index, self.zip_path, "artigos_stg", connector
+            )
+            current_offset = manifest.resume_offset(offset, num_of_files)
+            remaining -= current_offset - offset
+            if load_profile:
+                check_profile_resume(manifest, offset, num_of_files)
+
+        profile = None
+        if load_profile:
+            # Antes de abrir o pool: as conexões herdam synchronous_commit=off
+            profile = LoadProfile("artigos_stg", connector, restore_logged=restore_logged)
+            await asyncio.to_thread(profile.apply)
+
+        deferred = None
+        if defer_indexes:
+            deferred = DeferredIndexes(
+                "artigos_stg", connector.conn_str, keep_primary_key=bool(staging)
+            )
+            await asyncio.to_thread(deferred.defer)
+
+        isolation = None
+        if isinstance(isolate_errors, PoisonRowIsolation):
+            isolation = isolate_errors
+        elif isolate_errors:
+            isolation = await asyncio.to_thread(
+                lambda: PoisonRowIsolation(Quarantine(connector))
             )
-            if articles_df.empty:
-                print("nenhum arquivo encontrado")
-                break
-
-            models_artigos = [
-                ArtigoStaging(**row) for row in articles_df.to_dict(orient="records")
-            ]
-            parse_time = time.perf_counter() - parse_start
 
-            insert_result = await connector.insert_async_parallel(
-                table_name="artigos_stg",
-                data_model_list=models_artigos,
-                chunk_size=min(slice_size, 5000),
+        if HAS_POOL:
+            # Pool assíncrono aberto e pré-aquecido antes do primeiro batch
+            # (com controller, pode crescer até o teto de tasks)
+            await connector.open_async_pool(
                 max_tasks=max_tasks,
-                use_copy=False,  # Temporarily disable COPY until async issue is resolved
+                max_size=controller.task_bounds[1] if controller is not None else None,
             )
+        overlap_stats = None
+        try:
+            if overlap:
+                batch_metrics, total_processado, overlap_stats = await self._execute_overlapped(
+                    connector, manifest, batch_size, remaining, current_offset, max_tasks,
+                    parse_mode, batch_bytes, use_copy, copy_format, staging,
+                    queue_chunks, controller, isolation,
+                )
+                batch_count = len(batch_metrics)
+            else:
+                while remaining > 0:
+                    current_offset, remaining, slice_size = self._next_slice(
+                        manifest, current_offset, remaining, batch_size
+                    )
+                    if remaining <= 0:
+                        break
+                    batch_count += 1
+                    start_batch = time.perf_counter()
+                    if batch_bytes:
+                        # Fecha o batch pelo orçamento de bytes descomprimidos
+                        slice_size = self.member_index.files_within_budget(
+                            current_offset, batch_bytes, max_files=slice_size
+                        )
+                        if slice_size == 0:
+                            print("nenhum arquivo encontrado")
+                            break
+                    # Membros do ZIP cobertos pelo batch (duplicatas puladas também contam)
+                    positions = self.member_index.positions(current_offset, slice_size)
+                    span = len(positions)
+                    if span == 0:
+                        print("nenhum arquivo encontrado")
+                        break
+                    duplicates_skipped = self._skipped_in(positions)
+                    json_stats_before = self._json_stats()
+
+                    parse_start = time.perf_counter()
+                    if parse_mode == "pool":
+                        models_artigos = await self.get_article_rows_pool_async(
+                            slice_size, offset=current_offset
+                        )
+                    elif parse_mode in ("cache", "columnar"):
+                        models_artigos = self._parse_batch_rows(
+                            parse_mode, slice_size, offset=current_offset
+                        )
+                    else:
+                        articles_df = self.get_files_data_as_dataframe(
+                            number_of_files=slice_size, offset=current_offset
+                        )
+                        models_artigos = self._staging_rows(articles_df)
+                    parse_time = time.perf_counter() - parse_start
+
+                    insert_result = await connector.insert_async_parallel(
+                        table_name="artigos_stg",
+                        data_model_list=models_artigos,
+                        chunk_size=min(slice_size, 5000),
+                        max_tasks=max_tasks,
+                        use_copy=use_copy,
+                        columns=ARTIGOS_STG_COLUMNS,
+                        copy_format=copy_format,
+                        staging=staging,
+                        controller=controller,
+                        isolation=isolation,
+                    )
+                    if manifest and insert_result.get("successful_chunks", 0) == insert_result.get(
+                        "total_chunks", 0
+                    ):
+                        await asyncio.to_thread(
+                            manifest.record_committed, current_offset, span, len(models_artigos)
+                        )
 
-            batch_time = time.perf_counter() - start_batch
-            remaining -= len(models_artigos)
-            current_offset += len(models_artigos)
-            inserted = insert_result.get("inserted", 0)
-            insert_time = insert_result.get("duration", 0.0)
-            total_processado += inserted
+                    batch_time = time.perf_counter() - start_batch
+                    batch_bytes_read = self.member_index.bytes_in(current_offset, span)
+                    remaining -= span
+                    current_offset += span
+                    inserted = insert_result.get("inserted", 0)
+                    merge_skipped = insert_result.get("skipped", 0)
+                    insert_time = insert_result.get("duration", 0.0)
+                    total_processado += inserted
 
-            batch_metrics.append(
-                {
-                    "batch_index": batch_count,
-                    "batch_size": len(models_artigos),
-                    "parse_time": parse_time,
-                    "insert_time": insert_time,
-                    "total_time": batch_time,
-                    "inserted": inserted,
-                }
-            )
+                    batch_metrics.append(
+                        {
+                            "batch_index": batch_count,
+                            "batch_size": span,
+                            "duplicates_skipped": duplicates_skipped,
+                            "batch_bytes": batch_bytes_read,
+                            "parse_time": parse_time,
+                            "insert_time": insert_time,
+                            "total_time": batch_time,
+                            "inserted": inserted,
+                            "merge_skipped": merge_skipped,
+                            "uncommitted_rows": insert_result.get("failed_rows", 0)
+                            + insert_result.get("isolation", {}).get("quarantined", 0),
+                            **self._json_metrics(json_stats_before),
+                        }
+                    )
+                    if isinstance(models_artigos, ColumnBatch):
+                        batch_metrics[-1]["column_batch"] = models_artigos.memory_footprint()
+                    if controller is not None:
+                        batch_metrics[-1]["adaptive"] = insert_result.get("adaptive", {}).get(
+                            "decisions", []
+                        )
 
-            print(
-                f"⏱Tempo do batch: {batch_time:.2f}s "
-                f"(parse={parse_time:.2f}s, insert={insert_time:.2f}s, "
-                f"{inserted:,} registros)"
-            )
+                    print(
+                        f"⏱Tempo do batch: {batch_time:.2f}s "
+                        f"(parse={parse_time:.2f}s, insert={insert_time:.2f}s, "
+                        f"{inserted:,} registros, {batch_bytes_read / (1024**2):.1f} MB)"
+                    )
+        finally:
+            await connector.close_async_pool()
+            if isolation is not None:
+                await asyncio.to_thread(isolation.close)
+            try:
+                if deferred is not None:
+                    await asyncio.to_thread(deferred.restore)
+            finally:
+                if profile is not None:
+                    await asyncio.to_thread(profile.restore)
 
         total_time = time.perf_counter() - start_total
         print(f"Total de batches processados: {batch_count}")
         print(f"Tempo total: {total_time:.2f}s ({total_time/60:.2f} minutos)")
-        return {
+        result = {
             "total_inserted": total_processado,
             "batch_metrics": batch_metrics,
             "total_time": total_time,
+            "pool_stats": connector.async_pool_stats(),
         }
-            
-
-    def execute_batch_insert(self, batch_size, num_of_files, offset=0):
+        if deferred is not None:
+            result["total_inserted"] -= deferred.duplicates_removed
+            result["bulk_load"] = deferred.metrics()
+        if profile is not None:
+            result["load_profile"] = profile.metrics()
+        if overlap_stats is not None:
+            result["overlap"] = overlap_stats
+        if controller is not None:
+            result["adaptive"] = controller.metrics()
+        if isolation is not None:
+            result["isolation"] = isolation.metrics()
+        return result
+
+
+    @staticmethod
+    def _copy_batch(
+        connector, rows, before_commit, copy_format, staging, copy_workers=1, freeze=False
+    ):
         """
-        Synchronous batch processing using COPY method (single transaction).
-        Returns metrics compatible with benchmark framework.
-        
+        COPY das tuplas em artigos_stg (direto, via staging ou em
+        `copy_workers` conexões); (inseridos, descartados no merge).
+        `freeze`: TRUNCATE + COPY FREEZE na transação do batch.
+        """
+        if copy_workers > 1:
+            result = connector.copy_rows_parallel(
+                table_name="artigos_stg",
+                columns=ARTIGOS_STG_COLUMNS,
+                rows=rows,
+                workers=copy_workers,
+                before_commit=before_commit,
+                copy_format=copy_format,
+                staging=staging,
+            )
+            return result["inserted"], result["skipped"], result
+        if staging:
+            merged = connector.insert_staged_merge(
+                table_name="artigos_stg",
+                columns=ARTIGOS_STG_COLUMNS,
+                rows=rows,
+                staging=staging,
+                copy_format=copy_format,
+                before_commit=before_commit,
+            )
+            return merged["inserted"], merged["skipped"], None
+        inserted = connector.copy_rows_stream(
+            table_name="artigos_stg",
+            columns=ARTIGOS_STG_COLUMNS,
+            rows=rows,
+            before_commit=before_commit,
+            copy_format=copy_format,
+            truncate=freeze,
+            freeze=freeze,
+        )
+        return inserted, 0, None
+
+    def execute_batch_insert(
+        self,
+        batch_size,
+        num_of_files,
+        offset=0,
+        parse_mode: str = "dataframe",
+        batch_bytes: int | None = None,
+        checkpoint: bool = False,
+        copy_format: str = "text",
+        staging: str | None = None,
+        copy_workers: int = 1,
+        defer_indexes: bool = False,
+        load_profile: bool = False,
+        restore_logged: bool = False,
+        truncate: bool = False,
+    ):
+        """
+        Processamento síncrono em batches com COPY (uma transação por batch).
+        Retorna métricas no formato do framework de benchmark.
+
         Args:
-        batch_size (int): Number of files to process per batch.
-        num_of_files (int): Total number of files to process.
-        offset (int): Starting index for reading from the ZIP file.
-        
+            batch_size: Arquivos por batch.
+            num_of_files: Total de arquivos a processar.
+            offset: Posição inicial no índice do ZIP.
+            parse_mode: "dataframe" (JSON → DataFrame → ArtigoStaging),
+                "stream" (tuplas geradas sob demanda direto para o COPY; o
+                pico de memória fica limitado ao buffer em trânsito), "pool"
+                (parse em processos paralelos, ver `parse_workers`), "cache"
+                (lê o cache colunar materializado, sem descomprimir o ZIP) ou
+                "columnar" (parse direto para um ColumnBatch: COPY texto
+                gerado dos buffers Arrow, tamanho em
+                batch_metrics[i]["column_batch"]).
+            batch_bytes: Se informado, cada batch é fechado quando a soma dos
+                tamanhos descomprimidos atinge esse orçamento (batch_size
+                passa a ser apenas o limite de arquivos).
+            checkpoint: Pula todos os intervalos de membros já commitados
+                (não só os do início) e registra cada batch em
+                etl_checkpoint na própria transação do batch (ver
+                checkpoint.py).
+            copy_format: COPY "text" ou "binary" nos modos de tuplas
+                ("stream", "pool", "cache", "columnar") e no "dataframe" com
+                staging.
+            staging: "temp" ou "unlogged": COPY de cada batch em uma staging
+                + merge com ON CONFLICT DO NOTHING (ver `insert_staged_merge`);
+                linhas que já estão em artigos_stg vão para merge_skipped em
+                vez de derrubar o batch.
+            copy_workers: > 1: os modos de tuplas fazem COPY em streaming
+                por essa quantidade de conexões persistentes (ver
+                `copy_rows_parallel`); o batch passa a commitar em várias
+                transações e só entra no checkpoint se nenhuma falhou (com
+                checkpoint, o staging padrão vira "temp", para que a
+                retomada faça merge em vez de falhar na PK). Vazão e
+                latência de commit por worker vão em copy_workers.
+            defer_indexes: Remove índices/constraints de artigos_stg antes do
+                primeiro batch e os recria (manutenção paralela + ANALYZE)
+                depois do último; tempos de cada fase em bulk_load (ver
+                bulk_load.py). A PK fica quando é árbitro do ON CONFLICT
+                (staging ou modo "dataframe").
+            load_profile: Perfil de staging descartável (ver load_profile.py):
+                artigos_stg UNLOGGED e synchronous_commit=off em todas as
+                conexões; bytes de WAL em load_profile. Recusado ao retomar
+                um checkpoint (uma tabela UNLOGGED é esvaziada após um crash
+                e os intervalos registrados deixariam de corresponder aos
+                dados).
+            restore_logged: Com load_profile, volta artigos_stg para LOGGED
+                no final (WAL medido à parte).
+            truncate: DESTRUTIVO: esvazia artigos_stg (e seus checkpoints)
+                antes do primeiro batch, descartando dados de execuções
+                anteriores. Com load_profile nos modos de tuplas (sem
+                staging, copy_workers=1) o TRUNCATE vai na transação do
+                primeiro batch, com COPY ... FREEZE. Não combina com
+                checkpoint.
+
         Returns:
-        dict: Contains total_inserted, batch_metrics, and total_time
+            dict com total_inserted, batch_metrics e total_time.
         """
+        if truncate and checkpoint:
+            raise ValueError(
+                "truncate=True apagaria os dados já registrados no checkpoint; "
+                "use um ou outro"
+            )
+        if checkpoint and copy_workers > 1 and not staging:
+            # Os workers commitam separadamente e o batch só é registrado no
+            # final: a retomada reenvia as linhas já commitadas (ver
+            # `execute_batch_parallel`)
+            staging = "temp"
+        check_staging_concurrency(staging, copy_workers)
         connector = DatabaseConnector()
         batch_count = 0
         total_processado = 0
@@ -432,63 +1330,193 @@ class ZipFileAnalyzer:
         if not num_of_files:
             return {"total_inserted": 0, "batch_metrics": [], "total_time": 0.0}
 
-        while remaining > 0:
-            batch_count += 1
-            start_batch = time.perf_counter()
-            slice_size = min(batch_size, remaining)
-
-            # Parse phase
-            parse_start = time.perf_counter()
-            articles_df = self.get_files_data_as_dataframe(
-                number_of_files=slice_size, offset=current_offset
+        manifest = None
+        if checkpoint:
+            manifest = CheckpointManifest(
+                self.member_index, self.zip_path, "artigos_stg", connector
             )
-            if articles_df.empty:
-                print("nenhum arquivo encontrado")
-                break
-
-            models_artigos = [
-                ArtigoStaging(**row) for row in articles_df.to_dict(orient="records")
-            ]
-            parse_time = time.perf_counter() - parse_start
-
-            # Insert phase
-            insert_start = time.perf_counter()
-            inserted = connector.insert_optimized_single_transaction(
-                table_name="artigos_stg", data_model_list=models_artigos
+            current_offset = manifest.resume_offset(offset, num_of_files)
+            remaining -= current_offset - offset
+            if load_profile:
+                check_profile_resume(manifest, offset, num_of_files)
+
+        profile = None
+        freeze_first = False
+        if load_profile:
+            profile = LoadProfile("artigos_stg", connector, restore_logged=restore_logged)
+            profile.apply()
+            # TRUNCATE + COPY FREEZE na transação do primeiro batch (só com
+            # truncate explícito: apaga o que já estava na tabela)
+            freeze_first = (
+                truncate
+                and parse_mode in ("stream", "pool", "cache", "columnar")
+                and not staging
+                and copy_workers <= 1
             )
-            insert_time = time.perf_counter() - insert_start
-
-            batch_time = time.perf_counter() - start_batch
-            remaining -= len(models_artigos)
-            current_offset += len(models_artigos)
-            total_processado += inserted
-
-            batch_metrics.append(
-                {
-                    "batch_index": batch_count,
-                    "batch_size": len(models_artigos),
-                    "parse_time": parse_time,
-                    "insert_time": insert_time,
-                    "total_time": batch_time,
-                    "inserted": inserted,
-                }
+        if truncate and not freeze_first:
+            connector.truncate_table("artigos_stg")
+
+        deferred = None
+        if defer_indexes:
+            # A PK fica quando é árbitro de ON CONFLICT (staging/dataframe)
+            deferred = DeferredIndexes(
+                "artigos_stg",
+                connector.conn_str,
+                keep_primary_key=bool(staging) or parse_mode == "dataframe",
             )
+            deferred.defer()
+        try:
+            while remaining > 0:
+                current_offset, remaining, slice_size = self._next_slice(
+                    manifest, current_offset, remaining, batch_size
+                )
+                if remaining <= 0:
+                    break
+                batch_count += 1
+                start_batch = time.perf_counter()
+                if batch_bytes:
+                    # Fecha o batch pelo orçamento de bytes descomprimidos
+                    slice_size = self.member_index.files_within_budget(
+                        current_offset, batch_bytes, max_files=slice_size
+                    )
+                    if slice_size == 0:
+                        print("nenhum arquivo encontrado")
+                        break
+                # Membros do ZIP cobertos pelo batch (duplicatas puladas também contam)
+                positions = self.member_index.positions(current_offset, slice_size)
+                span = len(positions)
+                if span == 0:
+                    print("nenhum arquivo encontrado")
+                    break
+                duplicates_skipped = self._skipped_in(positions)
+                json_stats_before = self._json_stats()
+                merge_skipped = 0
+                parallel = None
+                column_batch = None
+                before_commit = None
+                if manifest:
+                    # Checkpoint gravado na mesma transação do batch
+                    before_commit = lambda cur, n, start=current_offset, span=span: manifest.record(
+                        cur, start, span, n
+                    )
 
-            print(
-                f"⏱Tempo do batch: {batch_time:.2f}s "
-                f"(parse={parse_time:.2f}s, insert={insert_time:.2f}s, "
-                f"{inserted:,} registros)"
-            )
+                if parse_mode in ("stream", "cache"):
+                    # Parse (ou leitura do cache colunar) e COPY intercalados:
+                    # o tempo de parse é medido dentro do gerador
+                    stream_stats = {}
+                    if parse_mode == "cache":
+                        rows = self.corpus_cache.iter_rows(
+                            slice_size,
+                            offset=current_offset,
+                            stats=stream_stats,
+                            skip=self.duplicate_skip,
+                        )
+                    else:
+                        rows = self.iter_article_rows(
+                            slice_size, offset=current_offset, stats=stream_stats
+                        )
+                    inserted, merge_skipped, parallel = self._copy_batch(
+                        connector, rows, before_commit, copy_format, staging, copy_workers,
+                        freeze=freeze_first and batch_count == 1,
+                    )
+                    parse_time = stream_stats["parse_time"]
+                    insert_time = (time.perf_counter() - start_batch) - parse_time
+                elif parse_mode in ("pool", "columnar"):
+                    # Parse multi-processo → tuplas, ou parse → colunas Arrow → COPY
+                    parse_start = time.perf_counter()
+                    if parse_mode == "pool":
+                        rows = self.get_article_rows_pool(slice_size, offset=current_offset)
+                    else:
+                        rows = self.get_article_batch(slice_size, offset=current_offset)
+                        column_batch = rows.memory_footprint()
+                    parse_time = time.perf_counter() - parse_start
+
+                    insert_start = time.perf_counter()
+                    inserted, merge_skipped, parallel = self._copy_batch(
+                        connector, rows, before_commit, copy_format, staging, copy_workers,
+                        freeze=freeze_first and batch_count == 1,
+                    )
+                    insert_time = time.perf_counter() - insert_start
+                else:
+                    # Parse phase
+                    parse_start = time.perf_counter()
+                    articles_df = self.get_files_data_as_dataframe(
+                        number_of_files=slice_size, offset=current_offset
+                    )
+                    rows = self._staging_rows(articles_df)
+                    parse_time = time.perf_counter() - parse_start
+
+                    # Insert phase
+                    insert_start = time.perf_counter()
+                    if staging:
+                        inserted, merge_skipped, _ = self._copy_batch(
+                            connector, rows, before_commit, copy_format, staging
+                        )
+                    else:
+                        inserted = connector.insert_optimized_single_transaction(
+                            table_name="artigos_stg",
+                            data_model_list=rows,
+                            before_commit=before_commit,
+                            columns=ARTIGOS_STG_COLUMNS,
+                        )
+                    insert_time = time.perf_counter() - insert_start
+
+                batch_time = time.perf_counter() - start_batch
+                batch_bytes_read = self.member_index.bytes_in(current_offset, span)
+                remaining -= span
+                current_offset += span
+                total_processado += inserted
+
+                batch_metrics.append(
+                    {
+                        "batch_index": batch_count,
+                        "batch_size": span,
+                        "duplicates_skipped": duplicates_skipped,
+                        "batch_bytes": batch_bytes_read,
+                        "parse_time": parse_time,
+                        "insert_time": insert_time,
+                        "total_time": batch_time,
+                        "inserted": inserted,
+                        "merge_skipped": merge_skipped,
+                        **self._json_metrics(json_stats_before),
+                    }
+                )
+                if column_batch is not None:
+                    batch_metrics[-1]["column_batch"] = column_batch
+                if parallel is not None:
+                    batch_metrics[-1]["copy_failed"] = parallel["failed"]
+                    batch_metrics[-1]["producer_wait"] = parallel["producer_wait"]
+                    batch_metrics[-1]["copy_workers"] = parallel["workers"]
+
+                print(
+                    f"⏱Tempo do batch: {batch_time:.2f}s "
+                    f"(parse={parse_time:.2f}s, insert={insert_time:.2f}s, "
+                    f"{inserted:,} registros, {batch_bytes_read / (1024**2):.1f} MB)"
+                )
+        finally:
+            try:
+                if deferred is not None:
+                    deferred.restore()
+            finally:
+                if profile is not None:
+                    profile.restore()
 
         total_time = time.perf_counter() - start_total
         print(f"Total de batches processados: {batch_count}")
         print(f"Tempo total: {total_time:.2f}s ({total_time/60:.2f} minutos)")
-        
-        return {
+
+        result = {
             "total_inserted": total_processado,
             "batch_metrics": batch_metrics,
             "total_time": total_time,
         }
+        if deferred is not None:
+            # Linhas repetidas removidas antes de recriar a PK não ficaram na tabela
+            result["total_inserted"] -= deferred.duplicates_removed
+            result["bulk_load"] = deferred.metrics()
+        if profile is not None:
+            result["load_profile"] = profile.metrics()
+        return result
 
     def join_tables(self, tables):
         pass
@@ -534,14 +1562,14 @@ if __name__ == "__main__":
             print("✅ Nenhum dado retornado - processamento concluído!")
             break
 
-        # Converte para modelos
-        models_artigos = [
-            Artigo(**row) for row in body_text_df.to_dict(orient="records")
-        ]
+        # Converte para tuplas (validação em lote contra Artigo, text → content);
+        # um registro inválido levanta ValidationError para o batch inteiro
+        encoder = row_encoder(Artigo)
+        models_artigos = encoder.from_records(body_text_df.to_dict(orient="records"))
 
         # Insere no banco
         connector.insert_optimized_single_transaction(
-            table_name=table, data_model_list=models_artigos
+            table_name=table, data_model_list=models_artigos, columns=encoder.columns
         )
 
         # Calcula métricas do batch
@@ -603,5 +1631,5 @@ if __name__ == "__main__":
     # MÉTODO 3: RECOMENDADO para datasets pequenos/médios
     print("📌 MÉTODO 3 (RECOMENDADO): Transação única otimizada")
     connector.insert_optimized_single_transaction(
-        table_name=table, data_model_list=models_artigos
+        table_name=table, data_model_list=models_artigos, columns=encoder.columns
     )
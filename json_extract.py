@@ -0,0 +1,254 @@
+"""
+Extração parcial de JSON: decodifica apenas os caminhos pedidos.
+
+O pipeline só usa `paper_id`, `metadata.title` e `body_text[].text`, mas
+`json.load` materializa o documento inteiro (bib_entries, ref_entries e
+back_matter costumam ser a maior parte de cada arquivo do CORD-19).
+
+O motor "skip" percorre os bytes do documento e:
+- decodifica (com `json.loads`) só os valores dos caminhos pedidos;
+- pula os demais valores sem criar objetos Python, saltando strings e
+  escalares com regex (em C) e contando apenas os colchetes/chaves;
+- encerra o documento assim que todas as chaves do topo foram lidas
+  (no CORD-19 bib_entries/ref_entries/back_matter vêm depois de body_text).
+
+Também aceita decodificadores completos plugáveis ("json", "orjson" ou
+qualquer callable bytes → dict), úteis para comparação.
+"""
+
+import json
+import re
+
+# Try to import orjson (optional)
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Caminhos usados para montar artigos_stg
+ARTICLE_PATHS = ("paper_id", "metadata.title", "body_text.*.text")
+
+# Chaves que o pipeline nunca usa
+REFERENCE_KEYS = ("bib_entries", "ref_entries", "back_matter")
+
+_WS = re.compile(rb"[ \t\n\r]*")
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+_SCALAR = re.compile(rb"[^,\]}\s]+")
+# Consome strings e escalares até o próximo colchete/chave fora de string
+_NON_BRACKET = re.compile(rb'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*', re.S)
+
+_LBRACE, _RBRACE, _LBRACKET, _RBRACKET = b"{}[]"
+_QUOTE, _COLON, _COMMA = b'":,'
+
+
+def build_path_tree(paths):
+    """
+    Converte caminhos pontuados em árvore de dicts.
+    "body_text.*.text" → {"body_text": {"*": {"text": None}}}
+    (None = decodifica o valor inteiro)
+    """
+    tree = {}
+    for path in paths:
+        node = tree
+        parts = path.split(".")
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+            if node is None:
+                break
+        else:
+            node[parts[-1]] = None
+    return tree
+
+
+def _skip_value(buf, pos):
+    """Pula um valor JSON a partir de `pos`. Retorna (fim, objetos/arrays pulados)."""
+    c = buf[pos]
+    if c == _QUOTE:
+        return _STRING.match(buf, pos).end(), 0
+    if c != _LBRACE and c != _LBRACKET:
+        return _SCALAR.match(buf, pos).end(), 0
+
+    depth = 0
+    objects = 0
+    while True:
+        c = buf[pos]
+        if c == _LBRACE or c == _LBRACKET:
+            depth += 1
+            objects += 1
+        else:
+            depth -= 1
+        pos += 1
+        if depth == 0:
+            return pos, objects
+        pos = _NON_BRACKET.match(buf, pos).end()
+
+
+class PartialJSONExtractor:
+    """
+    Decodifica apenas `paths` de cada documento e contabiliza o que foi pulado.
+
+    Args:
+        paths: Caminhos pontuados a extrair ("*" = todos os itens de um array).
+        decoder: "skip" (padrão, extração parcial), "json", "orjson" ou um
+            callable bytes → dict (decodificação completa + poda).
+        exclude: Alternativa a `paths`: decodifica todas as chaves do topo
+            exceto estas (ex.: REFERENCE_KEYS).
+
+    `stats` acumula documents, bytes_total, bytes_skipped e objects_skipped
+    (objetos/arrays JSON que nunca viraram objetos Python; o trecho final
+    não varrido após o early-exit é estimado contando "{" e "[").
+    """
+
+    def __init__(self, paths=ARTICLE_PATHS, decoder: str = "skip", exclude=None):
+        self.tree = None if exclude else build_path_tree(paths)
+        self.exclude = frozenset(exclude or ())
+        if decoder == "orjson" and not HAS_ORJSON:
+            raise ImportError("orjson not available. Install: pip install orjson")
+        self.decoder = decoder
+        self.stats = self.empty_stats()
+
+    @staticmethod
+    def empty_stats():
+        return {"documents": 0, "bytes_total": 0, "bytes_skipped": 0, "objects_skipped": 0}
+
+    def merge_stats(self, other):
+        """Soma estatísticas vindas de outro extrator (ex.: workers do parse pool)."""
+        for key, value in other.items():
+            self.stats[key] = self.stats.get(key, 0) + value
+
+    def load(self, f):
+        """Equivalente a `json.load(f)` restrito aos caminhos configurados."""
+        return self.extract(f.read())
+
+    def extract(self, buf):
+        if isinstance(buf, str):
+            buf = buf.encode("utf-8")
+        self.stats["documents"] += 1
+        self.stats["bytes_total"] += len(buf)
+
+        if self.decoder != "skip":
+            return self._prune(self._full_decode(buf), self.tree)
+
+        pos = _WS.match(buf, 0).end()
+        if buf[pos] != _LBRACE:
+            return json.loads(buf)
+        value, _ = self._object(buf, pos, self.tree, top=True)
+        return value
+
+    # ------------------------------------------------------------------
+    def _full_decode(self, buf):
+        if callable(self.decoder):
+            return self.decoder(buf)
+        if self.decoder == "orjson":
+            return orjson.loads(buf)
+        return json.loads(buf)
+
+    def _prune(self, value, tree):
+        if isinstance(value, dict):
+            if tree is None:
+                if not self.exclude:
+                    return value
+                return {k: v for k, v in value.items() if k not in self.exclude}
+            return {
+                k: self._prune(value[k], sub) for k, sub in tree.items() if k in value
+            }
+        if isinstance(value, list) and tree is not None and "*" in tree:
+            return [self._prune(v, tree["*"]) for v in value]
+        return value
+
+    def _value(self, buf, pos, tree):
+        """Extrai o valor em `pos` seguindo `tree`. Retorna (valor, fim)."""
+        c = buf[pos]
+        if tree is not None and c == _LBRACE:
+            return self._object(buf, pos, tree)
+        if tree is not None and c == _LBRACKET and "*" in tree:
+            return self._array(buf, pos, tree["*"])
+        end, _ = _skip_value(buf, pos)
+        return json.loads(buf[pos:end]), end
+
+    def _skip(self, buf, pos):
+        end, objects = _skip_value(buf, pos)
+        self.stats["bytes_skipped"] += end - pos
+        self.stats["objects_skipped"] += objects
+        return end
+
+    def _object(self, buf, pos, tree, top=False):
+        result = {}
+        wanted = len(tree) if tree is not None else -1
+        found = 0
+        pos = _WS.match(buf, pos + 1).end()
+        if buf[pos] == _RBRACE:
+            return result, pos + 1
+
+        while True:
+            m = _STRING.match(buf, pos)
+            raw_key = m.group()
+            key = (
+                json.loads(raw_key)
+                if b"\\" in raw_key
+                else raw_key[1:-1].decode("utf-8")
+            )
+            pos = _WS.match(buf, m.end()).end()
+            if buf[pos] != _COLON:
+                raise ValueError(f"JSON inválido na posição {pos}")
+            pos = _WS.match(buf, pos + 1).end()
+
+            if tree is None:
+                if key in self.exclude:
+                    pos = self._skip(buf, pos)
+                else:
+                    result[key], pos = self._value(buf, pos, None)
+            elif key in tree:
+                result[key], pos = self._value(buf, pos, tree[key])
+                found += 1
+            else:
+                pos = self._skip(buf, pos)
+
+            if top and found == wanted:
+                # Early-exit: tudo que interessa já foi lido
+                rest = buf[pos:]
+                self.stats["bytes_skipped"] += len(rest)
+                self.stats["objects_skipped"] += rest.count(b"{") + rest.count(b"[")
+                return result, len(buf)
+
+            pos = _WS.match(buf, pos).end()
+            c = buf[pos]
+            if c == _COMMA:
+                pos = _WS.match(buf, pos + 1).end()
+            elif c == _RBRACE:
+                return result, pos + 1
+            else:
+                raise ValueError(f"JSON inválido na posição {pos}")
+
+    def _array(self, buf, pos, tree):
+        result = []
+        pos = _WS.match(buf, pos + 1).end()
+        if buf[pos] == _RBRACKET:
+            return result, pos + 1
+
+        while True:
+            value, pos = self._value(buf, pos, tree)
+            result.append(value)
+            pos = _WS.match(buf, pos).end()
+            c = buf[pos]
+            if c == _COMMA:
+                pos = _WS.match(buf, pos + 1).end()
+            elif c == _RBRACKET:
+                return result, pos + 1
+            else:
+                raise ValueError(f"JSON inválido na posição {pos}")
+
+
+def make_extractor(json_engine: str = "json"):
+    """
+    Fábrica usada pelo ZipFileAnalyzer e pelo parse pool.
+    "json" → None (json.load padrão), "partial" → extração parcial,
+    "orjson" → decodificador rápido completo + poda.
+    """
+    if json_engine == "json":
+        return None
+    if json_engine == "partial":
+        return PartialJSONExtractor()
+    return PartialJSONExtractor(decoder=json_engine)
@@ -0,0 +1,167 @@
+"""
+Perfil de carga para tabelas staging descartáveis.
+
+artigos_stg é truncada antes de cada rodada do benchmark e refeita a partir
+do ZIP: não precisa da durabilidade do WAL. `LoadProfile`:
+- troca a tabela para UNLOGGED (sem WAL para as linhas e índices);
+- aplica `synchronous_commit=off` em todas as conexões do connector (via
+  `options` da string de conexão: vale para conexões diretas, threads e o
+  pool assíncrono);
+- com `truncate=True` explícito no loader (apaga o que já estava na
+  tabela), o primeiro batch faz `TRUNCATE` + `COPY ... FREEZE` na mesma
+  transação (`copy_rows_stream(truncate=True, freeze=True)`);
+- no final, opcionalmente volta a tabela para LOGGED (reescrita completa,
+  com WAL — medida à parte).
+
+Os bytes de WAL gerados são medidos pela diferença de
+`pg_current_wal_insert_lsn()` antes e depois da carga.
+
+Uso:
+    with LoadProfile("artigos_stg", connector) as profile:
+        ...  # carga com o mesmo connector
+    profile.metrics()  # wal_bytes, wal_bytes_restore, ...
+"""
+
+import time
+
+import psycopg
+from psycopg.conninfo import conninfo_to_dict, make_conninfo
+
+from etl_psycopg3 import DatabaseConnector
+
+
+def wal_lsn(conn_str: str):
+    """Posição atual de inserção no WAL (pg_lsn como texto)."""
+    with psycopg.connect(conn_str) as conn:
+        return conn.execute("SELECT pg_current_wal_insert_lsn()::text").fetchone()[0]
+
+
+def wal_bytes_since(conn_str: str, start_lsn: str) -> int:
+    """Bytes de WAL escritos desde `start_lsn` (no cluster inteiro)."""
+    with psycopg.connect(conn_str) as conn:
+        return int(
+            conn.execute(
+                "SELECT pg_wal_lsn_diff(pg_current_wal_insert_lsn(), %s::pg_lsn)", (start_lsn,)
+            ).fetchone()[0]
+        )
+
+
+def check_profile_resume(manifest, offset: int = 0, number_of_files: int | None = None):
+    """
+    Recusa o perfil numa carga que retoma um checkpoint: depois de um crash
+    o Postgres esvazia as tabelas UNLOGGED, e os intervalos registrados em
+    etl_checkpoint passariam a apontar para dados que não existem mais.
+    """
+    committed = manifest.committed_count(offset, number_of_files)
+    if committed:
+        raise ValueError(
+            f"load_profile com checkpoint: {committed:,} arquivos já commitados em "
+            f"{manifest.target_table}; retome sem o perfil (ou limpe com truncate_table)"
+        )
+
+
+class LoadProfile:
+    """
+    UNLOGGED + synchronous_commit=off em volta de uma carga.
+
+    Args:
+        table_name: Tabela staging carregada.
+        connector: DatabaseConnector usado pela carga (recebe as opções de sessão).
+        unlogged: Troca a tabela para UNLOGGED durante a carga.
+        restore_logged: Volta para LOGGED no final (se a tabela era LOGGED).
+        synchronous_commit: Valor de synchronous_commit nas conexões da carga.
+    """
+
+    def __init__(
+        self,
+        table_name: str,
+        connector: DatabaseConnector | None = None,
+        unlogged: bool = True,
+        restore_logged: bool = False,
+        synchronous_commit: str = "off",
+    ):
+        self.table_name = table_name
+        self.connector = connector or DatabaseConnector()
+        self.unlogged = unlogged
+        self.restore_logged = restore_logged
+        self.synchronous_commit = synchronous_commit
+        self.was_logged = None
+        self.wal_level = None
+        self._conn_str = None
+        self._start_lsn = None
+        self._start_time = None
+        self.stats = {}
+
+    def _session_conn_str(self, conn_str):
+        options = conninfo_to_dict(conn_str).get("options", "")
+        extra = f"-c synchronous_commit={self.synchronous_commit}"
+        return make_conninfo(conn_str, options=f"{options} {extra}".strip())
+
+    def apply(self):
+        """Prepara a tabela e as conexões; marca o início da medição de WAL."""
+        start = time.perf_counter()
+        self._conn_str = self.connector.conn_str
+        with psycopg.connect(self._conn_str) as conn:
+            self.wal_level = conn.execute("SHOW wal_level").fetchone()[0]
+            persistence = conn.execute(
+                "SELECT relpersistence FROM pg_class WHERE oid = %s::regclass",
+                (self.table_name,),
+            ).fetchone()[0]
+            self.was_logged = persistence == "p"
+            if self.unlogged and self.was_logged:
+                conn.execute(f"ALTER TABLE {self.table_name} SET UNLOGGED")
+            conn.commit()
+        if self.synchronous_commit:
+            self.connector.conn_str = self._session_conn_str(self._conn_str)
+        self.stats["prepare_time"] = time.perf_counter() - start
+        print(
+            f"📒 Perfil de carga em {self.table_name}: "
+            f"{'UNLOGGED' if self.unlogged else 'LOGGED'}, "
+            f"synchronous_commit={self.synchronous_commit or 'padrão'} (wal_level={self.wal_level})"
+        )
+        self._start_lsn = wal_lsn(self._conn_str)
+        self._start_time = time.perf_counter()
+
+    def restore(self):
+        """Fecha a medição; restaura conexões e, se pedido, LOGGED."""
+        self.stats["load_time"] = time.perf_counter() - self._start_time
+        self.stats["wal_bytes"] = wal_bytes_since(self._conn_str, self._start_lsn)
+        self.connector.conn_str = self._conn_str
+
+        self.stats["wal_bytes_restore"] = 0
+        self.stats["restore_time"] = 0.0
+        if self.restore_logged and self.unlogged and self.was_logged:
+            start = time.perf_counter()
+            start_lsn = wal_lsn(self._conn_str)
+            with psycopg.connect(self._conn_str) as conn:
+                conn.execute(f"ALTER TABLE {self.table_name} SET LOGGED")
+                conn.commit()
+            self.stats["restore_time"] = time.perf_counter() - start
+            self.stats["wal_bytes_restore"] = wal_bytes_since(self._conn_str, start_lsn)
+
+        print(
+            f"📒 WAL da carga: {self.stats['wal_bytes'] / (1024**2):.1f} MB"
+            + (
+                f", volta para LOGGED: {self.stats['wal_bytes_restore'] / (1024**2):.1f} MB "
+                f"em {self.stats['restore_time']:.2f}s"
+                if self.stats["restore_time"]
+                else ""
+            )
+        )
+
+    def metrics(self):
+        return {
+            "table": self.table_name,
+            "unlogged": self.unlogged,
+            "synchronous_commit": self.synchronous_commit,
+            "wal_level": self.wal_level,
+            **self.stats,
+        }
+
+    def __enter__(self):
+        self.apply()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.restore()
+        return False
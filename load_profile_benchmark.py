@@ -0,0 +1,76 @@
+"""
+WAL gerado na carga de artigos_stg com e sem o perfil de staging descartável.
+
+Carrega os mesmos `LOAD_PROFILE_FILES` artigos duas vezes em um único batch
+(parse_mode="stream"):
+- baseline: tabela LOGGED, COPY comum, synchronous_commit padrão;
+- profile: UNLOGGED + TRUNCATE/COPY FREEZE + synchronous_commit=off
+  (ver load_profile.py), com a volta para LOGGED medida à parte.
+
+Uso:
+    LOAD_PROFILE_FILES=5000 python load_profile_benchmark.py
+Resultados em sync_result/load_profile.json
+"""
+
+import json
+import os
+import time
+
+from etl_psycopg3 import DatabaseConnector
+from fetch_db import ZipFileAnalyzer
+from load_profile import wal_bytes_since, wal_lsn
+
+zip_path = os.getenv("DATASET_PATH", "/Users/raphaelportela/datasetcovid.zip")
+
+
+def run(analyzer, connector, number_of_files, profile):
+    connector.truncate_table(table_name="artigos_stg")
+    start_lsn = wal_lsn(connector.conn_str)
+    start = time.perf_counter()
+    result = analyzer.execute_batch_insert(
+        batch_size=number_of_files,
+        num_of_files=number_of_files,
+        parse_mode="stream",
+        load_profile=profile,
+        restore_logged=profile,
+        truncate=profile,  # TRUNCATE + COPY FREEZE no batch (tabela já vazia)
+    )
+    duration = time.perf_counter() - start
+    wal_bytes = wal_bytes_since(connector.conn_str, start_lsn)
+    metrics = result.get("load_profile", {})
+    # WAL total da rodada inclui a volta para LOGGED; o da carga vem do perfil
+    return {
+        "profile": profile,
+        "inserted": result["total_inserted"],
+        "duration": duration,
+        "wal_bytes_total": wal_bytes,
+        "wal_bytes_load": metrics.get("wal_bytes", wal_bytes),
+        "wal_bytes_restore": metrics.get("wal_bytes_restore", 0),
+        "restore_time": metrics.get("restore_time", 0.0),
+    }
+
+
+if __name__ == "__main__":
+    number_of_files = int(os.getenv("LOAD_PROFILE_FILES", "5000"))
+
+    connector = DatabaseConnector()
+    analyzer = ZipFileAnalyzer(zip_path)
+    results = [run(analyzer, connector, number_of_files, profile) for profile in (False, True)]
+    analyzer.close()
+
+    for r in results:
+        label = "perfil  " if r["profile"] else "baseline"
+        print(
+            f"📒 {label}: {r['inserted']:,} registros em {r['duration']:.2f}s, "
+            f"WAL da carga {r['wal_bytes_load'] / (1024**2):.1f} MB"
+            + (
+                f" (+{r['wal_bytes_restore'] / (1024**2):.1f} MB para voltar a LOGGED "
+                f"em {r['restore_time']:.2f}s)"
+                if r["profile"]
+                else ""
+            )
+        )
+
+    os.makedirs("sync_result", exist_ok=True)
+    with open(os.path.join("sync_result", "load_profile.json"), "w", encoding="utf-8") as f:
+        json.dump({"files": number_of_files, "results": results}, f, indent=2)
@@ -1,25 +1,24 @@
 import asyncio
-import zipfile
 import os
 
 from benchmark import BenchmarkExecutor
 from etl_psycopg3 import DatabaseConnector
 from fetch_db import ZipFileAnalyzer
+from zip_index import ZipMemberIndex
 
 # Get dataset path from environment variable or use default
 zip_path = os.getenv("DATASET_PATH", "/Users/raphaelportela/datasetcovid.zip")
 
 
 def get_total_files():
-    with zipfile.ZipFile(zip_path, "r") as z:
-        all_files = z.namelist()
-        json_files = [f for f in all_files if f.endswith(".json")]
-        return len(json_files)
+    # Usa o índice persistente (mesmo cache reaproveitado pelo ZipFileAnalyzer)
+    return len(ZipMemberIndex.load(zip_path))
 
 
 if __name__ == "__main__":
     connector = DatabaseConnector()
-    analyzer = ZipFileAnalyzer(zip_path)
+    # Regra opcional para duplicatas de paper_id no ZIP (pmc, longest ou first)
+    analyzer = ZipFileAnalyzer(zip_path, duplicate_rule=os.getenv("DUPLICATE_RULE") or None)
     total_files = get_total_files()
     print(f"📊 Total de arquivos JSON encontrados: {total_files:,}")
     
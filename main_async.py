@@ -1,25 +1,25 @@
 import asyncio
-import zipfile
 import os
 
 from benchmark import BenchmarkExecutor
 from etl_psycopg3 import DatabaseConnector
 from fetch_db import ZipFileAnalyzer
+from quarantine import PoisonRowIsolation, Quarantine
+from zip_index import ZipMemberIndex
 
 # Get dataset path from environment variable or use default
 zip_path = os.getenv("DATASET_PATH", "/Users/raphaelportela/datasetcovid.zip")
 
 
 def get_total_files():
-    with zipfile.ZipFile(zip_path, "r") as z:
-        all_files = z.namelist()
-        json_files = [f for f in all_files if f.endswith(".json")]
-        return len(json_files)
+    # Usa o índice persistente (mesmo cache reaproveitado pelo ZipFileAnalyzer)
+    return len(ZipMemberIndex.load(zip_path))
 
 
 if __name__ == "__main__":
     connector = DatabaseConnector()
-    analyzer = ZipFileAnalyzer(zip_path)
+    # Regra opcional para duplicatas de paper_id no ZIP (pmc, longest ou first)
+    analyzer = ZipFileAnalyzer(zip_path, duplicate_rule=os.getenv("DUPLICATE_RULE") or None)
     total_files = get_total_files()
     print(f"📊 Total de arquivos JSON encontrados: {total_files:,}")
     
@@ -31,12 +31,26 @@ if __name__ == "__main__":
     # Use async_docker directory when running in Docker
     async_output_dir = os.getenv("ASYNC_OUTPUT_DIR", "async_docker")
     
+    # Orçamento opcional de bytes descomprimidos por batch (ex.: BATCH_BYTES=268435456)
+    batch_bytes = int(os.getenv("BATCH_BYTES", "0")) or None
+    # ADAPTIVE=1: chunk_size/max_tasks ajustados durante a carga (AIMD)
+    adaptive = os.getenv("ADAPTIVE", "0") == "1"
+    # ISOLATE_ERRORS=1: linhas rejeitadas vão para etl_quarantine (ou QUARANTINE_PATH, JSONL)
+    isolate_errors = os.getenv("ISOLATE_ERRORS", "0") == "1"
+    if isolate_errors and os.getenv("QUARANTINE_PATH"):
+        isolate_errors = PoisonRowIsolation(Quarantine(path=os.getenv("QUARANTINE_PATH")))
+
     benchmark_async = BenchmarkExecutor(
         files_to_process=total_files,
         offset=0,
         pipeline=analyzer.execute_batch_parallel,
         max_tasks=4,
-        async_result_dir=async_output_dir
+        async_result_dir=async_output_dir,
+        pipeline_kwargs={
+            "batch_bytes": batch_bytes,
+            "adaptive": adaptive,
+            "isolate_errors": isolate_errors,
+        },
     )
     asyncio.run(benchmark_async.processamento_async())
 
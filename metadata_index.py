@@ -0,0 +1,238 @@
+"""
+Índice hash persistente sha/pmcid → (cord_uid, linha do metadata.csv).
+
+`ZipFileAnalyzer.return_metada_as_df` relia o CSV inteiro a cada chamada e
+fazia `str.contains(paper_id)` sobre a coluna sha (varredura linear por
+consulta). Aqui cada sha individual (as linhas guardam "sha1; sha2") e cada
+pmcid (paper_id dos arquivos pmc_json) vira uma chave de uma tabela hash
+com endereçamento aberto (linear probing), construída uma única vez e
+salva como arrays .npy lidos com memory map.
+
+- lookup(key): O(1), acessa poucos slots dos arrays mapeados;
+- lookup_many(keys): sondagem vetorizada em numpy para milhares de ids.
+"""
+
+import hashlib
+import json
+import os
+import time
+import zipfile
+
+import numpy as np
+
+from metadata_loader import MetadataLoader
+from zip_index import CACHE_DIR, zip_fingerprint
+
+_KEY_BYTES = 40  # sha1 em hex; largura mínima, cresce com a maior chave
+_UID_BYTES = 16  # cord_uid tem 8 caracteres; idem
+_EMPTY = -1
+# Versão do formato em disco (2: largura das chaves = maior chave)
+INDEX_VERSION = 2
+
+
+def key_hash(key: str) -> int:
+    """Hash 64 bits da chave: sha1 hex já é uniforme, os demais passam por blake2b."""
+    if len(key) == 40:
+        try:
+            return int(key[:16], 16)
+        except ValueError:
+            pass
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def split_shas(value):
+    """'sha1; sha2' → ['sha1', 'sha2']."""
+    if not value:
+        return []
+    return [s.strip() for s in value.split(";") if s.strip()]
+
+
+class MetadataHashIndex:
+    """
+    Tabela hash mapeada em memória.
+
+    Arrays (capacidade = potência de 2 ≥ 2 × chaves):
+        hashes (uint64), keys (S<maior chave, mín. 40>), rows (int64, -1 =
+        vazio), cord_uids (S<maior cord_uid, mín. 16>). As larguras vêm dos
+        dados no build: nenhuma chave é truncada (uma chave truncada podia
+        colidir com outra e fazer lookup e lookup_many divergirem).
+    """
+
+    ARRAYS = ("hashes", "keys", "rows", "cord_uids")
+
+    def __init__(self, hashes, keys, rows, cord_uids, max_probe: int):
+        self.hashes = hashes
+        self.keys = keys
+        self.rows = rows
+        self.cord_uids = cord_uids
+        self.mask = len(rows) - 1
+        self.max_probe = max_probe
+
+    def __len__(self):
+        return int(np.count_nonzero(self.rows != _EMPTY))
+
+    # ------------------------------------------------------------------
+    @staticmethod
+    def index_dir(zip_path, cache_dir=None):
+        return os.path.join(
+            cache_dir or CACHE_DIR, f"{os.path.basename(zip_path)}.metadata_index"
+        )
+
+    @classmethod
+    def load(cls, zip_path, cache_dir=None):
+        """Carrega os arrays com mmap; reconstrói se o ZIP mudou ou não há cache."""
+        directory = cls.index_dir(zip_path, cache_dir)
+        meta_path = os.path.join(directory, "meta.json")
+        size, mtime_ns = zip_fingerprint(zip_path)
+
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if (
+                meta.get("version") == INDEX_VERSION
+                and meta.get("zip_size") == size
+                and meta.get("zip_mtime_ns") == mtime_ns
+            ):
+                arrays = {
+                    name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+                    for name in cls.ARRAYS
+                }
+                return cls(max_probe=meta["max_probe"], **arrays)
+
+        index = cls.build(zip_path)
+        index.save(directory, size, mtime_ns)
+        return index
+
+    @classmethod
+    def build(cls, zip_path):
+        """Lê apenas cord_uid, sha e pmcid do metadata.csv e monta a tabela."""
+        start = time.perf_counter()
+        entries = []  # (chave, linha, cord_uid)
+        row = 0
+        with zipfile.ZipFile(zip_path, "r") as z:
+            loader = MetadataLoader(zip_path)
+            for batch in loader.iter_record_batches(z, columns=("cord_uid", "sha", "pmcid")):
+                uids = batch.column("cord_uid").to_pylist()
+                shas = batch.column("sha").to_pylist()
+                pmcids = batch.column("pmcid").to_pylist()
+                for uid, sha, pmcid in zip(uids, shas, pmcids):
+                    for key in split_shas(sha):
+                        entries.append((key, row, uid))
+                    if pmcid:
+                        entries.append((pmcid, row, uid))
+                    row += 1
+
+        # Larguras pela maior chave/cord_uid: nada é truncado pelo dtype
+        key_bytes = max([_KEY_BYTES, *(len(key.encode("utf-8")) for key, _, _ in entries)])
+        uid_bytes = max([_UID_BYTES, *(len((uid or "").encode("utf-8")) for _, _, uid in entries)])
+
+        capacity = 1
+        while capacity < 2 * max(1, len(entries)):
+            capacity <<= 1
+        mask = capacity - 1
+        hashes = np.zeros(capacity, dtype=np.uint64)
+        keys = np.zeros(capacity, dtype=f"S{key_bytes}")
+        rows = np.full(capacity, _EMPTY, dtype=np.int64)
+        cord_uids = np.zeros(capacity, dtype=f"S{uid_bytes}")
+        max_probe = 0
+
+        for key, key_row, uid in entries:
+            h = key_hash(key)
+            encoded = key.encode("utf-8")
+            slot = h & mask
+            probe = 0
+            while rows[slot] != _EMPTY:
+                if hashes[slot] == h and keys[slot] == encoded:
+                    break  # sha repetido: mantém a primeira ocorrência
+                slot = (slot + 1) & mask
+                probe += 1
+            else:
+                hashes[slot] = h
+                keys[slot] = encoded
+                rows[slot] = key_row
+                cord_uids[slot] = (uid or "").encode("utf-8")
+                max_probe = max(max_probe, probe)
+
+        index = cls(hashes, keys, rows, cord_uids, max_probe=max_probe)
+        print(
+            f"🔑 Índice de metadata construído: {len(entries):,} chaves de {row:,} linhas "
+            f"(capacidade {capacity:,}, sondagem máx. {max_probe}) em "
+            f"{time.perf_counter() - start:.2f}s"
+        )
+        return index
+
+    def save(self, directory, size, mtime_ns):
+        os.makedirs(directory, exist_ok=True)
+        for name in self.ARRAYS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": INDEX_VERSION,
+                    "zip_size": size,
+                    "zip_mtime_ns": mtime_ns,
+                    "max_probe": self.max_probe,
+                },
+                f,
+            )
+
+    # ------------------------------------------------------------------
+    def lookup(self, key: str):
+        """(cord_uid, linha) para um sha/pmcid, ou None."""
+        h = key_hash(key)
+        encoded = key.encode("utf-8")
+        if len(encoded) > self.keys.itemsize:
+            return None  # maior que todas as chaves do índice
+        slot = h & self.mask
+        for _ in range(self.max_probe + 1):
+            row = int(self.rows[slot])
+            if row == _EMPTY:
+                return None
+            if int(self.hashes[slot]) == h and self.keys[slot] == encoded:
+                return self.cord_uids[slot].decode("utf-8"), row
+            slot = (slot + 1) & self.mask
+        return None
+
+    def lookup_many(self, keys):
+        """
+        Busca vetorizada.
+
+        Returns:
+            (cord_uids: lista com None para ausentes, rows: np.ndarray com -1 para ausentes)
+        """
+        keys = list(keys)
+        n = len(keys)
+        query_hashes = np.fromiter((key_hash(k) for k in keys), dtype=np.uint64, count=n)
+        encoded = [k.encode("utf-8") for k in keys]
+        # Chaves mais longas que a coluna seriam truncadas pelo dtype: não
+        # estão no índice, então nem entram na sondagem
+        fits = np.fromiter((len(k) <= self.keys.itemsize for k in encoded), dtype=bool, count=n)
+        query_keys = np.array(encoded or [b""], dtype=self.keys.dtype)[:n]
+        found_slots = np.full(n, _EMPTY, dtype=np.int64)
+
+        pending = np.flatnonzero(fits)
+        slots = (query_hashes & np.uint64(self.mask)).astype(np.int64)
+        for _ in range(self.max_probe + 1):
+            if pending.size == 0:
+                break
+            candidate = slots[pending]
+            occupied = self.rows[candidate] != _EMPTY
+            match = (
+                occupied
+                & (self.hashes[candidate] == query_hashes[pending])
+                & (self.keys[candidate] == query_keys[pending])
+            )
+            found_slots[pending[match]] = candidate[match]
+            # continua sondando só quem caiu em slot ocupado por outra chave
+            still = occupied & ~match
+            pending = pending[still]
+            slots[pending] = (slots[pending] + 1) & self.mask
+
+        hit = found_slots != _EMPTY
+        rows = np.full(n, _EMPTY, dtype=np.int64)
+        rows[hit] = self.rows[found_slots[hit]]
+        cord_uids = [None] * n
+        for i in np.flatnonzero(hit):
+            cord_uids[i] = self.cord_uids[found_slots[i]].decode("utf-8")
+        return cord_uids, rows
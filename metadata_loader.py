@@ -0,0 +1,207 @@
+"""
+Carga do metadata.csv do CORD-19 para a tabela metadata_staging.
+
+O CSV é lido em streaming direto de dentro do ZIP, em blocos, pelo leitor
+CSV multithread do Arrow. As colunas com poucos valores distintos
+(journal, source_x, license) são dictionary-encoded. Cada bloco vira
+tuplas que vão direto para o COPY, então a memória fica constante
+independentemente do tamanho do arquivo.
+
+Uso:
+    python metadata_loader.py
+"""
+
+import os
+import time
+import zipfile
+
+from etl_psycopg3 import DatabaseConnector
+from schemas import Metadata
+
+# Try to import pyarrow (optional)
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    HAS_ARROW = True
+except ImportError:
+    HAS_ARROW = False
+
+# Colunas do CSV na ordem do modelo Metadata (created_at fica com o DEFAULT da tabela)
+METADATA_COLUMNS = tuple(f for f in Metadata.model_fields if f != "created_at")
+
+# Colunas repetitivas: dictionary encoding reduz memória e trabalho de conversão
+DICTIONARY_COLUMNS = ("journal", "source_x", "license")
+
+CREATE_METADATA_STAGING_SQL = """
+CREATE TABLE IF NOT EXISTS metadata_staging (
+    cord_uid VARCHAR(100),
+    sha TEXT,
+    source_x TEXT,
+    title TEXT,
+    doi TEXT,
+    pmcid VARCHAR(50),
+    pubmed_id VARCHAR(50),
+    license TEXT,
+    abstract TEXT,
+    publish_time VARCHAR(50),
+    authors TEXT,
+    journal TEXT,
+    mag_id VARCHAR(50),
+    who_covidence_id VARCHAR(50),
+    arxiv_id VARCHAR(50),
+    pdf_json_files TEXT,
+    pmc_json_files TEXT,
+    url TEXT,
+    s2_id VARCHAR(50),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_metadata_staging_cord_uid ON metadata_staging(cord_uid);
+"""
+
+
+def find_metadata_member(zip_file):
+    """Nome do metadata.csv dentro do ZIP (ou None)."""
+    for name in zip_file.namelist():
+        if name.endswith("metadata.csv"):
+            return name
+    return None
+
+
+class MetadataLoader:
+    """
+    Streaming de metadata.csv (dentro do ZIP) → COPY em metadata_staging.
+
+    Args:
+        zip_path: Caminho do ZIP do CORD-19.
+        block_size: Bytes por bloco lido pelo leitor CSV do Arrow (limita a memória).
+        use_threads: Conversão multithread de cada bloco.
+    """
+
+    def __init__(self, zip_path, block_size: int = 8 * 1024 * 1024, use_threads: bool = True):
+        if not HAS_ARROW:
+            raise ImportError("pyarrow not available. Install: pip install pyarrow")
+        self.zip_path = zip_path
+        self.block_size = block_size
+        self.use_threads = use_threads
+
+    def _csv_options(self, columns=METADATA_COLUMNS):
+        read_options = pa_csv.ReadOptions(
+            use_threads=self.use_threads, block_size=self.block_size
+        )
+        # abstracts/títulos podem conter quebras de linha entre aspas
+        parse_options = pa_csv.ParseOptions(newlines_in_values=True)
+        column_types = {
+            column: (
+                pa.dictionary(pa.int32(), pa.string())
+                if column in DICTIONARY_COLUMNS
+                else pa.string()
+            )
+            for column in columns
+        }
+        convert_options = pa_csv.ConvertOptions(
+            column_types=column_types,
+            include_columns=list(columns),
+            include_missing_columns=True,
+            strings_can_be_null=True,
+        )
+        return read_options, parse_options, convert_options
+
+    def iter_record_batches(self, zip_file, columns=METADATA_COLUMNS):
+        """RecordBatches do metadata.csv (apenas `columns`), um bloco por vez."""
+        member = find_metadata_member(zip_file)
+        if member is None:
+            raise FileNotFoundError("metadata.csv not found inside the ZIP")
+        read_options, parse_options, convert_options = self._csv_options(columns)
+        with zip_file.open(member) as f:
+            reader = pa_csv.open_csv(
+                f,
+                read_options=read_options,
+                parse_options=parse_options,
+                convert_options=convert_options,
+            )
+            for batch in reader:
+                yield batch
+
+    def iter_rows(self, zip_file, stats=None):
+        """Tuplas na ordem de METADATA_COLUMNS; `stats` recebe batches/rows."""
+        if stats is None:
+            stats = {}
+        stats.setdefault("batches", 0)
+        stats.setdefault("rows", 0)
+        for batch in self.iter_record_batches(zip_file):
+            columns = [batch.column(name).to_pylist() for name in METADATA_COLUMNS]
+            stats["batches"] += 1
+            stats["rows"] += batch.num_rows
+            yield from zip(*columns)
+
+    def take_rows(self, zip_file, rows, columns=METADATA_COLUMNS):
+        """
+        Tabela Arrow com as linhas `rows` (posições do CSV) em uma única
+        passada em streaming, encerrada após a maior linha pedida.
+        """
+        wanted = sorted(set(int(r) for r in rows if r >= 0))
+        if not wanted:
+            return pa.table({c: pa.array([], type=pa.string()) for c in columns})
+
+        pieces = []
+        batch_start = 0
+        i = 0
+        for batch in self.iter_record_batches(zip_file, columns=columns):
+            batch_end = batch_start + batch.num_rows
+            local = []
+            while i < len(wanted) and wanted[i] < batch_end:
+                local.append(wanted[i] - batch_start)
+                i += 1
+            if local:
+                pieces.append(pa.Table.from_batches([batch.take(pa.array(local))]))
+            batch_start = batch_end
+            if i == len(wanted):
+                break
+        return pa.concat_tables(pieces).unify_dictionaries()
+
+    def load(self, connector: DatabaseConnector | None = None, truncate: bool = True):
+        """
+        Cria metadata_staging se preciso e carrega o CSV inteiro via COPY.
+
+        Returns:
+            dict com inserted, duration, throughput, batches e bytes.
+        """
+        connector = connector or DatabaseConnector()
+        connector.execute_sql(CREATE_METADATA_STAGING_SQL)
+        if truncate:
+            connector.truncate_table(table_name="metadata_staging")
+
+        start = time.perf_counter()
+        stats = {}
+        with zipfile.ZipFile(self.zip_path, "r") as z:
+            member = find_metadata_member(z)
+            if member is None:
+                raise FileNotFoundError("metadata.csv not found inside the ZIP")
+            member_size = z.getinfo(member).file_size
+            inserted = connector.copy_rows_stream(
+                table_name="metadata_staging",
+                columns=METADATA_COLUMNS,
+                rows=self.iter_rows(z, stats=stats),
+            )
+        duration = time.perf_counter() - start
+
+        result = {
+            "inserted": inserted,
+            "duration": duration,
+            "throughput": inserted / duration if duration > 0 else 0,
+            "batches": stats.get("batches", 0),
+            "bytes": member_size,
+            "mb_per_s": member_size / (1024**2) / duration if duration > 0 else 0,
+        }
+        print(
+            f"📑 metadata_staging: {inserted:,} registros em {duration:.2f}s "
+            f"(≈ {result['throughput']:,.0f} regs/s, {result['mb_per_s']:.1f} MB/s, "
+            f"{result['batches']} blocos)"
+        )
+        return result
+
+
+if __name__ == "__main__":
+    dataset_path = os.getenv("DATASET_PATH", "/Users/raphaelportela/datasetcovid.zip")
+    MetadataLoader(dataset_path).load()
@@ -0,0 +1,140 @@
+"""
+Pool de processos para o parse dos JSONs do CORD-19.
+
+O parse (`z.open` + `json.load` + join do body_text) é CPU-bound e fica
+preso ao GIL. Aqui cada worker abre o seu próprio ZipFile uma única vez
+(no initializer), recebe um intervalo contíguo de membros do índice e
+devolve as tuplas de artigos_stg já montadas.
+
+Este módulo importa apenas dependências leves para que os workers
+(inclusive com start method "spawn", padrão no macOS) subam rápido.
+"""
+
+import json
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from json_extract import make_extractor
+from schemas import artigo_staging_row
+from zip_index import zipinfo_from_entry
+
+# ZipFile e extrator JSON de cada processo worker (criados no initializer)
+_worker_zip = None
+_worker_extractor = None
+
+
+def _init_worker(zip_path, json_engine="json"):
+    global _worker_zip, _worker_extractor
+    _worker_zip = zipfile.ZipFile(zip_path, "r")
+    _worker_extractor = make_extractor(json_engine)
+
+
+def _parse_entries(entries, created_at):
+    """
+    Executado no worker: lê e converte um intervalo contíguo de membros.
+    Retorna (rows, tempo, estatísticas do extrator JSON deste intervalo).
+    """
+    start = time.perf_counter()
+    load = _worker_extractor.load if _worker_extractor else json.load
+    if _worker_extractor:
+        _worker_extractor.stats = _worker_extractor.empty_stats()
+    rows = []
+    for entry in entries:
+        info = zipinfo_from_entry(entry)
+        with _worker_zip.open(info) as f:
+            rows.append(artigo_staging_row(load(f), info.filename, created_at))
+    stats = _worker_extractor.stats if _worker_extractor else {}
+    return rows, time.perf_counter() - start, stats
+
+
+class ArticleParsePool:
+    """
+    ProcessPoolExecutor de longa duração com um ZipFile por worker.
+
+    Args:
+        zip_path: Caminho do ZIP do CORD-19.
+        workers: Número de processos (padrão: os.cpu_count()).
+        ranges_per_worker: Em quantos intervalos contíguos cada batch é
+            dividido por worker (mais de 1 suaviza arquivos de tamanhos
+            muito diferentes).
+        json_engine: Motor de JSON dos workers (ver `json_extract.make_extractor`).
+    """
+
+    def __init__(
+        self,
+        zip_path,
+        workers: int | None = None,
+        ranges_per_worker: int = 4,
+        json_engine: str = "json",
+    ):
+        self.zip_path = zip_path
+        self.workers = workers or os.cpu_count() or 1
+        self.ranges_per_worker = ranges_per_worker
+        self.json_engine = json_engine
+        self._executor = None
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.zip_path, self.json_engine),
+            )
+        return self._executor
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def split_ranges(self, positions):
+        """Divide um range de posições em intervalos contíguos de tamanho parecido."""
+        total = len(positions)
+        if total == 0:
+            return []
+        n_ranges = min(total, self.workers * self.ranges_per_worker)
+        step, extra = divmod(total, n_ranges)
+        ranges = []
+        start = positions.start
+        for i in range(n_ranges):
+            end = start + step + (1 if i < extra else 0)
+            ranges.append(range(start, end))
+            start = end
+        return ranges
+
+    def submit(self, index, positions, created_at=None, skip=frozenset()):
+        """
+        Agenda o parse e retorna os futures na ordem do ZIP.
+        Posições em `skip` (ex.: duplicatas no ZIP) não são enviadas aos workers.
+        """
+        created_at = created_at or datetime.now()
+        return [
+            self.executor.submit(
+                _parse_entries, index.entries(p for p in r if p not in skip), created_at
+            )
+            for r in self.split_ranges(positions)
+        ]
+
+    @staticmethod
+    def collect(results):
+        """
+        Concatena os resultados dos workers:
+        (rows, soma do tempo de CPU dos workers, estatísticas JSON somadas).
+        """
+        rows = []
+        worker_time = 0.0
+        json_stats = {}
+        for chunk_rows, elapsed, stats in results:
+            rows.extend(chunk_rows)
+            worker_time += elapsed
+            for key, value in stats.items():
+                json_stats[key] = json_stats.get(key, 0) + value
+        return rows, worker_time, json_stats
+
+    def parse(self, index, positions, created_at=None, skip=frozenset()):
+        futures = self.submit(index, positions, created_at, skip)
+        return self.collect(f.result() for f in futures)
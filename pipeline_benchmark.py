@@ -0,0 +1,207 @@
+"""
+executemany x INSERT em pipeline mode com latência de rede injetada.
+
+Sobe um proxy TCP local (`LatencyProxy`) entre o cliente e o Postgres que
+atrasa cada pacote em latência/2 em cada sentido (latência = RTT extra) e
+carrega as mesmas tuplas com:
+- executemany: `cursor.executemany` puro, fora de um pipeline explícito
+  (o psycopg >= 3.1 abre um pipeline implícito quando a libpq suporta);
+- pipeline_sN: `DatabaseConnector.insert_rows(..., sync_every=N)`, pipeline
+  explícito com um Sync a cada N linhas (N=0: um único Sync no final);
+- pipeline_async_sN: o mesmo com `ainsert_rows` (AsyncConnection).
+
+Uso:
+    PIPELINE_BENCH_FILES=500 PIPELINE_BENCH_LATENCIES=0,5,20 \
+    PIPELINE_BENCH_SYNC_EVERY=0,100 python pipeline_benchmark.py
+Resultados em sync_result/pipeline_latency.json
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+
+import psycopg
+from psycopg.conninfo import conninfo_to_dict, make_conninfo
+
+from etl_psycopg3 import DatabaseConnector, insert_sql
+from fetch_db import ZipFileAnalyzer
+from schemas import ARTIGOS_STG_COLUMNS
+
+zip_path = os.getenv("DATASET_PATH", "/Users/raphaelportela/datasetcovid.zip")
+
+BENCH_TABLE = "pipeline_bench"
+
+TABLE_COLUMNS = """
+    paper_id VARCHAR(100) PRIMARY KEY,
+    file_name TEXT,
+    title TEXT,
+    body_text TEXT,
+    created_at TIMESTAMP
+"""
+
+
+class LatencyProxy:
+    """
+    Proxy TCP em uma thread própria que entrega cada bloco lido
+    `latency_ms / 2` depois, nos dois sentidos (a ordem é preservada).
+    """
+
+    def __init__(self, target_host: str, target_port: int, latency_ms: float):
+        self.target_host = target_host
+        self.target_port = target_port
+        self.delay = latency_ms / 1000 / 2
+        self.port = None
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    async def _pipe(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        pending = asyncio.Queue()
+
+        async def receive():
+            while data := await reader.read(65536):
+                await pending.put((loop.time() + self.delay, data))
+            await pending.put((None, None))
+
+        async def deliver():
+            while True:
+                deadline, data = await pending.get()
+                if data is None:
+                    break
+                wait = deadline - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                writer.write(data)
+                await writer.drain()
+            writer.close()
+
+        await asyncio.gather(receive(), deliver(), return_exceptions=True)
+
+    async def _handle(self, client_reader, client_writer):
+        server_reader, server_writer = await asyncio.open_connection(
+            self.target_host, self.target_port
+        )
+        try:
+            await asyncio.gather(
+                self._pipe(client_reader, server_writer),
+                self._pipe(server_reader, client_writer),
+            )
+        except asyncio.CancelledError:
+            # Proxy encerrado com a conexão ainda aberta
+            client_writer.close()
+            server_writer.close()
+
+    def start(self):
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle, "127.0.0.1", 0)
+            )
+            self.port = self._server.sockets[0].getsockname()[1]
+            ready.set()
+            self._loop.run_forever()
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self.port
+
+    async def _shutdown(self):
+        self._server.close()
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+
+def insert_executemany(connector, rows):
+    """Baseline: executemany puro em transação única."""
+    query = insert_sql(BENCH_TABLE, ARTIGOS_STG_COLUMNS)
+    start = time.perf_counter()
+    with psycopg.connect(connector.conn_str) as conn:
+        with conn.cursor() as cur:
+            cur.executemany(query, rows)
+            inserted = cur.rowcount
+        conn.commit()
+    duration = time.perf_counter() - start
+    return {"inserted": inserted, "sent": len(rows), "duration": duration,
+            "throughput": len(rows) / duration if duration > 0 else 0}
+
+
+async def insert_pipeline_async(connector, rows, sync_every):
+    # Conexão direta, como nas estratégias síncronas (handshake incluído)
+    return await connector.ainsert_rows(
+        BENCH_TABLE, ARTIGOS_STG_COLUMNS, rows, sync_every=sync_every
+    )
+
+
+def run_strategy(connector, proxied, name, sync_every, rows):
+    connector.truncate_table(BENCH_TABLE)
+    if name == "executemany":
+        return insert_executemany(proxied, rows)
+    if name == "pipeline_async":
+        return asyncio.run(insert_pipeline_async(proxied, rows, sync_every))
+    return proxied.insert_rows(BENCH_TABLE, ARTIGOS_STG_COLUMNS, rows, sync_every=sync_every)
+
+
+if __name__ == "__main__":
+    number_of_files = int(os.getenv("PIPELINE_BENCH_FILES", "500"))
+    latencies = [float(x) for x in os.getenv("PIPELINE_BENCH_LATENCIES", "0,5,20").split(",")]
+    sync_intervals = [int(x) for x in os.getenv("PIPELINE_BENCH_SYNC_EVERY", "0,100").split(",")]
+    strategies = [("executemany", None)]
+    strategies += [("pipeline", n) for n in sync_intervals]
+    strategies += [("pipeline_async", n) for n in sync_intervals]
+
+    analyzer = ZipFileAnalyzer(zip_path)
+    rows = list(analyzer.iter_article_rows(number_of_files))
+    analyzer.close()
+
+    connector = DatabaseConnector()
+    connector.execute_sql(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+    connector.create_table(BENCH_TABLE, TABLE_COLUMNS)
+    target = conninfo_to_dict(connector.conn_str)
+
+    results = []
+    try:
+        for latency in latencies:
+            proxy = LatencyProxy(
+                target.get("host", "localhost"), int(target.get("port", 5432)), latency
+            )
+            port = proxy.start()
+            proxied = DatabaseConnector()
+            proxied.conn_str = make_conninfo(connector.conn_str, host="127.0.0.1", port=str(port))
+            try:
+                for name, sync_every in strategies:
+                    result = run_strategy(connector, proxied, name, sync_every, rows)
+                    label = name if sync_every is None else f"{name}_s{sync_every}"
+                    results.append(
+                        {"latency_ms": latency, "strategy": label, "sync_every": sync_every, **result}
+                    )
+                    print(
+                        f"🌐 {latency:>4.0f} ms | {label:<20}: {result['sent']:,} linhas em "
+                        f"{result['duration']:.2f}s (≈ {result['throughput']:,.0f} regs/s)"
+                    )
+            finally:
+                proxy.stop()
+    finally:
+        connector.execute_sql(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+
+    os.makedirs("sync_result", exist_ok=True)
+    with open(os.path.join("sync_result", "pipeline_latency.json"), "w", encoding="utf-8") as f:
+        json.dump(
+            {"files": len(rows), "pipeline_supported": psycopg.Pipeline.is_supported(),
+             "results": results},
+            f,
+            indent=2,
+        )
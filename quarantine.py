@@ -0,0 +1,243 @@
+"""
+Isolamento de linhas problemáticas ("poison rows") nos inserts assíncronos.
+
+Um chunk que falha é desfeito inteiro: um único byte NUL em um body_text
+(o Postgres rejeita 0x00 em text) descartava 5.000 linhas boas, e o
+`insert_async_parallel` ainda reportava sucesso. Com `PoisonRowIsolation`:
+- erro transitório (conexão caiu, deadlock, serialização, timeout do pool):
+  o mesmo pedaço é reenviado com backoff exponencial (com jitter);
+- erro dos dados (SQLSTATE classes 22 e 23: encoding, tipo, constraint): o
+  pedaço é dividido ao meio e cada metade é reenviada, até sobrar a linha
+  culpada, que vai para a quarentena com o texto do erro; as demais
+  commitam normalmente;
+- qualquer outro erro (tabela/coluna inexistente, permissão) não é culpa de
+  uma linha: a bisseção para e a exceção é repassada, então o chunk conta
+  como falho e o batch não entra no checkpoint.
+
+A quarentena é a tabela `etl_quarantine` (padrão) ou um arquivo JSONL. A
+linha é gravada como JSON (escapes \\u0000 incluídos), então mesmo valores
+que o banco rejeitou cabem em uma coluna text.
+
+Uso:
+    isolation = PoisonRowIsolation(Quarantine(connector))
+    await connector.insert_async_parallel(..., isolation=isolation)
+    print(isolation.metrics())
+"""
+
+import asyncio
+import json
+import random
+import threading
+from datetime import datetime
+
+import psycopg
+
+from etl_psycopg3 import DatabaseConnector, is_transient
+
+QUARANTINE_TABLE = "etl_quarantine"
+
+CREATE_QUARANTINE_SQL = f"""
+CREATE TABLE IF NOT EXISTS {QUARANTINE_TABLE} (
+    id BIGSERIAL PRIMARY KEY,
+    target_table TEXT NOT NULL,
+    row_data TEXT NOT NULL,
+    error TEXT NOT NULL,
+    sqlstate TEXT,
+    quarantined_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+
+def is_row_error(exc) -> bool:
+    """
+    Erros causados pelos valores de linhas específicas: DataError (classe
+    22, ex.: byte NUL, valor fora do tipo) e IntegrityError (classe 23, ex.:
+    chave duplicada, NOT NULL). Só esses justificam a bisseção.
+    """
+    return isinstance(exc, (psycopg.DataError, psycopg.IntegrityError))
+
+
+def row_json(columns, row) -> str:
+    """Linha como objeto JSON coluna → valor (datas e afins via str)."""
+    return json.dumps(dict(zip(columns, row)), default=str, ensure_ascii=False)
+
+
+class Quarantine:
+    """
+    Destino das linhas rejeitadas.
+
+    Args:
+        connector: DatabaseConnector da tabela `etl_quarantine` (padrão: um novo).
+        path: Se informado, grava em um arquivo JSONL em vez da tabela.
+    """
+
+    def __init__(self, connector: DatabaseConnector | None = None, path=None):
+        self.path = path
+        self.connector = None
+        if path is None:
+            self.connector = connector or DatabaseConnector()
+            self.connector.execute_sql(CREATE_QUARANTINE_SQL)
+        self.rows = 0
+        self.by_sqlstate = {}
+        # Uma conexão reaproveitada por todas as gravações (chunks em paralelo)
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def destination(self):
+        return self.path or QUARANTINE_TABLE
+
+    def write(self, table_name, columns, rejected):
+        """
+        Grava as linhas rejeitadas de um chunk de uma vez: `rejected` é uma
+        lista de (tupla na ordem de `columns`, exceção que a rejeitou).
+        """
+        records = [
+            (row_json(columns, row), str(exc).strip(), getattr(exc, "sqlstate", None), exc)
+            for row, exc in rejected
+        ]
+        with self._lock:
+            if self.path is not None:
+                now = datetime.now().isoformat()
+                with open(self.path, "a", encoding="utf-8") as f:
+                    for payload, error, sqlstate, _ in records:
+                        record = {
+                            "target_table": table_name,
+                            "row": json.loads(payload),
+                            "error": error,
+                            "sqlstate": sqlstate,
+                            "quarantined_at": now,
+                        }
+                        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            else:
+                if self._conn is None or self._conn.closed:
+                    self._conn = psycopg.connect(self.connector.conn_str)
+                with self._conn.cursor() as cur:
+                    cur.executemany(
+                        f"INSERT INTO {QUARANTINE_TABLE} (target_table, row_data, error, sqlstate) "
+                        "VALUES (%s, %s, %s, %s)",
+                        [(table_name, payload, error, sqlstate) for payload, error, sqlstate, _ in records],
+                    )
+                self._conn.commit()
+            self.rows += len(records)
+            for _, _, sqlstate, exc in records:
+                key = sqlstate or type(exc).__name__
+                self.by_sqlstate[key] = self.by_sqlstate.get(key, 0) + 1
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class PoisonRowIsolation:
+    """
+    Política de falha dos chunks: retry dos erros transitórios e bisseção
+    dos erros de dados até a linha culpada.
+
+    Args:
+        quarantine: Destino das linhas rejeitadas (padrão: tabela etl_quarantine).
+        retries: Novas tentativas de um pedaço após erro transitório.
+        backoff: Espera (s) antes do primeiro retry; dobra a cada tentativa.
+        max_backoff: Teto da espera entre tentativas.
+    """
+
+    def __init__(
+        self,
+        quarantine: Quarantine | None = None,
+        retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 8.0,
+    ):
+        self.quarantine = quarantine or Quarantine()
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.stats = {
+            "chunks_failed": 0,  # chunks que precisaram de bisseção
+            "bisections": 0,
+            "retries": 0,
+            "retry_wait": 0.0,
+            "failed_rows": 0,  # linhas não commitadas (transitório persistente)
+        }
+
+    async def _attempt(self, insert, rows):
+        """insert(rows) com retry dos erros transitórios; repassa os demais."""
+        attempt = 0
+        while True:
+            try:
+                return await insert(rows)
+            except Exception as exc:
+                if not is_transient(exc) or attempt >= self.retries:
+                    raise
+                # Jitter: chunks que falharam juntos não voltam juntos
+                delay = min(self.max_backoff, self.backoff * 2**attempt) * random.uniform(0.5, 1.0)
+                attempt += 1
+                self.stats["retries"] += 1
+                self.stats["retry_wait"] += delay
+                await asyncio.sleep(delay)
+
+    async def run(self, insert, rows, table_name, columns, label=None):
+        """
+        Insere `rows` (lista de tuplas ou ColumnBatch) com `insert(pedaço)`,
+        que commita o pedaço e retorna os inseridos ou levanta a exceção.
+        Erros que não são de linha (ver `is_row_error`) são repassados, mesmo
+        no meio da bisseção (os pedaços já commitados continuam commitados).
+
+        Returns:
+            (inseridos, linhas não commitadas por erro transitório persistente)
+        """
+        chunk = f"Chunk {label}" if label else "Chunk"
+        rejected = []
+        try:
+            try:
+                return await self._attempt(insert, rows), 0
+            except Exception as exc:
+                if is_transient(exc):
+                    print(f"❌ {chunk} desistiu após {self.retries} retries: {exc}")
+                    self.stats["failed_rows"] += len(rows)
+                    return 0, len(rows)
+                if not is_row_error(exc):
+                    raise
+                self.stats["chunks_failed"] += 1
+                print(f"🧪 {chunk} falhou ({exc.__class__.__name__}); isolando as linhas")
+                return await self._bisect(insert, rows, exc, rejected)
+        finally:
+            if rejected:
+                # Quarentena do chunk inteiro em uma gravação
+                await asyncio.to_thread(self.quarantine.write, table_name, columns, rejected)
+
+    async def _bisect(self, insert, rows, exc, rejected):
+        if len(rows) == 1:
+            rejected.append((rows[0], exc))
+            return 0, 0
+        self.stats["bisections"] += 1
+        inserted = failed = 0
+        middle = len(rows) // 2
+        for part in (rows[:middle], rows[middle:]):
+            try:
+                inserted += await self._attempt(insert, part)
+            except Exception as part_exc:
+                if is_transient(part_exc):
+                    self.stats["failed_rows"] += len(part)
+                    failed += len(part)
+                    continue
+                if not is_row_error(part_exc):
+                    # Erro do schema/sessão: nenhuma metade vai passar
+                    raise
+                part_inserted, part_failed = await self._bisect(insert, part, part_exc, rejected)
+                inserted += part_inserted
+                failed += part_failed
+        return inserted, failed
+
+    def close(self):
+        self.quarantine.close()
+
+    def metrics(self):
+        return {
+            **self.stats,
+            "quarantined": self.quarantine.rows,
+            "quarantine_by_sqlstate": dict(self.quarantine.by_sqlstate),
+            "destination": self.quarantine.destination,
+        }
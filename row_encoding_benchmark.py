@@ -0,0 +1,77 @@
+"""
+Custo por linha da conversão registro → tupla de COPY.
+
+Compara, nos mesmos `ROW_ENCODING_FILES` registros do parse_mode="dataframe":
+- legacy: um modelo pydantic por linha (datetime.now() no default_factory),
+  `.dict()`, renome text→content e `tuple(d[c] for c in columns)`;
+- batch: `RowEncoder.from_records` validando o batch inteiro de uma vez;
+- trusted: `RowEncoder.from_records(trusted=True)`, sem validação.
+
+Uso:
+    ROW_ENCODING_FILES=5000 python row_encoding_benchmark.py
+Resultados em sync_result/row_encoding.json
+"""
+
+import json
+import os
+import time
+import warnings
+
+from fetch_db import ZipFileAnalyzer
+from schemas import ARTIGOS_STG_COLUMNS, ArtigoStaging, row_encoder
+
+zip_path = os.getenv("DATASET_PATH", "/Users/raphaelportela/datasetcovid.zip")
+
+
+def encode_legacy(records):
+    """Caminho antigo dos loaders, linha a linha."""
+    data_dicts = []
+    for m in (ArtigoStaging(**row) for row in records):
+        d = m.dict()
+        if "text" in d:
+            d["content"] = d.pop("text")
+        data_dicts.append(d)
+    return [tuple(d[c] for c in ARTIGOS_STG_COLUMNS) for d in data_dicts]
+
+
+def encode_batch(records):
+    return row_encoder(ArtigoStaging, ARTIGOS_STG_COLUMNS).from_records(records)
+
+
+def encode_trusted(records):
+    return row_encoder(ArtigoStaging, ARTIGOS_STG_COLUMNS).from_records(records, trusted=True)
+
+
+if __name__ == "__main__":
+    number_of_files = int(os.getenv("ROW_ENCODING_FILES", "5000"))
+    repeats = int(os.getenv("ROW_ENCODING_REPEATS", "5"))
+    warnings.filterwarnings("ignore", category=DeprecationWarning)  # .dict() do pydantic 2
+
+    analyzer = ZipFileAnalyzer(zip_path)
+    records = analyzer.get_files_data_as_dataframe(number_of_files).to_dict(orient="records")
+    analyzer.close()
+
+    results = {}
+    for name, encode in (("legacy", encode_legacy), ("batch", encode_batch), ("trusted", encode_trusted)):
+        best = None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            rows = encode(records)
+            seconds = time.perf_counter() - start
+            best = seconds if best is None else min(best, seconds)
+        results[name] = {
+            "rows": len(rows),
+            "seconds": best,
+            "us_per_row": best / len(rows) * 1e6 if rows else 0.0,
+        }
+        print(f"🧬 {name:<8}: {results[name]['us_per_row']:.2f} µs/linha ({len(rows):,} linhas)")
+
+    if results["batch"]["seconds"] > 0:
+        print(
+            f"⚡ legacy/batch: {results['legacy']['seconds'] / results['batch']['seconds']:.2f}x, "
+            f"legacy/trusted: {results['legacy']['seconds'] / results['trusted']['seconds']:.2f}x"
+        )
+
+    os.makedirs("sync_result", exist_ok=True)
+    with open(os.path.join("sync_result", "row_encoding.json"), "w", encoding="utf-8") as f:
+        json.dump({"files": len(records), "repeats": repeats, "results": results}, f, indent=2)
@@ -1,6 +1,9 @@
-from pydantic import BaseModel, Field
-from typing import Optional
-from datetime import datetime
+from pydantic import BaseModel, Field, TypeAdapter
+from typing import Optional, Union, get_args, get_origin
+from types import NoneType, UnionType
+from datetime import date, datetime
+from functools import lru_cache
+from operator import attrgetter, itemgetter
 
 
 class ArtigoCitacao(BaseModel):
@@ -45,3 +48,131 @@ class ArtigoStaging(BaseModel):
     title: str
     body_text: str
     created_at: datetime = Field(default_factory=datetime.now)
+
+
+# Ordem das colunas de artigos_stg usada pelos caminhos que trabalham
+# direto com tuplas (streaming/COPY), sem passar por ArtigoStaging.
+ARTIGOS_STG_COLUMNS = ("paper_id", "file_name", "title", "body_text", "created_at")
+
+
+def artigo_staging_row(data: dict, file_name: str, created_at: datetime) -> tuple:
+    """Monta a tupla de artigos_stg a partir de um JSON do CORD-19 já decodificado."""
+    return (
+        data.get("paper_id"),
+        file_name,
+        data.get("metadata", {}).get("title"),
+        " ".join([p["text"] for p in data.get("body_text", [])]),
+        created_at,
+    )
+
+
+def staging_row_is_valid(row) -> bool:
+    """
+    Tupla de artigos_stg carregável: paper_id é texto não vazio. É a PK
+    (NOT NULL) da tabela, então um membro sem paper_id abortaria o COPY do
+    batch inteiro. title e body_text aceitam NULL na tabela e não são
+    exigidos aqui (o caminho pydantic, via ArtigoStaging, é mais estrito).
+    """
+    return isinstance(row[0], str) and row[0] != ""
+
+
+# Tipo Postgres (nome aceito por `Copy.set_types`) de cada anotação dos modelos
+PG_COPY_TYPES = {
+    str: "text",
+    int: "int8",
+    float: "float8",
+    bool: "bool",
+    datetime: "timestamp",
+    date: "date",
+}
+
+# Colunas renomeadas pelos loaders (Artigo.text → coluna content)
+COLUMN_FIELDS = {"content": "text"}
+
+
+def copy_types(model: type[BaseModel], columns) -> list[str]:
+    """
+    Tipos das colunas para COPY binário, derivados das anotações do modelo
+    (Optional[X] → X). Ex.: copy_types(ArtigoStaging, ARTIGOS_STG_COLUMNS).
+    """
+    types = []
+    for column in columns:
+        field = model.model_fields.get(column) or model.model_fields[COLUMN_FIELDS[column]]
+        annotation = field.annotation
+        if get_origin(annotation) in (Union, UnionType):
+            annotation = next(a for a in get_args(annotation) if a is not NoneType)
+        types.append(PG_COPY_TYPES[annotation])
+    return types
+
+
+class RowEncoder:
+    """
+    Modelo pydantic → tuplas de tabela em lote.
+
+    Os loaders faziam, por linha: modelo → `.dict()` → renome text→content →
+    `tuple(d[c] for c in columns)`, e cada modelo ainda chamava
+    `datetime.now()` no default_factory. Aqui a ordem das colunas, o renome
+    (COLUMN_FIELDS) e os campos de timestamp são resolvidos uma vez por
+    modelo; por linha sobra um attrgetter/itemgetter.
+
+    Args:
+        model: Modelo de schemas.py.
+        columns: Colunas da tabela na ordem das tuplas (padrão: campos do
+            modelo, com text → content).
+    """
+
+    def __init__(self, model: type[BaseModel], columns=None):
+        renamed = {field: column for column, field in COLUMN_FIELDS.items()}
+        self.model = model
+        self.columns = tuple(columns or (renamed.get(f, f) for f in model.model_fields))
+        self.fields = tuple(COLUMN_FIELDS.get(c, c) for c in self.columns)
+        # Campos preenchidos com datetime.now(): recebem um único timestamp por batch
+        self.timestamp_fields = tuple(
+            name
+            for name, field in model.model_fields.items()
+            if field.default_factory == datetime.now and name in self.fields
+        )
+        self._from_model = attrgetter(*self.fields)
+        self._from_dict = itemgetter(*self.fields)
+        self._adapter = TypeAdapter(list[model])
+
+    def _tuples(self, getter, items):
+        if len(self.fields) == 1:
+            return [(getter(item),) for item in items]
+        return list(map(getter, items))
+
+    def encode(self, items) -> list[tuple]:
+        """Tuplas de modelos já validados (ou dicts com os nomes dos campos)."""
+        if not items:
+            return []
+        getter = self._from_model if isinstance(items[0], BaseModel) else self._from_dict
+        return self._tuples(getter, items)
+
+    def from_records(self, records: list[dict], trusted: bool = False, created_at=None) -> list[tuple]:
+        """
+        Tuplas a partir de dicts crus (ex.: `DataFrame.to_dict("records")`).
+
+        Campos de timestamp ausentes recebem `created_at` (padrão: um
+        `datetime.now()` para o batch inteiro); os dicts recebidos não são
+        alterados. Com `trusted=False` o batch inteiro é validado em uma
+        chamada (`TypeAdapter(list[model])`): um registro inválido levanta
+        ValidationError para o batch todo (com todas as linhas inválidas na
+        mensagem), sem isolar as linhas boas. Com `trusted=True` a validação
+        é pulada e as tuplas saem direto dos dicts.
+        """
+        if not records:
+            return []
+        if self.timestamp_fields:
+            created_at = created_at or datetime.now()
+            defaults = dict.fromkeys(self.timestamp_fields, created_at)
+            # Cópias rasas: valores do registro têm precedência, como setdefault
+            records = [{**defaults, **record} for record in records]
+        if trusted:
+            return self._tuples(self._from_dict, records)
+        return self._tuples(self._from_model, self._adapter.validate_python(records))
+
+
+@lru_cache(maxsize=None)
+def row_encoder(model: type[BaseModel], columns=None) -> RowEncoder:
+    """RowEncoder compartilhado por (modelo, colunas); `columns` deve ser tupla."""
+    return RowEncoder(model, columns)
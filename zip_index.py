@@ -0,0 +1,174 @@
+"""
+Índice persistente dos membros do ZIP do CORD-19.
+
+Evita varrer o diretório central (namelist) a cada batch: o índice é
+construído uma única vez, salvo em disco e invalidado automaticamente
+quando o tamanho ou o mtime do ZIP mudam.
+"""
+
+import json
+import os
+import zipfile
+from bisect import bisect_right
+from itertools import accumulate
+
+# Diretório do cache (o ZIP costuma estar montado read-only no Docker)
+CACHE_DIR = os.getenv("ETL_CACHE_DIR", ".etl_cache")
+
+
+def zip_fingerprint(zip_path):
+    """Retorna (tamanho, mtime_ns) do ZIP, usados como chave do cache."""
+    st = os.stat(zip_path)
+    return st.st_size, st.st_mtime_ns
+
+
+class ZipMemberIndex:
+    """
+    Índice colunar dos membros do ZIP (nome, offset do header local,
+    tamanho comprimido/descomprimido e CRC).
+
+    A posição de cada membro no índice é a mesma usada como `offset`
+    pelos métodos de batch do `ZipFileAnalyzer`.
+    """
+
+    FIELDS = (
+        "names",
+        "header_offsets",
+        "compress_sizes",
+        "file_sizes",
+        "crcs",
+        "compress_types",
+        "flag_bits",
+    )
+
+    def __init__(self, zip_path, suffix=".json", **columns):
+        self.zip_path = zip_path
+        self.suffix = suffix
+        for field in self.FIELDS:
+            setattr(self, field, columns.get(field, []))
+        self._cumulative_sizes = None
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def build(cls, zip_path, suffix=".json"):
+        """Varre o diretório central uma vez e monta o índice."""
+        columns = {field: [] for field in cls.FIELDS}
+        with zipfile.ZipFile(zip_path, "r") as z:
+            for info in z.infolist():
+                if not info.filename.endswith(suffix):
+                    continue
+                columns["names"].append(info.filename)
+                columns["header_offsets"].append(info.header_offset)
+                columns["compress_sizes"].append(info.compress_size)
+                columns["file_sizes"].append(info.file_size)
+                columns["crcs"].append(info.CRC)
+                columns["compress_types"].append(info.compress_type)
+                columns["flag_bits"].append(info.flag_bits)
+        return cls(zip_path, suffix=suffix, **columns)
+
+    @classmethod
+    def load(cls, zip_path, suffix=".json", cache_dir=None):
+        """
+        Carrega o índice do cache em disco, reconstruindo-o se o ZIP mudou
+        (tamanho ou mtime diferentes) ou se o cache não existir.
+        """
+        cache_path = cls.cache_path(zip_path, suffix, cache_dir)
+        size, mtime_ns = zip_fingerprint(zip_path)
+
+        if os.path.exists(cache_path):
+            try:
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    cached = json.load(f)
+                if (
+                    cached.get("zip_size") == size
+                    and cached.get("zip_mtime_ns") == mtime_ns
+                ):
+                    return cls(
+                        zip_path,
+                        suffix=suffix,
+                        **{field: cached[field] for field in cls.FIELDS},
+                    )
+            except (OSError, ValueError, KeyError):
+                pass  # cache corrompido: reconstrói abaixo
+
+        index = cls.build(zip_path, suffix=suffix)
+        index.save(cache_path, size, mtime_ns)
+        print(f"🗂️  Índice do ZIP construído: {len(index):,} membros ({cache_path})")
+        return index
+
+    @staticmethod
+    def cache_path(zip_path, suffix=".json", cache_dir=None):
+        cache_dir = cache_dir or CACHE_DIR
+        base = os.path.basename(zip_path)
+        tag = suffix.strip(".") or "all"
+        return os.path.join(cache_dir, f"{base}.{tag}.index.json")
+
+    def save(self, cache_path, size, mtime_ns):
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        payload = {"zip_size": size, "zip_mtime_ns": mtime_ns, "suffix": self.suffix}
+        payload.update({field: getattr(self, field) for field in self.FIELDS})
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, cache_path)
+
+    def entry(self, position):
+        """Tupla compacta (picklável) com os campos do membro, na ordem de FIELDS."""
+        return tuple(getattr(self, field)[position] for field in self.FIELDS)
+
+    def entries(self, positions):
+        return [self.entry(position) for position in positions]
+
+    def zipinfo(self, position):
+        """
+        Reconstrói o ZipInfo de um membro a partir do índice, permitindo
+        `ZipFile.open(info)` sem consultar o diretório central.
+        """
+        return zipinfo_from_entry(self.entry(position))
+
+    def positions(self, offset=0, number_of_files=None):
+        """Intervalo de posições [offset, offset + number_of_files) limitado ao índice."""
+        end = len(self) if not number_of_files else offset + number_of_files
+        return range(offset, min(end, len(self)))
+
+    @property
+    def cumulative_sizes(self):
+        """Somas prefixadas de file_size (descomprimido): cumulative[i] = bytes de [0, i)."""
+        if self._cumulative_sizes is None:
+            self._cumulative_sizes = list(accumulate(self.file_sizes, initial=0))
+        return self._cumulative_sizes
+
+    def bytes_in(self, offset, number_of_files):
+        """Total de bytes descomprimidos do slice [offset, offset + number_of_files)."""
+        positions = self.positions(offset, number_of_files)
+        return self.cumulative_sizes[positions.stop] - self.cumulative_sizes[positions.start]
+
+    def files_within_budget(self, offset, byte_budget, max_files=None):
+        """
+        Quantos arquivos a partir de `offset` cabem em `byte_budget` bytes
+        descomprimidos (no mínimo 1, para um arquivo maior que o orçamento
+        não travar o processamento), limitado a `max_files`.
+        """
+        if offset >= len(self):
+            return 0
+        cumulative = self.cumulative_sizes
+        end = bisect_right(cumulative, cumulative[offset] + byte_budget) - 1
+        count = max(1, end - offset)
+        if max_files:
+            count = min(count, max_files)
+        return count
+
+
+def zipinfo_from_entry(entry):
+    """Converte uma tupla de `ZipMemberIndex.entry` em ZipInfo pronto para `ZipFile.open`."""
+    name, header_offset, compress_size, file_size, crc, compress_type, flag_bits = entry
+    info = zipfile.ZipInfo(name)
+    info.header_offset = header_offset
+    info.compress_size = compress_size
+    info.file_size = file_size
+    info.CRC = crc
+    info.compress_type = compress_type
+    info.flag_bits = flag_bits
+    return info